@@ -0,0 +1,62 @@
+"""
+Benchmark comparing per-call mutations with transactional batches
+
+Run from the library_system directory:
+    python -m benchmarks.bench_batch --books 20000 --burst 2000
+"""
+
+import argparse
+import logging
+import random
+from benchmarks.bench_storage import make_books, timed
+from src.library import Library
+
+
+def run_burst(library: Library, added, removed) -> None:
+    """Apply a burst of adds and removes one call at a time."""
+    for book in added:
+        library.add_book(book)
+    for book in removed:
+        library.remove_book(book)
+
+
+def run_batched_burst(library: Library, added, removed) -> None:
+    """Apply the same burst inside one batch."""
+    with library.batch():
+        run_burst(library, added, removed)
+
+
+def bench_backend(backend: str, books, burst: int, seed: int) -> dict:
+    """Time the same mutation burst per call and batched against one backend."""
+    rng = random.Random(seed)
+    base, extra = books[:-burst], books[-burst:]
+    removed = rng.sample(base, burst)
+    results = {}
+    for name, run in (("per-call", run_burst), ("batch", run_batched_burst)):
+        library = Library(name=f"Bench {backend}", backend=backend)
+        library.add_books(base)
+        results[name] = timed(lambda: run(library, extra, removed))
+        assert len(library.books) == len(base)
+        library.close()
+    return results
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Batch mutation benchmark")
+    parser.add_argument('--books', type=int, default=20000, help='Number of books in the catalog')
+    parser.add_argument('--burst', type=int, default=2000, help='Number of adds and of removes in the burst')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    books = make_books(args.books + args.burst, args.seed)
+    print(f"{'burst (ms)':<14}{'per-call':>12}{'batch':>12}{'speedup':>10}")
+    for backend in ("memory", "sqlite"):
+        results = bench_backend(backend, books, args.burst, args.seed)
+        speedup = results["per-call"] / results["batch"]
+        print(f"{backend:<14}{results['per-call']:>12.1f}{results['batch']:>12.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
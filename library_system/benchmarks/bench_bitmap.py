@@ -0,0 +1,77 @@
+"""
+Benchmark comparing multi-facet filters and facet counts on bitmaps with list intersection
+
+Run from the library_system directory:
+    python -m benchmarks.bench_bitmap --books 100000 --queries 200
+"""
+
+import argparse
+import logging
+import random
+from benchmarks.bench_storage import make_books, timed
+from src.catalog_stats import CatalogStats
+from src.library import Library
+
+
+def list_count(genre_index, decade_index, genre: str, decade: int) -> int:
+    """Count the books of a genre and decade by intersecting their lists of books."""
+    decade_isbns = {book.isbn for book in decade_index.get(decade)}
+    return sum(book.isbn in decade_isbns for book in genre_index.get(genre))
+
+
+def list_facet_counts(genre_index, decade_index, decade: int) -> dict:
+    """Count the books of a decade per genre by intersecting lists of books."""
+    decade_isbns = {book.isbn for book in decade_index.get(decade)}
+    counts = {}
+    for genre in genre_index.keys():
+        count = sum(book.isbn in decade_isbns for book in genre_index.get(genre))
+        if count:
+            counts[genre] = count
+    return counts
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Bitmap index benchmark")
+    parser.add_argument('--books', type=int, default=100000, help='Number of books in the catalog')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries of each kind')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    library = Library(name="Bench bitmaps")
+    library.add_books(make_books(args.books, args.seed))
+    genre_index = library.create_index("genre", lambda book: book.genre)
+    decade_index = library.create_index("decade", lambda book: CatalogStats.decade_of(book.year))
+    library.enable_bitmap_index()
+    
+    pairs = [(book.genre, CatalogStats.decade_of(book.year)) for book in library.books.sample_books(args.queries, rng)]
+    for genre, decade in pairs[:5]:
+        assert library.bitmaps.count({"genre": genre, "decade": decade}) == list_count(
+            genre_index, decade_index, genre, decade)
+    rows = [
+        ("genre AND decade count",
+         timed(lambda: [list_count(genre_index, decade_index, g, d) for g, d in pairs]),
+         timed(lambda: [library.bitmaps.count({"genre": g, "decade": d}) for g, d in pairs])),
+        ("genre counts per decade",
+         timed(lambda: [list_facet_counts(genre_index, decade_index, d) for _, d in pairs]),
+         timed(lambda: [library.bitmaps.facet_counts("genre", {"decade": d}) for _, d in pairs])),
+    ]
+    print(f"{args.books} books, {args.queries} queries of each kind")
+    print(f"{'query (ms each)':<26}{'lists':>10}{'bitmaps':>10}{'speedup':>10}")
+    for label, lists, bitmaps in rows:
+        lists, bitmaps = lists / args.queries, bitmaps / args.queries
+        print(f"{label:<26}{lists:>10.3f}{bitmaps:>10.3f}{lists / bitmaps:>9.1f}x")
+    
+    add = make_books(args.books + 1000, args.seed + 1)[args.books:]
+    for book in add:
+        book.isbn = "x" + book.isbn
+    hook = library.bitmaps
+    print(f"{'incremental add (us)':<26}{'':>10}{timed(lambda: [hook.add_book(b) for b in add]) / len(add) * 1000:>10.2f}")
+    print(f"{'incremental remove (us)':<26}{'':>10}"
+          f"{timed(lambda: [hook.remove_book(b) for b in add]) / len(add) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Benchmark comparing a full book-by-book catalog comparison with a Merkle tree diff and sync
+
+Run from the library_system directory:
+    python -m benchmarks.bench_merkle --books 200000 --changes 10
+"""
+
+import argparse
+import logging
+import random
+from benchmarks.bench_storage import make_books, timed
+from src.book import Book
+from src.library import Library
+
+
+class CountingTree:
+    """Proxy to a Merkle tree that counts the nodes a diff reads from it."""
+    
+    def __init__(self, tree):
+        """Wrap a tree."""
+        self.tree = tree
+        self.depth = tree.depth
+        self.reads = 0
+    
+    def node(self, index: int) -> int:
+        """Read one node hash."""
+        self.reads += 1
+        return self.tree.node(index)
+
+
+def full_compare(first: Library, second: Library) -> int:
+    """Compare every book of two libraries and return the number of differing records."""
+    records = {book.isbn: (book.title, book.author, book.year, book.genre) for book in first.books}
+    other = {book.isbn: (book.title, book.author, book.year, book.genre) for book in second.books}
+    return sum(records.get(isbn) != record for isbn, record in other.items()) + len(records.keys() - other.keys())
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Merkle diff and sync benchmark")
+    parser.add_argument('--books', type=int, default=200000, help='Number of books in each catalog')
+    parser.add_argument('--changes', type=int, default=10, help='Books changed in the second catalog')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    replica, primary = Library(name="Replica"), Library(name="Primary")
+    replica.enable_merkle_tree()
+    primary.enable_merkle_tree()
+    replica.add_books(make_books(args.books, args.seed))
+    primary.add_books(make_books(args.books, args.seed))
+    for book in rng.sample(list(primary.books), args.changes):
+        primary.remove_book(book)
+        primary.add_book(Book(book.title + " (2nd ed.)", book.author, book.year, book.genre, book.isbn))
+    
+    full = timed(lambda: full_compare(replica, primary))
+    proxy = CountingTree(primary.merkle)
+    diff = timed(lambda: replica.merkle.diff(proxy))
+    buckets = replica.diff(primary)
+    sync = timed(lambda: replica.sync_from(primary))
+    print(f"{args.books} books, {args.changes} changed, {replica.merkle.leaves} buckets")
+    print(f"{'operation':<22}{'ms':>10}")
+    print(f"{'full comparison':<22}{full:>10.2f}")
+    print(f"{'Merkle diff':<22}{diff:>10.3f}   ({len(buckets)} buckets, {proxy.reads} nodes read)")
+    print(f"{'Merkle sync':<22}{sync:>10.3f}")
+    print(f"speedup of diff over full comparison: {full / diff:.0f}x; in sync afterwards: {replica.diff(primary) == []}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
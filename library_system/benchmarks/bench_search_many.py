@@ -0,0 +1,48 @@
+"""
+Benchmark comparing one call per query with batched Library.search_many
+
+Run from the library_system directory:
+    python -m benchmarks.bench_search_many --books 20000 --queries 5000
+"""
+
+import argparse
+import logging
+import random
+from benchmarks.bench_storage import make_books, timed
+from src.library import Library
+
+
+def make_queries(books, count: int, seed: int):
+    """Draw a mix of author, year and genre queries about the given books, with repeats."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        book = rng.choice(books)
+        search_type = rng.choice(("author", "year", "genre"))
+        queries.append((search_type, str(getattr(book, search_type))))
+    return queries
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Batched search benchmark")
+    parser.add_argument('--books', type=int, default=20000, help='Number of books in the catalog')
+    parser.add_argument('--queries', type=int, default=5000, help='Number of queries in the batch')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    books = make_books(args.books, args.seed)
+    queries = make_queries(books, args.queries, args.seed)
+    print(f"{'queries (ms)':<14}{'per-call':>12}{'batch':>12}{'speedup':>10}")
+    for backend in ("memory", "sqlite"):
+        library = Library(name=f"Bench {backend}", backend=backend)
+        library.add_books(books)
+        per_call = timed(lambda: [library(query, search_type) for search_type, query in queries])
+        batch = timed(lambda: library.search_many(queries))
+        print(f"{backend:<14}{per_call:>12.1f}{batch:>12.1f}{per_call / batch:>9.1f}x")
+        library.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
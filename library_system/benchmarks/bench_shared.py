@@ -0,0 +1,100 @@
+"""
+Benchmark comparing a shared-memory catalog with a Library built per worker
+
+Run from the library_system directory:
+    python -m benchmarks.bench_shared --books 100000 --workers 4
+"""
+
+import argparse
+import logging
+import multiprocessing
+import random
+import time
+from benchmarks.bench_storage import make_books
+from src.library import Library
+from src.shared_catalog import SharedCatalog
+
+
+def private_memory_kib() -> int:
+    """Get the anonymous (unshared) resident memory of this process, 0 if unknown."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def shared_worker(name: str, isbns, results) -> None:
+    """Attach to the shared catalog and run lookups."""
+    before = private_memory_kib()
+    start = time.perf_counter()
+    catalog = SharedCatalog.attach(name)
+    ready = time.perf_counter()
+    for isbn in isbns:
+        catalog.search_by_isbn(isbn)
+    done = time.perf_counter()
+    results.put((ready - start, (done - ready) / len(isbns), private_memory_kib() - before))
+    catalog.close()
+
+
+def library_worker(books, isbns, results) -> None:
+    """Build a private Library from the books and run the same lookups."""
+    before = private_memory_kib()
+    start = time.perf_counter()
+    library = Library(name="Worker")
+    library.add_books(books)
+    ready = time.perf_counter()
+    for isbn in isbns:
+        library.search_by_isbn(isbn)
+    done = time.perf_counter()
+    results.put((ready - start, (done - ready) / len(isbns), private_memory_kib() - before))
+
+
+def run_workers(target, payload, isbns, workers: int):
+    """Start workers, wait for them, and return their (startup s, lookup s, private KiB) results."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=target, args=(payload, isbns, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return outcomes
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Shared-memory catalog benchmark")
+    parser.add_argument('--books', type=int, default=100000, help='Number of books in the catalog')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    parser.add_argument('--queries', type=int, default=2000, help='ISBN lookups per worker')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    books = make_books(args.books, args.seed)
+    isbns = [book.isbn for book in random.Random(args.seed).choices(books, k=args.queries)]
+    
+    start = time.perf_counter()
+    catalog = SharedCatalog.publish(books)
+    publish_ms = (time.perf_counter() - start) * 1000
+    print(f"Published {len(catalog)} books in {publish_ms:.1f} ms ({catalog.segment.size / 1024:.0f} KiB segment)")
+    
+    rows = {
+        "shared catalog": run_workers(shared_worker, catalog.name, isbns, args.workers),
+        "library per worker": run_workers(library_worker, books, isbns, args.workers),
+    }
+    catalog.close()
+    
+    print(f"{'per worker (mean)':<20}{'startup ms':>12}{'lookup us':>12}{'private KiB':>14}")
+    for label, outcomes in rows.items():
+        startup, lookup, private = (sum(values) / len(values) for values in zip(*outcomes))
+        print(f"{label:<20}{startup * 1000:>12.2f}{lookup * 1e6:>12.2f}{private:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
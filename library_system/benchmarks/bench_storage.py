@@ -0,0 +1,74 @@
+"""
+Benchmark comparing the in-memory and SQLite storage backends
+
+Run from the library_system directory:
+    python -m benchmarks.bench_storage --books 20000
+"""
+
+import argparse
+import logging
+import random
+import time
+from src.book import Book
+from src.constants import GENRES
+from src.library import Library
+
+
+def make_books(count: int, seed: int):
+    """Generate books with distinct ISBNs."""
+    rng = random.Random(seed)
+    return [
+        Book(
+            title=f"Title {rng.randrange(count)} of {rng.choice(GENRES)}",
+            author=f"Author {rng.randrange(max(1, count // 20))}",
+            year=rng.randint(1900, 2025),
+            genre=rng.choice(GENRES),
+            isbn=f"{i:013d}",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(operation, repeat: int = 1) -> float:
+    """Run an operation and return the mean wall-clock time in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def bench_backend(backend: str, books, queries: int, seed: int) -> dict:
+    """Time ingest and lookups against one backend."""
+    rng = random.Random(seed)
+    library = Library(name=f"Bench {backend}", backend=backend)
+    results = {"add_book (total)": timed(lambda: [library.add_book(book) for book in books])}
+    
+    sample = [rng.choice(books) for _ in range(queries)]
+    results["search_by_isbn"] = timed(lambda: [library.search_by_isbn(b.isbn) for b in sample]) / queries
+    results["search_by_author"] = timed(lambda: [library.search_by_author(b.author) for b in sample]) / queries
+    results["search_by_year"] = timed(lambda: [library.search_by_year(b.year) for b in sample]) / queries
+    results["search_by_title"] = timed(lambda: [library.search_by_title(b.title[:9]) for b in sample[:20]]) / 20
+    results["remove_book (total)"] = timed(lambda: [library.remove_book(b) for b in books[:queries]])
+    library.close()
+    return results
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Storage backend benchmark")
+    parser.add_argument('--books', type=int, default=20000, help='Number of books to ingest')
+    parser.add_argument('--queries', type=int, default=500, help='Number of lookups per operation')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    books = make_books(args.books, args.seed)
+    results = {name: bench_backend(name, books, args.queries, args.seed) for name in ("memory", "sqlite")}
+    
+    print(f"{'operation (ms)':<22}{'memory':>12}{'sqlite':>12}")
+    for operation in results["memory"]:
+        print(f"{operation:<22}{results['memory'][operation]:>12.4f}{results['sqlite'][operation]:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
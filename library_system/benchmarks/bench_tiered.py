@@ -0,0 +1,51 @@
+"""
+Benchmark sizing the hot tier of the tiered backend under skewed lookups
+
+Run from the library_system directory:
+    python -m benchmarks.bench_tiered --books 50000 --lookups 50000 --zipf 1.1
+"""
+
+import argparse
+import logging
+import random
+from benchmarks.bench_storage import make_books, timed
+from src.library import Library
+from src.tiered_backend import TieredBackend, book_size
+from src.workload import ZipfSampler
+
+
+def main():
+    """Run skewed ISBN lookups at several hot tier budgets and print hit rates and latencies."""
+    parser = argparse.ArgumentParser(description="Tiered backend benchmark")
+    parser.add_argument('--books', type=int, default=50000, help='Number of books in the catalog')
+    parser.add_argument('--lookups', type=int, default=50000, help='Number of ISBN lookups')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of book popularity')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    books = make_books(args.books, args.seed)
+    sampler = ZipfSampler(args.zipf, random.Random(args.seed))
+    # Popularity follows a random permutation, so hot books are spread over the file
+    order = random.Random(args.seed).sample(books, len(books))
+    isbns = [order[sampler.sample(len(order))].isbn for _ in range(args.lookups)]
+    per_book = book_size(books[0])
+    
+    memory = Library(backend="memory")
+    memory.add_books(books)
+    baseline = timed(lambda: [memory.search_by_isbn(isbn) for isbn in isbns])
+    print(f"{'budget':<16}{'hit rate':>10}{'fault (us)':>12}{'lookup (us)':>13}{'resident KiB':>14}")
+    print(f"{'memory':<16}{'100.0%':>10}{'-':>12}{baseline * 1000 / len(isbns):>13.2f}{'-':>14}")
+    for share in (0.001, 0.01, 0.05, 0.2, 1.0):
+        backend = TieredBackend(budget=int(share * len(books) * per_book))
+        library = Library(backend=backend)
+        library.add_books(books)
+        elapsed = timed(lambda: [library.search_by_isbn(isbn) for isbn in isbns])
+        metrics = backend.metrics()
+        print(f"{f'{share:.1%} of books':<16}{metrics['hit_rate']:>10.1%}{metrics['mean_fault_us']:>12.1f}"
+              f"{elapsed * 1000 / len(isbns):>13.2f}{metrics['resident_bytes'] / 1024:>14.1f}")
+        library.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -4,32 +4,181 @@ Main entry point for the Library Management System
 
 import argparse
 import logging
+from typing import Optional, Union
+from src.catalog_generator import CatalogGenerator, write_catalog
+from src.dedup import format_duplicates
+from src.discrete_event import format_queueing_report, run_discrete_event
 from src.constants import LOG_FORMAT
+from src.library import Library
+from src.memory import format_memory_usage, trace_allocations
+from src.profiling import profile_simulation
 from src.simulation import run_simulation
+from src.storage import StorageBackend
+from src.stress import format_stress_report, run_stress
+from src.tiered_backend import TieredBackend, format_cache_metrics
+from src.trace import read_trace_header, replay_trace
+from src.workload import PRESET_PROFILES, WorkloadProfile, parse_event_weights
 
 
-def setup_logging():
+def setup_logging(level: int = logging.INFO):
     """Setup logging configuration."""
-    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+def replay(path: str, backend: Union[str, StorageBackend]) -> None:
+    """Replay a recorded trace and report throughput."""
+    header = read_trace_header(path)
+    print(f"Replaying trace {path} (seed={header.get('seed')}, steps={header.get('steps')})")
+    print("-" * 50)
+    
+    library = Library(name="Replay Library", backend=backend)
+    stats = replay_trace(path, library)
+    library.close()
+    print_backend_metrics(library)
+    
+    print(f"Replayed {stats['events']} events in {stats['seconds']:.4f}s "
+          f"({stats['events_per_second']:.0f} events/s)")
+    for event_type, event_stats in sorted(stats['per_type'].items()):
+        mean_us = event_stats['seconds'] / event_stats['count'] * 1e6
+        print(f"  {event_type:<18}{event_stats['count']:>8} events{mean_us:>12.1f} us/event")
+
+
+def build_backend(args: argparse.Namespace) -> Union[str, StorageBackend]:
+    """Build the storage backend selected on the command line (a fresh one per library)."""
+    if args.backend == 'tiered' and args.cache_budget is not None:
+        return TieredBackend(budget=int(args.cache_budget * 1024 * 1024))
+    return args.backend
+
+
+def print_backend_metrics(library: Library) -> None:
+    """Print the hot tier metrics of a library on the tiered backend."""
+    if isinstance(library.backend, TieredBackend):
+        print(format_cache_metrics(library.backend.metrics()))
+
+
+def build_workload(args: argparse.Namespace) -> Optional[WorkloadProfile]:
+    """Build the workload profile selected on the command line, if any."""
+    if not (args.workload or args.event_weights or args.zipf is not None):
+        return None
+    settings = WorkloadProfile.load(args.workload).to_dict() if args.workload else {}
+    if args.event_weights:
+        settings['event_weights'] = parse_event_weights(args.event_weights)
+    if args.zipf is not None:
+        settings['author_skew'] = settings['isbn_skew'] = args.zipf
+    return WorkloadProfile.from_dict(settings)
 
 
 def main():
     """Main function to run the library management system."""
-    setup_logging()
-    
     parser = argparse.ArgumentParser(description="Library Management System")
     parser.add_argument('--steps', type=int, default=20, help='Number of simulation steps (default: 20)')
     parser.add_argument('--seed', type=int, help='Random seed for reproducible results')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'tiered'], default='memory',
+                        help='Storage backend for the library (default: memory)')
+    parser.add_argument('--cache-budget', type=float, metavar='MIB',
+                        help='Memory budget of the tiered backend\'s hot tier in MiB (default: 32)')
+    parser.add_argument('--record', metavar='PATH',
+                        help='Record the simulated event stream to a trace file (.gz for gzip)')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='Replay a recorded trace as fast as possible and report throughput')
+    parser.add_argument('--workload', metavar='PROFILE',
+                        help=f"Workload profile: a JSON file or a preset ({', '.join(PRESET_PROFILES)})")
+    parser.add_argument('--event-weights', metavar='WEIGHTS',
+                        help='Override event weights, e.g. add_book=1,search_author=30')
+    parser.add_argument('--zipf', type=float, metavar='S',
+                        help='Override the Zipf exponent of author and book popularity')
+    parser.add_argument('--profile', action='store_true',
+                        help='Run the simulation under cProfile and write a report')
+    parser.add_argument('--profile-output', metavar='PREFIX', default='simulation_profile',
+                        help='Path prefix of the profile report (.txt) and statistics (.prof)')
+    parser.add_argument('--memory', action='store_true',
+                        help='Print a memory usage breakdown of the library after the simulation')
+    parser.add_argument('--trace-malloc', action='store_true',
+                        help='Trace allocations during the simulation and report the top sites')
+    parser.add_argument('--catalog', metavar='PATH',
+                        help='Catalog file (.csv or .jsonl, optionally .gz) to preload or to generate')
+    parser.add_argument('--generate-catalog', type=int, metavar='N',
+                        help='Write N synthetic books with unique ISBNs to --catalog and exit')
+    parser.add_argument('--find-duplicates', action='store_true',
+                        help='Report clusters of near-duplicate books after the simulation')
+    parser.add_argument('--arrival-rate', metavar='RATES',
+                        help='Run a discrete-event simulation at these requests per second '
+                             '(comma-separated to compare several rates)')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Simulated seconds of arrivals in discrete-event mode (default: 10)')
+    parser.add_argument('--servers', type=int, default=1,
+                        help='Requests served at once in discrete-event mode (default: 1)')
+    parser.add_argument('--stress', type=int, metavar='CLIENTS',
+                        help='Run --steps events from each of CLIENTS threads against one shared library')
+    parser.add_argument('--no-lock', action='store_true',
+                        help='Let stress clients race instead of serializing events with a lock')
     
     args = parser.parse_args()
     
+    if args.replay:
+        # Per-operation log lines would dominate the measured throughput
+        setup_logging(logging.WARNING)
+        replay(args.replay, build_backend(args))
+        return
+    
+    if args.arrival_rate:
+        # Log lines would count towards every measured service time
+        setup_logging(logging.WARNING)
+        workload = build_workload(args)
+        for rate in args.arrival_rate.split(","):
+            report = run_discrete_event(float(rate), args.duration, servers=args.servers, seed=args.seed,
+                                        backend=build_backend(args), workload=workload,
+                                        catalog_path=args.catalog)
+            print(format_queueing_report(report))
+            print()
+        return
+    
+    if args.stress:
+        setup_logging(logging.WARNING)
+        report = run_stress(args.stress, args.steps, seed=args.seed, backend=build_backend(args),
+                            workload=build_workload(args), lock=not args.no_lock, catalog_path=args.catalog)
+        print(format_stress_report(report))
+        return
+    
+    setup_logging()
+    
+    if args.generate_catalog is not None:
+        if not args.catalog:
+            parser.error('--generate-catalog requires --catalog')
+        generator = CatalogGenerator(seed=args.seed)
+        count = write_catalog(args.catalog, generator.iter_books(args.generate_catalog))
+        print(f"Wrote {count} books to {args.catalog}")
+        return
+    
+    if (args.profile or args.trace_malloc) and (args.memory or args.find_duplicates):
+        # Profiled runs close their library before returning, so the reports have nothing to query
+        parser.error('--memory and --find-duplicates cannot be combined with --profile or --trace-malloc')
+    
     print("Starting Library Management System Simulation...")
+    workload = build_workload(args)
     print(f"Running simulation with {args.steps} steps")
     if args.seed is not None:
         print(f"Using seed: {args.seed}")
     print("-" * 50)
     
-    run_simulation(steps=args.steps, seed=args.seed)
+    options = dict(steps=args.steps, seed=args.seed, backend=build_backend(args), trace_path=args.record,
+                   workload=workload, catalog_path=args.catalog)
+    if args.profile:
+        paths = profile_simulation(args.profile_output, **options)
+        print(f"Profile report: {paths['report']}, statistics: {paths['stats']}")
+    elif args.trace_malloc:
+        print(trace_allocations(run_simulation, **options))
+    else:
+        # Reports below still query the library, so it is closed here once they are done
+        library = run_simulation(**options, close=False)
+        try:
+            if args.memory:
+                print(format_memory_usage(library.memory_usage()))
+            if args.find_duplicates:
+                print(format_duplicates(library.find_duplicates()))
+        finally:
+            library.close()
+        print_backend_metrics(library)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""
+Prefix autocomplete over normalized book fields
+"""
+
+import heapq
+from bisect import insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .book import Book
+from .constants import AUTOCOMPLETE_CACHE_SIZE
+from .hooks import MutationHook
+from .normalize import normalize_key
+
+
+class _TrieNode:
+    """A trie node with the cached best completions of its subtree."""
+    
+    __slots__ = ("children", "count", "top")
+    
+    def __init__(self):
+        """Initialize an empty node."""
+        self.children: Dict[str, '_TrieNode'] = {}
+        # Number of books whose normalized value ends at this node
+        self.count = 0
+        # Up to cache_size (-count, term) pairs of the subtree, best first
+        self.top: List[Tuple[int, str]] = []
+
+
+class PrefixIndex(MutationHook):
+    """
+    A trie over one normalized key of the books, ranking completions by book count.
+    
+    Every node caches the best completions of its subtree, so a query costs
+    O(len(prefix) + k) whatever the catalog size. Adds only ever raise a
+    term's count and update the caches along one path; removes recompute the
+    caches along the path from the children's caches, bottom-up.
+    """
+    
+    def __init__(self, key_func: Callable[[Book], Any], display_func: Callable[[Book], Any],
+                 cache_size: int = AUTOCOMPLETE_CACHE_SIZE):
+        """
+        Initialize the index.
+        
+        Args:
+            key_func: Function returning the normalized key of a book, e.g. its cached title_key
+            display_func: Function returning the text shown for the key, e.g. the title
+            cache_size: Number of completions cached per node; larger k falls back to a subtree walk
+        """
+        self.key_func = key_func
+        self.display_func = display_func
+        self.cache_size = cache_size
+        self._root = _TrieNode()
+        # Normalized term -> text shown to the user (the first spelling seen)
+        self._display: Dict[str, str] = {}
+    
+    def __len__(self) -> int:
+        """Get the number of distinct terms."""
+        return len(self._display)
+    
+    def __repr__(self) -> str:
+        """String representation of the index."""
+        return f"PrefixIndex(terms={len(self._display)}, cache_size={self.cache_size})"
+    
+    def add_book(self, book: Book) -> None:
+        """Count a book under its term."""
+        self._adjust(self.key_func(book), self.display_func(book), 1)
+    
+    def remove_book(self, book: Book) -> None:
+        """Stop counting a book under its term."""
+        self._adjust(self.key_func(book), None, -1)
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """Count many books, touching each distinct term's path once."""
+        # Normalized term -> [first spelling, number of books]
+        batch: Dict[str, list] = {}
+        for book in books:
+            term = self.key_func(book)
+            if not term:
+                continue
+            entry = batch.get(term)
+            if entry is None:
+                entry = batch[term] = [self.display_func(book), 0]
+            entry[1] += 1
+        for term, (text, count) in batch.items():
+            self._adjust(term, text, count)
+    
+    def complete(self, prefix: str, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most popular completions of a prefix.
+        
+        Args:
+            prefix: Text typed so far (normalized like the keys before matching)
+            k: Maximum number of completions
+        
+        Returns:
+            List of (text, book count) pairs, most books first, ties alphabetical
+        """
+        prefix = normalize_key(prefix)
+        node = self._find(prefix)
+        if node is None or k <= 0:
+            return []
+        if k <= self.cache_size:
+            entries = node.top[:k]
+        else:
+            entries = heapq.nsmallest(k, self._walk(node, prefix))
+        return [(self._display[term], -negative) for negative, term in entries]
+    
+    def _find(self, term: str) -> Optional[_TrieNode]:
+        """Get the node reached by a normalized term, if any."""
+        node = self._root
+        for char in term:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+    
+    def _walk(self, node: _TrieNode, term: str):
+        """Yield (-count, term) for every term in a subtree."""
+        stack = [(node, term)]
+        while stack:
+            node, term = stack.pop()
+            if node.count:
+                yield (-node.count, term)
+            stack.extend((child, term + char) for char, child in node.children.items())
+    
+    def _adjust(self, term: str, text: Optional[str], delta: int) -> None:
+        """Change the count of a term (shown as text) and refresh the caches on its path."""
+        if not term:
+            return
+        path = [self._root]
+        for char in term:
+            child = path[-1].children.get(char)
+            if child is None:
+                if delta < 0:
+                    return
+                child = path[-1].children[char] = _TrieNode()
+            path.append(child)
+        node = path[-1]
+        if node.count + delta < 0:
+            return
+        node.count += delta
+        
+        if delta > 0:
+            self._display.setdefault(term, text)
+            # An ancestor ranks a superset of its child's terms, so once the term
+            # misses one cache on the way up it misses all the others too
+            for ancestor in reversed(path):
+                if not self._promote(ancestor, term, -node.count):
+                    break
+            return
+        
+        if not node.count:
+            del self._display[term]
+        # Drop nodes left without terms, then recompute the caches that held the
+        # term; a cache without it is unaffected, and so are its ancestors' caches
+        depth = len(path) - 1
+        while depth > 0 and not path[depth].count and not path[depth].children:
+            del path[depth - 1].children[term[depth - 1]]
+            depth -= 1
+        for depth in range(depth, -1, -1):
+            if depth < len(term) and all(cached != term for _, cached in path[depth].top):
+                break
+            self._recompute(path[depth], term[:depth])
+    
+    def _promote(self, node: _TrieNode, term: str, negative: int) -> bool:
+        """Move a term whose count grew to its place in a node's cache; False if it does not make it."""
+        top = node.top
+        # Counts only grow here, so a term that misses a full cache was not in it before either
+        if len(top) >= self.cache_size and (negative, term) > top[-1]:
+            return False
+        for position, (_, cached) in enumerate(top):
+            if cached == term:
+                del top[position]
+                break
+        insort(top, (negative, term))
+        del top[self.cache_size:]
+        return True
+    
+    def _recompute(self, node: _TrieNode, term: str) -> None:
+        """Rebuild a node's cache from its own term and its children's caches."""
+        candidates = [entry for child in node.children.values() for entry in child.top]
+        if node.count:
+            candidates.append((-node.count, term))
+        node.top = heapq.nsmallest(self.cache_size, candidates)
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Bitmap indexes over dense row ids for multi-facet filtering and facet counts
+"""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional
+from .book import Book
+from .catalog_stats import CatalogStats
+from .constants import BITMAP_CHUNK_ROWS
+from .hooks import MutationHook
+
+# A bitmap is split into chunks of BITMAP_CHUNK_ROWS rows: chunk number -> bits
+# of the rows in it, with empty chunks left out
+Bitmap = Dict[int, int]
+
+# Facets indexed by default: name -> key of a book
+DEFAULT_FACETS: Dict[str, Callable[[Book], Hashable]] = {
+    "genre": lambda book: book.genre,
+    "year": lambda book: book.year,
+    "decade": lambda book: CatalogStats.decade_of(book.year),
+    "author": lambda book: book.author,
+}
+
+
+def bitmap_and(first: Bitmap, second: Bitmap) -> Bitmap:
+    """Intersect two bitmaps, visiting only the chunks both have."""
+    if len(second) < len(first):
+        first, second = second, first
+    result = {}
+    for chunk, bits in first.items():
+        other = second.get(chunk)
+        if other is not None:
+            both = bits & other
+            if both:
+                result[chunk] = both
+    return result
+
+
+def bitmap_or(first: Bitmap, second: Bitmap) -> Bitmap:
+    """Unite two bitmaps."""
+    result = dict(first)
+    for chunk, bits in second.items():
+        result[chunk] = result.get(chunk, 0) | bits
+    return result
+
+
+def bitmap_count(bitmap: Bitmap) -> int:
+    """Get the number of rows set in a bitmap (a popcount per chunk)."""
+    return sum(bits.bit_count() for bits in bitmap.values())
+
+
+def bitmap_rows(bitmap: Bitmap) -> Iterator[int]:
+    """Iterate over the rows set in a bitmap in ascending order."""
+    for chunk in sorted(bitmap):
+        bits = bitmap[chunk]
+        base = chunk * BITMAP_CHUNK_ROWS
+        while bits:
+            lowest = bits & -bits
+            yield base + lowest.bit_length() - 1
+            bits ^= lowest
+
+
+class BitmapIndex(MutationHook):
+    """
+    Bitmaps of dense row ids per facet value, for AND/OR filters and popcount facet counts.
+    
+    Every book gets a small integer row id; the ids of removed books are
+    reused, so rows stay dense. Each value of each facet (genre, year,
+    decade and author by default) keeps a bitmap of the rows of its books,
+    stored as arbitrary-precision ints per chunk of BITMAP_CHUNK_ROWS rows
+    with empty chunks left out. Adding or removing a book flips one bit per
+    facet and only rewrites the int of one chunk, while a filter over
+    several facets is one AND per chunk and a count is one popcount per
+    chunk, instead of intersecting lists of Book objects.
+    """
+    
+    def __init__(self, facets: Optional[Mapping[str, Callable[[Book], Hashable]]] = None,
+                 lookup: Optional[Callable[[str], Optional[Book]]] = None):
+        """
+        Initialize an empty index.
+        
+        Args:
+            facets: Facet name -> function giving the value of a book (DEFAULT_FACETS by default)
+            lookup: Resolves an ISBN to its book; if given, rows hold ISBNs
+                instead of Book objects (for backends that keep books off-heap)
+        """
+        self.facets = dict(facets or DEFAULT_FACETS)
+        self.lookup = lookup
+        # Row id -> book (or ISBN with a lookup), None for a free row
+        self._rows: List[Any] = []
+        self._row_of: Dict[str, int] = {}
+        self._free: List[int] = []
+        # Facet -> value -> bitmap of its rows
+        self._bitmaps: Dict[str, Dict[Hashable, Bitmap]] = {name: {} for name in self.facets}
+        # Rows of every indexed book
+        self._all: Bitmap = {}
+    
+    def __len__(self) -> int:
+        """Get the number of indexed books."""
+        return len(self._row_of)
+    
+    def __repr__(self) -> str:
+        """String representation of the index."""
+        return f"BitmapIndex(facets={list(self.facets)}, books={len(self._row_of)}, rows={len(self._rows)})"
+    
+    @staticmethod
+    def _flip(bitmap: Bitmap, row: int) -> None:
+        """Toggle one row of a bitmap, dropping a chunk that becomes empty."""
+        chunk, offset = divmod(row, BITMAP_CHUNK_ROWS)
+        bits = bitmap.get(chunk, 0) ^ (1 << offset)
+        if bits:
+            bitmap[chunk] = bits
+        else:
+            del bitmap[chunk]
+    
+    def add_book(self, book: Book) -> None:
+        """Give a new book a row and set its bit in the bitmap of each of its facet values."""
+        if book.isbn in self._row_of:
+            return
+        row = self._free.pop() if self._free else len(self._rows)
+        if row == len(self._rows):
+            self._rows.append(None)
+        self._rows[row] = book if self.lookup is None else book.isbn
+        self._row_of[book.isbn] = row
+        self._flip(self._all, row)
+        for name, key_func in self.facets.items():
+            self._flip(self._bitmaps[name].setdefault(key_func(book), {}), row)
+    
+    def remove_book(self, book: Book) -> None:
+        """Clear a removed book's bits and free its row for reuse."""
+        row = self._row_of.pop(book.isbn, None)
+        if row is None:
+            return
+        stored = self._rows[row]
+        if self.lookup is None:
+            book = stored
+        self._rows[row] = None
+        self._free.append(row)
+        self._flip(self._all, row)
+        for name, key_func in self.facets.items():
+            bitmaps = self._bitmaps[name]
+            key = key_func(book)
+            bitmap = bitmaps.get(key)
+            if bitmap is not None:
+                self._flip(bitmap, row)
+                if not bitmap:
+                    del bitmaps[key]
+    
+    def values(self, facet: str) -> Iterable[Hashable]:
+        """Get the values of a facet that at least one book has."""
+        return self._facet(facet).keys()
+    
+    def _facet(self, facet: str) -> Dict[Hashable, Bitmap]:
+        """Get the bitmaps of a facet by value."""
+        bitmaps = self._bitmaps.get(facet)
+        if bitmaps is None:
+            raise KeyError(f"Unknown facet: {facet}")
+        return bitmaps
+    
+    def select(self, criteria: Mapping[str, Any]) -> Bitmap:
+        """
+        Get the bitmap of the books matching every criterion.
+        
+        Args:
+            criteria: Facet -> value, or a list, tuple or set of values any of
+                which may match (OR within a facet, AND across facets)
+        
+        Returns:
+            Bitmap of the matching rows (all rows for no criteria)
+        """
+        result = dict(self._all)
+        for facet, wanted in criteria.items():
+            bitmaps = self._facet(facet)
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                matched: Bitmap = {}
+                for value in wanted:
+                    matched = bitmap_or(matched, bitmaps.get(value, {}))
+            else:
+                matched = bitmaps.get(wanted, {})
+            result = bitmap_and(result, matched)
+            if not result:
+                break
+        return result
+    
+    def count(self, criteria: Mapping[str, Any]) -> int:
+        """Get the number of books matching the criteria, by popcount."""
+        return bitmap_count(self.select(criteria))
+    
+    def books(self, criteria: Mapping[str, Any]) -> List[Book]:
+        """Get the books matching the criteria, in row order."""
+        rows = self._rows
+        if self.lookup is None:
+            return [rows[row] for row in bitmap_rows(self.select(criteria))]
+        return [book for book in map(self.lookup, (rows[row] for row in bitmap_rows(self.select(criteria))))
+                if book is not None]
+    
+    def facet_counts(self, facet: str, criteria: Optional[Mapping[str, Any]] = None) -> Dict[Hashable, int]:
+        """
+        Count the books per value of a facet among those matching the criteria.
+        
+        Args:
+            facet: Facet to count by, e.g. 'genre'
+            criteria: Filter applied first (all books by default)
+        
+        Returns:
+            Value -> number of matching books, for values with at least one
+        """
+        bitmaps = self._facet(facet)
+        if not criteria:
+            return {value: bitmap_count(bitmap) for value, bitmap in bitmaps.items()}
+        selected = self.select(criteria)
+        counts = {}
+        for value, bitmap in bitmaps.items():
+            count = bitmap_count(bitmap_and(bitmap, selected))
+            if count:
+                counts[value] = count
+        return counts
+    
+    def rebuild(self, books: Iterable[Book]) -> None:
+        """Reassign rows from scratch, packing them densely."""
+        self._rows, self._row_of, self._free = [], {}, []
+        self._bitmaps = {name: {} for name in self.facets}
+        self._all = {}
+        for book in books:
+            self.add_book(book)
\ No newline at end of file
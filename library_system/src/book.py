@@ -2,6 +2,9 @@
 Book class representing a book in the library
 """
 
+from .normalize import normalize_key
+
+
 class Book:
     """Represents a book with title, author, year, genre, and ISBN."""
     
@@ -22,6 +25,58 @@ class Book:
         self.genre = genre
         self.isbn = isbn
     
+    # Text fields are properties so that assigning one drops its cached search key
+    @property
+    def title(self) -> str:
+        """The title of the book."""
+        return self._title
+    
+    @title.setter
+    def title(self, value: str) -> None:
+        self._title = value
+        self._title_key = None
+    
+    @property
+    def author(self) -> str:
+        """The author of the book."""
+        return self._author
+    
+    @author.setter
+    def author(self, value: str) -> None:
+        self._author = value
+        self._author_key = None
+    
+    @property
+    def genre(self) -> str:
+        """The genre of the book."""
+        return self._genre
+    
+    @genre.setter
+    def genre(self, value: str) -> None:
+        self._genre = value
+        self._genre_key = None
+    
+    @property
+    def title_key(self) -> str:
+        """Normalized title for case- and accent-insensitive matching, computed once."""
+        if self._title_key is None:
+            self._title_key = normalize_key(self._title)
+        return self._title_key
+    
+    @property
+    def author_key(self) -> str:
+        """Normalized author for case- and accent-insensitive matching, computed once."""
+        if self._author_key is None:
+            self._author_key = normalize_key(self._author)
+        return self._author_key
+    
+    @property
+    def genre_key(self) -> str:
+        """Normalized genre for case- and accent-insensitive matching, computed once."""
+        if self._genre_key is None:
+            self._genre_key = normalize_key(self._genre)
+        return self._genre_key
+    
     def __repr__(self):
         """Return a string representation of the book."""
         return f"Book(title='{self.title}', author='{self.author}', year={self.year}, genre='{self.genre}', isbn='{self.isbn}')"
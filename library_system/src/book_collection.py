@@ -2,8 +2,12 @@
 List-based collection for books
 """
 
-from typing import List, Union, Optional
+import random
+import weakref
+from typing import Dict, Iterable, List, Union, Optional
 from .book import Book
+from .index_dict import book_digest
+from .normalize import normalize_key
 
 
 class BookCollection:
@@ -17,6 +21,14 @@ class BookCollection:
             books: Initial list of books (optional)
         """
         self._books = books or []
+        self._read_only = False
+        # Live snapshots sharing ``_books`` (copy-on-write); every one is
+        # tracked, since an older view may outlive a newer one
+        self._snapshots = weakref.WeakSet()
+        # XOR of book digests, kept in step with the list for index audits
+        self._checksum = 0
+        for book in self._books:
+            self._checksum ^= book_digest(book)
     
     def __getitem__(self, key: Union[int, slice]) -> Union[Book, 'BookCollection']:
         """
@@ -24,7 +36,7 @@ class BookCollection:
         
         Args:
             key: Index or slice
-            
+        
         Returns:
             A single book if key is an integer, or a new BookCollection if key is a slice
         """
@@ -40,25 +52,122 @@ class BookCollection:
         """Get the number of books in the collection."""
         return len(self._books)
     
+    def __contains__(self, book: object) -> bool:
+        """Check whether a book is in the collection."""
+        return book in self._books
+    
     def __repr__(self) -> str:
         """String representation of the collection."""
         return f"BookCollection(books={self._books})"
     
+    def sample_book(self, rng=random) -> Optional[Book]:
+        """
+        Pick a book uniformly at random in O(1), without copying the collection.
+        
+        Args:
+            rng: Source of randomness (the random module or a random.Random)
+        
+        Returns:
+            A book, or None if the collection is empty
+        """
+        if not self._books:
+            return None
+        return self._books[rng.randrange(len(self._books))]
+    
+    def sample_books(self, k: int, rng=random) -> List[Book]:
+        """
+        Pick k distinct books uniformly at random in O(k).
+        
+        Args:
+            k: Number of books (all books if the collection is smaller)
+            rng: Source of randomness
+        
+        Returns:
+            List of at most k books
+        """
+        books = self._books
+        return [books[i] for i in rng.sample(range(len(books)), min(k, len(books)))]
+    
+    def snapshot(self) -> 'BookCollection':
+        """
+        Get a read-only point-in-time view of the collection.
+        
+        The view shares the underlying list; the collection copies it only on
+        the first mutation made while the view is still alive.
+        
+        Returns:
+            A read-only BookCollection
+        """
+        view = BookCollection()
+        view._books = self._books
+        view._read_only = True
+        view._checksum = self._checksum
+        self._snapshots.add(view)
+        return view
+    
+    @property
+    def read_only(self) -> bool:
+        """Whether this collection is a read-only snapshot."""
+        return self._read_only
+    
+    @property
+    def checksum(self) -> int:
+        """Order-independent checksum of the books, comparable with IndexDict.checksum()."""
+        return self._checksum
+    
+    def _prepare_write(self) -> None:
+        """Make the underlying list private to this collection before mutating it."""
+        if self._read_only:
+            raise TypeError("Cannot modify a read-only BookCollection snapshot")
+        if self._snapshots:
+            self._books = list(self._books)
+            self._snapshots = weakref.WeakSet()
+    
     def append(self, book: Book) -> None:
         """Add a book to the collection."""
+        self._prepare_write()
         self._books.append(book)
+        self._checksum ^= book_digest(book)
     
     def remove(self, book: Book) -> None:
         """Remove a book from the collection."""
-        self._books.remove(book)
+        self._prepare_write()
+        index = self._books.index(book)
+        self._checksum ^= book_digest(self._books.pop(index))
     
     def extend(self, books: List[Book]) -> None:
         """Extend the collection with multiple books."""
+        self._prepare_write()
+        start = len(self._books)
         self._books.extend(books)
+        for book in self._books[start:]:
+            self._checksum ^= book_digest(book)
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """
+        Remove and add many books in one pass over the collection.
+        
+        Args:
+            added: Books to append, in order
+            removed: Books to remove, matched by ISBN
+        """
+        self._prepare_write()
+        if removed:
+            removed_isbns = {book.isbn for book in removed}
+            kept = []
+            for book in self._books:
+                if book.isbn in removed_isbns:
+                    self._checksum ^= book_digest(book)
+                else:
+                    kept.append(book)
+            self._books = kept
+        self.extend(added)
     
     def clear(self) -> None:
         """Clear all books from the collection."""
+        self._prepare_write()
         self._books.clear()
+        self._checksum = 0
     
     def index(self, book: Book) -> int:
         """Find the index of a book in the collection."""
@@ -81,4 +190,52 @@ class BookCollection:
     def get_books_by_genre(self, genre: str) -> 'BookCollection':
         """Get all books of a specific genre."""
         matching_books = [book for book in self._books if book.genre == genre]
+        return BookCollection(books=matching_books)
+    
+    def match_genre(self, genre: str) -> 'BookCollection':
+        """Get all books of a genre, ignoring case and accents."""
+        key = normalize_key(genre)
+        matching_books = [book for book in self._books if book.genre_key == key]
+        return BookCollection(books=matching_books)
+    
+    def match_genres(self, genres: Iterable[str]) -> Dict[str, List[Book]]:
+        """
+        Get the books of several genres in one scan, ignoring case and accents.
+        
+        Args:
+            genres: Genres to look up
+        
+        Returns:
+            Dictionary of normalized genre to its books, in collection order
+        """
+        groups: Dict[str, List[Book]] = {normalize_key(genre): [] for genre in genres}
+        for book in self._books:
+            group = groups.get(book.genre_key)
+            if group is not None:
+                group.append(book)
+        return groups
+    
+    def match_titles(self, titles: Iterable[str]) -> Dict[str, List[Book]]:
+        """
+        Get the books whose title contains each of several texts, in one scan.
+        
+        Args:
+            titles: Texts to look for, ignoring case and accents
+        
+        Returns:
+            Dictionary of normalized text to matching books, in collection order
+        """
+        groups: Dict[str, List[Book]] = {normalize_key(title): [] for title in titles}
+        queries = list(groups.items())
+        for book in self._books:
+            title_key = book.title_key
+            for query, group in queries:
+                if query in title_key:
+                    group.append(book)
+        return groups
+    
+    def get_books_by_title(self, title: str) -> 'BookCollection':
+        """Get all books whose title contains the given text, ignoring case and accents."""
+        query = normalize_key(title)
+        matching_books = [book for book in self._books if query in book.title_key]
         return BookCollection(books=matching_books)
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+Synthetic catalog generator with guaranteed-unique ISBN-13s
+"""
+
+import csv
+import gzip
+import json
+import random
+from itertools import islice
+from typing import IO, Iterator, List, Optional, Sequence
+from .book import Book
+from .constants import (
+    FIRST_NAMES, LAST_NAMES, TITLE_ADJECTIVES, TITLE_NOUNS, GENRES, MIN_YEAR, MAX_YEAR
+)
+from .isbn import ISBN_BODY_SPACE, IsbnSequence
+from .workload import ZipfSampler
+
+TITLE_PATTERNS = [
+    "The {adjective} {noun}",
+    "{noun} of the {adjective} {other}",
+    "The {noun} and the {other}",
+    "{adjective} {noun}",
+    "Beyond the {adjective} {noun}",
+]
+
+CATALOG_FIELDS = ["title", "author", "year", "genre", "isbn"]
+
+
+class CatalogGenerator:
+    """Streams realistic synthetic books with unique, valid ISBN-13s."""
+    
+    def __init__(self, seed: Optional[int] = None, first_names: Sequence[str] = FIRST_NAMES,
+                 last_names: Sequence[str] = LAST_NAMES, adjectives: Sequence[str] = TITLE_ADJECTIVES,
+                 nouns: Sequence[str] = TITLE_NOUNS, genres: Sequence[str] = GENRES,
+                 min_year: int = MIN_YEAR, max_year: int = MAX_YEAR, author_skew: float = 1.0):
+        """
+        Initialize the generator.
+        
+        Args:
+            seed: Random seed; the same seed yields the same catalog
+            first_names: First names combined into author names
+            last_names: Last names combined into author names
+            adjectives: Adjectives used in title patterns
+            nouns: Nouns used in title patterns
+            genres: Genres to draw from
+            min_year: Earliest publication year
+            max_year: Latest publication year
+            author_skew: Zipf exponent of books per author (0 means uniform)
+        """
+        self.rng = random.Random(seed)
+        self.authors: List[str] = [f"{first} {last}" for first in first_names for last in last_names]
+        # Shuffle so the most prolific authors differ between seeds
+        self.rng.shuffle(self.authors)
+        self.adjectives = list(adjectives)
+        self.nouns = list(nouns)
+        self.genres = list(genres)
+        self.min_year = min_year
+        self.max_year = max_year
+        self._author_sampler = ZipfSampler(author_skew, self.rng)
+        self._isbns = IsbnSequence(self.rng.randrange(ISBN_BODY_SPACE))
+    
+    @property
+    def capacity(self) -> int:
+        """Number of distinct ISBNs the generator can produce."""
+        return self._isbns.capacity
+    
+    def isbn(self, index: int) -> str:
+        """
+        Get the ISBN assigned to the index-th generated book.
+        
+        Distinct indices always map to distinct ISBNs, so no collision check is
+        needed, and disjoint index ranges can be generated independently.
+        """
+        return self._isbns.isbn(index)
+    
+    def _title(self) -> str:
+        """Compose a title from the vocabulary."""
+        rng = self.rng
+        return rng.choice(TITLE_PATTERNS).format(
+            adjective=rng.choice(self.adjectives), noun=rng.choice(self.nouns), other=rng.choice(self.nouns)
+        )
+    
+    def book(self, index: int) -> Book:
+        """Generate the index-th book."""
+        rng = self.rng
+        return Book(
+            title=self._title(),
+            author=self.authors[self._author_sampler.sample(len(self.authors))],
+            # Skew publication years towards the present, like a real catalog
+            year=int(rng.triangular(self.min_year, self.max_year + 1, self.max_year + 1)),
+            genre=rng.choice(self.genres),
+            isbn=self.isbn(index),
+        )
+    
+    def iter_books(self, count: int, start: int = 0) -> Iterator[Book]:
+        """
+        Stream generated books.
+        
+        Args:
+            count: Number of books to generate
+            start: Index of the first book, to continue or partition a catalog
+        
+        Returns:
+            An iterator of books with distinct ISBNs
+        """
+        for index in range(start, start + count):
+            yield self.book(index)
+
+
+def _open_catalog(path: str, mode: str) -> IO[str]:
+    """Open a catalog file, gzip-compressed if its name ends with '.gz'."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def _is_jsonl(path: str) -> bool:
+    """Check whether a catalog path uses the JSON lines format."""
+    return path.removesuffix(".gz").endswith(".jsonl")
+
+
+def write_catalog(path: str, books: Iterator[Book]) -> int:
+    """
+    Write books to a CSV or JSON lines file ('.jsonl'), optionally gzipped ('.gz').
+    
+    Args:
+        path: File to write
+        books: Books to write, consumed as a stream
+    
+    Returns:
+        Number of books written
+    """
+    count = 0
+    with _open_catalog(path, "w") as catalog_file:
+        if _is_jsonl(path):
+            for book in books:
+                catalog_file.write(json.dumps([book.title, book.author, book.year, book.genre, book.isbn],
+                                              ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            writer = csv.writer(catalog_file)
+            writer.writerow(CATALOG_FIELDS)
+            for book in books:
+                writer.writerow([book.title, book.author, book.year, book.genre, book.isbn])
+                count += 1
+    return count
+
+
+def read_catalog(path: str, limit: Optional[int] = None) -> Iterator[Book]:
+    """
+    Stream books from a catalog file written by write_catalog.
+    
+    Args:
+        path: File to read
+        limit: Maximum number of books to read (all by default)
+    
+    Returns:
+        An iterator of books
+    """
+    with _open_catalog(path, "r") as catalog_file:
+        if _is_jsonl(path):
+            rows = (json.loads(line) for line in catalog_file)
+        else:
+            reader = csv.reader(catalog_file)
+            next(reader, None)
+            rows = ([title, author, int(year), genre, isbn] for title, author, year, genre, isbn in reader)
+        for title, author, year, genre, isbn in islice(rows, limit):
+            yield Book(title=title, author=author, year=year, genre=genre, isbn=isbn)
\ No newline at end of file
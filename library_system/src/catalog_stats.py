@@ -0,0 +1,115 @@
+"""
+Incrementally maintained catalog statistics and leaderboards
+"""
+
+from bisect import bisect_left, insort
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
+from .book import Book
+from .hooks import MutationHook
+
+
+class CatalogStats(MutationHook):
+    """Per-key counters and a top-k author leaderboard updated on every mutation."""
+    
+    def __init__(self):
+        """Initialize empty counters."""
+        self._genre_counts: Dict[str, int] = {}
+        self._decade_counts: Dict[int, int] = {}
+        self._author_counts: Dict[str, int] = {}
+        # count -> authors with exactly that many books (dict keeps insertion order)
+        self._authors_by_count: Dict[int, Dict[str, None]] = {}
+        # Distinct non-zero author counts in ascending order
+        self._counts: List[int] = []
+    
+    def add_book(self, book: Book) -> None:
+        """
+        Account for a book that was added to the catalog.
+        
+        Args:
+            book: The added book
+        """
+        self._increment(self._genre_counts, book.genre, 1)
+        self._increment(self._decade_counts, self.decade_of(book.year), 1)
+        self._move_author(book.author, 1)
+    
+    def remove_book(self, book: Book) -> None:
+        """
+        Account for a book that was removed from the catalog.
+        
+        Args:
+            book: The removed book
+        """
+        self._increment(self._genre_counts, book.genre, -1)
+        self._increment(self._decade_counts, self.decade_of(book.year), -1)
+        self._move_author(book.author, -1)
+    
+    @staticmethod
+    def decade_of(year: int) -> int:
+        """Return the first year of the decade containing the given year."""
+        return year // 10 * 10
+    
+    @property
+    def unique_authors(self) -> int:
+        """Number of distinct authors in the catalog."""
+        return len(self._author_counts)
+    
+    def genre_counts(self) -> Mapping[str, int]:
+        """Read-only view of the number of books per genre."""
+        return MappingProxyType(self._genre_counts)
+    
+    def decade_counts(self) -> Mapping[int, int]:
+        """Read-only view of the number of books per decade."""
+        return MappingProxyType(self._decade_counts)
+    
+    def author_count(self, author: str) -> int:
+        """Number of books by the given author."""
+        return self._author_counts.get(author, 0)
+    
+    def top_authors(self, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most prolific authors.
+        
+        Args:
+            k: Maximum number of authors to return
+        
+        Returns:
+            List of (author, book count) pairs, most prolific first
+        """
+        result: List[Tuple[str, int]] = []
+        for count in reversed(self._counts):
+            for author in self._authors_by_count[count]:
+                if len(result) >= k:
+                    return result
+                result.append((author, count))
+        return result
+    
+    @staticmethod
+    def _increment(counts: Dict, key, delta: int) -> None:
+        """Adjust a counter and drop it once it reaches zero."""
+        value = counts.get(key, 0) + delta
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+    
+    def _move_author(self, author: str, delta: int) -> None:
+        """Move an author between count buckets of the leaderboard."""
+        old = self._author_counts.get(author, 0)
+        new = old + delta
+        if new < 0:
+            return
+        if old:
+            bucket = self._authors_by_count[old]
+            del bucket[author]
+            if not bucket:
+                del self._authors_by_count[old]
+                del self._counts[bisect_left(self._counts, old)]
+        if new:
+            self._author_counts[author] = new
+            if new not in self._authors_by_count:
+                self._authors_by_count[new] = {}
+                insort(self._counts, new)
+            self._authors_by_count[new][author] = None
+        else:
+            del self._author_counts[author]
\ No newline at end of file
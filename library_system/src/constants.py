@@ -13,6 +13,20 @@ EVENT_TYPES = [
     "get_missing_book"
 ]
 
+# Additional event types available to workload profiles
+EXTRA_EVENT_TYPES = [
+    "search_isbn",
+    "checkout_book",
+    "return_book",
+    "overdue_sweep"
+]
+
+# Event types that change the catalog
+MUTATION_EVENT_TYPES = ["add_book", "remove_book"]
+
+# ISBN that is never generated, used by the 'get_missing_book' event
+MISSING_ISBN = "9999999999999"
+
 # Default simulation parameters
 DEFAULT_STEPS = 20
 DEFAULT_SEED = 42
@@ -20,8 +34,78 @@ DEFAULT_SEED = 42
 # Log format
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
+# Vocabulary of randomly generated books
+TITLES = [
+    "The Great Adventure", "Mystery of the Old House", "Journey to the Unknown",
+    "Secrets of the Forest", "Tales from the Past", "Dreams and Reality",
+    "Echoes of Time", "Shadows and Light", "Legends of Tomorrow", "Whispers in the Wind"
+]
+AUTHORS = [
+    "John Smith", "Emily Johnson", "Michael Brown", "Sarah Davis", "Robert Wilson",
+    "Jennifer Taylor", "David Anderson", "Lisa Martinez", "James Thomas", "Patricia Garcia"
+]
+MIN_YEAR = 1900
+MAX_YEAR = 2025
+
+# Default vocabulary of the synthetic catalog generator
+FIRST_NAMES = [
+    "John", "Emily", "Michael", "Sarah", "Robert", "Jennifer", "David", "Lisa", "James", "Patricia",
+    "Anna", "Ivan", "Maria", "Pavel", "Olga", "Sergey", "Elena", "Dmitry", "Natalia", "Alexei",
+    "Thomas", "Laura", "Daniel", "Sophie", "Lucas", "Chloe", "Marco", "Giulia", "Hans", "Greta",
+    "Kenji", "Yuki", "Wei", "Mei", "Arjun", "Priya", "Omar", "Leila", "Diego", "Camila",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Brown", "Davis", "Wilson", "Taylor", "Anderson", "Martinez", "Thomas", "Garcia",
+    "Ivanov", "Petrova", "Smirnov", "Kuznetsova", "Popov", "Volkova", "Sokolov", "Lebedeva", "Morozov", "Novikova",
+    "Dubois", "Laurent", "Rossi", "Bianchi", "Muller", "Schmidt", "Tanaka", "Suzuki", "Wang", "Li",
+    "Sharma", "Patel", "Haddad", "Nasser", "Lopez", "Fernandez", "OConnor", "Murphy", "Jansen", "Nowak",
+]
+TITLE_ADJECTIVES = [
+    "Great", "Old", "Silent", "Hidden", "Lost", "Golden", "Dark", "Bright", "Forgotten", "Endless",
+    "Broken", "Secret", "Distant", "Crimson", "Silver", "Frozen", "Burning", "Quiet", "Wild", "Last",
+    "First", "Sacred", "Stolen", "Empty", "Shining", "Ancient", "Restless", "Invisible", "Little", "Final",
+]
+TITLE_NOUNS = [
+    "Adventure", "House", "Forest", "River", "Garden", "Kingdom", "Journey", "Storm", "Shadow", "Light",
+    "Mountain", "City", "Island", "Letter", "Door", "Window", "Road", "Winter", "Summer", "Night",
+    "Dream", "Secret", "Voice", "Crown", "Sea", "Bridge", "Mirror", "Fire", "Memory", "Song",
+]
+
 # Supported genres
 GENRES = [
     "Fiction", "Non-Fiction", "Mystery", "Romance", "Sci-Fi",
     "Fantasy", "Biography", "History", "Self-Help", "Poetry"
-]
\ No newline at end of file
+]
+
+# Number of buffered mutations the SQLite backend writes per transaction
+SQLITE_BATCH_SIZE = 500
+
+# Largest ratio of the SQLite row id range to the row count at which random
+# row ids are probed for sampling; sparser tables are sampled by position
+SQLITE_SAMPLE_MAX_SPAN = 4
+
+# Number of books the bulk-ingest path adds to the collection and indices at once
+BULK_CHUNK_SIZE = 10000
+
+# Number of completions cached per autocomplete trie node
+AUTOCOMPLETE_CACHE_SIZE = 10
+
+# Near-duplicate detection: estimated Jaccard similarity of a duplicate pair,
+# MinHash signature length, LSH bands and characters per shingle
+DEDUP_THRESHOLD = 0.8
+DEDUP_NUM_HASHES = 32
+DEDUP_BANDS = 8
+DEDUP_SHINGLE_SIZE = 3
+
+# Loans: copies stocked of every new book and days a copy may be kept
+LOAN_DEFAULT_COPIES = 1
+LOAN_PERIOD_DAYS = 14
+
+# Estimated bytes of Book objects the tiered backend keeps in its hot tier
+TIERED_CACHE_BUDGET = 32 * 1024 * 1024
+
+# Rows per chunk of a bitmap index bitmap; each chunk is one int of at most this many bits
+BITMAP_CHUNK_ROWS = 4096
+
+# Levels of the Merkle tree used to diff catalogs; the ISBNs are split into 2**depth buckets
+MERKLE_DEPTH = 12
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Near-duplicate book detection with MinHash and locality-sensitive hashing
+"""
+
+import logging
+import os
+import random
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .book import Book
+from .constants import DEDUP_BANDS, DEDUP_NUM_HASHES, DEDUP_SHINGLE_SIZE, DEDUP_THRESHOLD
+
+# Odd 32-bit multiplier (the golden ratio) that spreads CRC-32 values before masking
+_MIX = 0x9E3779B1
+_MASK32 = 0xFFFFFFFF
+
+# Signatures are computed in worker processes only for catalogs at least this large
+PARALLEL_MIN_BOOKS = 20000
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+Signature = Tuple[int, ...]
+
+
+def normalize_text(book: Book) -> str:
+    """Get the normalized title and author of a book, with punctuation dropped."""
+    return " ".join(_NON_WORD.sub(" ", f"{book.title_key} {book.author_key}").split())
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> List[int]:
+    """Get the distinct mixed CRC-32 hashes of the character shingles of a text."""
+    grams = {text[i:i + size] for i in range(len(text) - size + 1)} or {text}
+    return [zlib.crc32(gram.encode()) * _MIX & _MASK32 for gram in grams]
+
+
+def hash_masks(num_hashes: int, seed: int = 0) -> List[int]:
+    """Draw the random 32-bit masks that turn one shingle hash into num_hashes hash functions."""
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(num_hashes)]
+
+
+def minhash_signatures(texts: Sequence[str], masks: Sequence[int],
+                       shingle_size: int = DEDUP_SHINGLE_SIZE) -> List[Signature]:
+    """
+    Compute the MinHash signature of each text.
+    
+    Hash function i is the shingle hash XOR masks[i]: one XOR per shingle and
+    function, far cheaper in pure Python than affine hashing modulo a prime,
+    with the same accuracy once the shingle hashes are well mixed. A
+    module-level function so that worker processes can run it on chunks.
+    
+    Args:
+        texts: Normalized texts
+        masks: Hash function masks from hash_masks
+        shingle_size: Characters per shingle
+    
+    Returns:
+        One signature (a tuple of minimum hash values) per text
+    """
+    signatures = []
+    for text in texts:
+        hashes = shingles(text, shingle_size)
+        signatures.append(tuple([min([x ^ mask for x in hashes]) for mask in masks]))
+    return signatures
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimate the Jaccard similarity of two shingle sets from their signatures."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class _DisjointSet:
+    """Union-find over 0..n-1 with path halving."""
+    
+    def __init__(self, size: int):
+        """Initialize singleton sets."""
+        self.parent = list(range(size))
+    
+    def find(self, item: int) -> int:
+        """Get the representative of an item's set."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, first: int, second: int) -> None:
+        """Merge the sets of two items."""
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+
+class DuplicateFinder:
+    """
+    Finds clusters of books whose normalized title and author are near-identical.
+    
+    Each book gets a MinHash signature over the character shingles of its
+    normalized title and author. The signature is cut into bands; books
+    sharing any band land in the same LSH bucket, which acts as a blocking
+    key, so only books that probably match are ever compared. Candidates
+    whose estimated similarity reaches the threshold are merged with
+    union-find. The whole pass is near-linear in the catalog size and
+    never modifies the books.
+    """
+    
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_hashes: int = DEDUP_NUM_HASHES,
+                 bands: int = DEDUP_BANDS, shingle_size: int = DEDUP_SHINGLE_SIZE, seed: int = 0):
+        """
+        Initialize the finder.
+        
+        Args:
+            threshold: Minimum estimated Jaccard similarity of a duplicate pair
+            num_hashes: Length of the MinHash signatures
+            bands: Number of LSH bands; num_hashes must be divisible by it
+            shingle_size: Characters per shingle
+            seed: Seed of the hash functions
+        """
+        if num_hashes % bands:
+            raise ValueError(f"num_hashes ({num_hashes}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.shingle_size = shingle_size
+        self.masks = hash_masks(num_hashes, seed)
+        self.logger = logging.getLogger(__name__)
+    
+    def signatures(self, texts: List[str], workers: Optional[int] = None) -> List[Signature]:
+        """
+        Compute the signatures of many texts, in parallel for large inputs.
+        
+        Args:
+            texts: Normalized texts
+            workers: Number of worker processes (all cores by default; 1 disables the pool)
+        
+        Returns:
+            One signature per text, in order
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(texts) < PARALLEL_MIN_BOOKS:
+            return minhash_signatures(texts, self.masks, self.shingle_size)
+        chunk_size = -(-len(texts) // (workers * 4))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(minhash_signatures, chunks, [self.masks] * len(chunks),
+                                   [self.shingle_size] * len(chunks))
+            return [signature for chunk in results for signature in chunk]
+    
+    def find(self, books: Iterable[Book], workers: Optional[int] = None) -> List[List[Book]]:
+        """
+        Find clusters of near-duplicate books.
+        
+        Args:
+            books: Books to check
+            workers: Number of worker processes for the signatures
+        
+        Returns:
+            Clusters of two or more books, largest first; each cluster keeps catalog order
+        """
+        book_list = list(books)
+        # Books with the same normalized text are duplicates outright and share one signature
+        text_ids: Dict[str, int] = {}
+        book_text = [text_ids.setdefault(normalize_text(book), len(text_ids)) for book in book_list]
+        signatures = self.signatures(list(text_ids), workers)
+        
+        clusters = _DisjointSet(len(text_ids))
+        candidates = 0
+        for band in range(self.bands):
+            start = band * self.rows
+            buckets: Dict[Signature, List[int]] = {}
+            for position, signature in enumerate(signatures):
+                buckets.setdefault(signature[start:start + self.rows], []).append(position)
+            for members in buckets.values():
+                # Comparing with the bucket's first member keeps large buckets linear;
+                # comparing cluster representatives stops chains of small differences
+                # from merging unrelated books
+                first = members[0]
+                for other in members[1:]:
+                    root, other_root = clusters.find(first), clusters.find(other)
+                    if root == other_root:
+                        continue
+                    candidates += 1
+                    if similarity(signatures[root], signatures[other_root]) >= self.threshold:
+                        clusters.union(root, other_root)
+        
+        groups: Dict[int, List[Book]] = {}
+        for book, text_id in zip(book_list, book_text):
+            groups.setdefault(clusters.find(text_id), []).append(book)
+        result = sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
+        self.logger.info(f"Checked {candidates} candidate pairs among {len(book_list)} books, "
+                         f"found {len(result)} duplicate clusters")
+        return result
+
+
+def format_duplicates(clusters: List[List[Book]], limit: int = 20) -> str:
+    """Format duplicate clusters as merge candidates, one block per cluster."""
+    lines = [f"Found {len(clusters)} clusters of possible duplicates"]
+    for cluster in clusters[:limit]:
+        lines.append(f"  {len(cluster)} books:")
+        lines.extend(f"    {book.isbn}: {book.title} by {book.author} ({book.year})" for book in cluster)
+    if len(clusters) > limit:
+        lines.append(f"  ... and {len(clusters) - limit} more")
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Discrete-event simulation of a library serving Poisson arrivals, for capacity planning
+"""
+
+import heapq
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Union
+from .catalog_generator import read_catalog
+from .library import Library
+from .simulation import execute_event
+from .storage import StorageBackend
+from .workload import WorkloadGenerator, WorkloadProfile
+
+# Response-time percentiles included in reports
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Get the nearest-rank q-th percentile of an ascending list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(len(sorted_values) * q / 100 + 0.5), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summarize(response_times: List[float]) -> Dict[str, float]:
+    """Get the count, mean and percentiles of response times in seconds."""
+    ordered = sorted(response_times)
+    summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered) if ordered else 0.0}
+    for q in PERCENTILES:
+        summary[f"p{q}"] = percentile(ordered, q)
+    return summary
+
+
+def run_discrete_event(arrival_rate: float, duration: float, servers: int = 1, seed: Optional[int] = None,
+                       backend: Union[str, StorageBackend, None] = None, workload: Optional[WorkloadProfile] = None,
+                       catalog_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Simulate a library answering requests that arrive at random over simulated time.
+    
+    Requests arrive as a Poisson process of the given total rate; each is an
+    event of the workload, so every event type arrives as its own Poisson
+    stream with a rate proportional to its weight. Requests wait in one FIFO
+    queue for the first of `servers` identical servers. The simulated clock
+    jumps from arrival to arrival, while each request's service time is
+    measured by executing it against a real Library when it starts service,
+    so queueing delay reflects what this library and backend actually cost.
+    
+    Args:
+        arrival_rate: Mean requests per simulated second, over all event types
+        duration: Simulated seconds during which requests arrive
+        servers: Number of requests served at once
+        seed: Random seed for the arrivals and the events
+        backend: Storage backend name or instance (defaults to in-memory)
+        workload: Workload profile giving the event mix (uniform by default);
+            its initial books are added before the clock starts
+        catalog_path: Catalog file bulk-loaded into the library first (optional)
+    
+    Returns:
+        Report with the arrival rate, duration ('makespan' includes draining the
+        queue), request counts, throughput, utilization, mean and maximum queue
+        length seen by arriving requests, and response-time summaries ('mean',
+        'p50', 'p90', 'p99' seconds) overall and per event type
+    """
+    if arrival_rate <= 0 or duration <= 0 or servers < 1:
+        raise ValueError("arrival_rate and duration must be positive and servers at least 1")
+    if seed is not None:
+        random.seed(seed)
+    library = Library(name="Discrete-Event Library", backend=backend)
+    if catalog_path:
+        library.add_books(read_catalog(catalog_path))
+    generator = WorkloadGenerator(workload or WorkloadProfile())
+    for event in generator.initial_events():
+        execute_event(library, event)
+    
+    clock = time.perf_counter
+    # Simulated times at which each server next becomes free
+    free_at = [0.0] * servers
+    # Service start times of the requests still waiting, as seen by the latest arrival
+    waiting: List[float] = []
+    busy = 0.0
+    queue_total = queue_max = 0
+    response_times: List[float] = []
+    per_type: Dict[str, List[float]] = {}
+    
+    now = random.expovariate(arrival_rate)
+    while now < duration:
+        event = generator.next_event(library)
+        start = max(now, heapq.heappop(free_at))
+        while waiting and waiting[0] <= now:
+            heapq.heappop(waiting)
+        queue_total += len(waiting)
+        queue_max = max(queue_max, len(waiting))
+        if start > now:
+            heapq.heappush(waiting, start)
+        
+        service_start = clock()
+        execute_event(library, event)
+        service = clock() - service_start
+        
+        heapq.heappush(free_at, start + service)
+        busy += service
+        response_times.append(start + service - now)
+        per_type.setdefault(event[0], []).append(start + service - now)
+        now += random.expovariate(arrival_rate)
+    library.close()
+    
+    requests = len(response_times)
+    makespan = max(duration, *free_at)
+    report = {
+        "arrival_rate": arrival_rate,
+        "servers": servers,
+        "duration": duration,
+        "makespan": makespan,
+        "requests": requests,
+        "throughput": requests / makespan,
+        "utilization": busy / (servers * makespan),
+        "mean_queue": queue_total / requests if requests else 0.0,
+        "max_queue": queue_max,
+        "response": _summarize(response_times),
+        "per_type": {event_type: _summarize(times) for event_type, times in sorted(per_type.items())},
+    }
+    logging.info(f"Discrete-event run: {requests} requests at {arrival_rate}/s, "
+                 f"utilization {report['utilization']:.1%}")
+    return report
+
+
+def format_queueing_report(report: Dict[str, Any]) -> str:
+    """Format a discrete-event report as a summary and a per-event-type table in milliseconds."""
+    lines = [
+        f"Arrival rate {report['arrival_rate']:g}/s over {report['duration']:g}s simulated "
+        f"({report['servers']} server{'s' if report['servers'] != 1 else ''})",
+        f"  requests       {report['requests']:>10}",
+        f"  throughput     {report['throughput']:>10.1f} /s",
+        f"  utilization    {report['utilization']:>10.1%}",
+        f"  queue length   {report['mean_queue']:>10.2f} mean, {report['max_queue']} max",
+        f"  makespan       {report['makespan']:>10.3f} s",
+        "",
+        f"  {'response (ms)':<18}{'count':>8}{'mean':>10}" + "".join(f"{'p' + str(q):>10}" for q in PERCENTILES),
+    ]
+    rows = [("all", report["response"]), *report["per_type"].items()]
+    for label, summary in rows:
+        lines.append(f"  {label:<18}{summary['count']:>8}{summary['mean'] * 1e3:>10.3f}"
+                     + "".join(f"{summary['p' + str(q)] * 1e3:>10.3f}" for q in PERCENTILES))
+    return "\n".join(lines)
\ No newline at end of file
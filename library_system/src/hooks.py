@@ -0,0 +1,61 @@
+"""
+Mutation hook API for structures maintained alongside a library
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, List, Tuple
+from .book import Book
+
+
+class MutationHook(ABC):
+    """Abstract base class for structures that follow a library's adds and removes."""
+    
+    @abstractmethod
+    def add_book(self, book: Book) -> None:
+        """Account for a book that was added to the library."""
+        pass
+    
+    @abstractmethod
+    def remove_book(self, book: Book) -> None:
+        """Account for a book that was removed from the library."""
+        pass
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """Account for many books added at once."""
+        for book in books:
+            self.add_book(book)
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> Callable[[], None]:
+        """
+        Account for the net changes of a library batch, removals first.
+        
+        Books are applied one at a time and each step is recorded with its
+        inverse, so if a step raises, the steps already taken are undone
+        before the error propagates and the hook is left as it was before
+        the batch. Hooks with a cheaper way to apply or undo a whole batch
+        may override this.
+        
+        Args:
+            added: Books added by the batch
+            removed: Books removed by the batch
+        
+        Returns:
+            Function that undoes the batch, for when a later structure fails
+        """
+        applied: List[Tuple[Callable[[Book], None], Book]] = []
+        
+        def undo() -> None:
+            for inverse, book in reversed(applied):
+                inverse(book)
+        
+        try:
+            for book in removed:
+                self.remove_book(book)
+                applied.append((self.add_book, book))
+            for book in added:
+                self.add_book(book)
+                applied.append((self.remove_book, book))
+        except Exception:
+            undo()
+            raise
+        return undo
\ No newline at end of file
@@ -3,8 +3,57 @@ Dictionary-based collection for indexing books by ISBN, author, and year
 """
 
 import logging
-from typing import Dict, List, Any, Union
+import random
+import weakref
+from typing import Dict, Iterable, List, Any, Optional, Union
 from .book import Book
+from .secondary_index import SecondaryIndex
+
+# Bucketed indices and the book attribute each one is keyed by
+BUCKET_ATTRIBUTES = {'author': 'author', 'year': 'year'}
+
+
+def book_digest(book: Book) -> int:
+    """
+    Get a 64-bit digest of the indexed fields of a book.
+    
+    Digests are combined with XOR into order-independent checksums that can be
+    updated in O(1) as books are added and removed.
+    """
+    return hash((book.isbn, book.author, book.year)) & 0xFFFFFFFFFFFFFFFF
+
+
+class IndexReport:
+    """Result of checking the indices against a book collection."""
+    
+    def __init__(self, drifted: Iterable[str] = (), missing: Iterable[str] = (),
+                 stale: Iterable[str] = (), bucket_errors: Iterable[tuple] = (),
+                 full: bool = True):
+        """
+        Initialize the report.
+        
+        Args:
+            drifted: Names of the indices that disagree with the collection
+            missing: ISBNs in the collection but not in the ISBN index
+            stale: ISBNs in the ISBN index but not in the collection
+            bucket_errors: (index_type, key, isbn) entries that are missing or misplaced
+            full: False if only the checksum audit was run
+        """
+        self.drifted = sorted(set(drifted))
+        self.missing = list(missing)
+        self.stale = list(stale)
+        self.bucket_errors = list(bucket_errors)
+        self.full = full
+    
+    @property
+    def consistent(self) -> bool:
+        """Whether no drift was found."""
+        return not self.drifted
+    
+    def __repr__(self) -> str:
+        """String representation of the report."""
+        return (f"IndexReport(drifted={self.drifted}, missing={len(self.missing)}, "
+                f"stale={len(self.stale)}, bucket_errors={len(self.bucket_errors)}, full={self.full})")
 
 
 class IndexDict:
@@ -17,6 +66,22 @@ class IndexDict:
             'author': {},    # Author -> List of Books
             'year': {}       # Year -> List of Books
         }
+        self._read_only = False
+        # Copy-on-write state: the live snapshots that may share our dicts and
+        # buckets (all of them, since an older view may outlive a newer one),
+        # whether the top-level dicts were copied since, and the buckets copied since
+        self._snapshots = weakref.WeakSet()
+        self._detached = False
+        self._owned_buckets = set()
+        # XOR of book digests per index, for the fast consistency audit
+        self._checksums = {name: 0 for name in self._indices}
+        # Every book of the ISBN index in no particular order, and the position
+        # of each ISBN in it; removals swap the last book into the hole, so
+        # uniform sampling is one random index into a dense list
+        self._pool: List[Book] = []
+        self._slots: Dict[str, int] = {}
+        # User-defined secondary indexes by name, maintained by Library hooks
+        self._secondary: Dict[str, SecondaryIndex] = {}
         self.logger = logging.getLogger(__name__)
     
     def __getitem__(self, key: Union[str, tuple]) -> Any:
@@ -24,15 +89,18 @@ class IndexDict:
         Get indexed items by key.
         
         Args:
-            key: Either a string (for ISBN lookup) or a tuple (index_type, value)
-            
+            key: Either a string (for ISBN lookup) or a tuple (index_type, value),
+                where index_type may also name a registered secondary index
+        
         Returns:
-            A book (for ISBN) or list of books (for author/year)
+            A book (for ISBN) or bucket of books (for author/year/secondary indexes)
         """
         if isinstance(key, tuple) and len(key) == 2:
             index_type, value = key
             if index_type in self._indices:
                 return self._indices[index_type].get(value, [])
+            if index_type in self._secondary:
+                return self._secondary[index_type].get(value)
         elif isinstance(key, str):
             # Assume it's an ISBN lookup
             return self._indices['isbn'].get(key)
@@ -46,14 +114,24 @@ class IndexDict:
             key: Either a string (for ISBN) or a tuple (index_type, value)
             value: A book or list of books
         """
+        self._prepare_write()
         if isinstance(key, tuple) and len(key) == 2:
             index_type, index_key = key
             if index_type in self._indices:
+                self._retire_entry(index_type, self._indices[index_type].get(index_key))
                 self._indices[index_type][index_key] = value
+                self._admit_entry(index_type, value)
+                if index_type == 'isbn':
+                    self._pool_book(value)
+                if self._snapshots:
+                    self._owned_buckets.add((index_type, index_key))
                 self.logger.info(f"Updated {index_type} index for '{index_key}'")
         elif isinstance(key, str):
             # Assume it's an ISBN
+            self._retire_entry('isbn', self._indices['isbn'].get(key))
             self._indices['isbn'][key] = value
+            self._admit_entry('isbn', value)
+            self._pool_book(value)
             self.logger.info(f"Added ISBN index for '{key}'")
     
     def __iter__(self):
@@ -72,6 +150,58 @@ class IndexDict:
             total += len(index_map)
         return total
     
+    def snapshot(self) -> 'IndexDict':
+        """
+        Get a read-only point-in-time view of the indices.
+        
+        The view shares the index dicts and buckets; they are copied lazily by
+        the first mutation that touches them while the view is still alive.
+        
+        Returns:
+            A read-only IndexDict
+        """
+        view = IndexDict()
+        view._indices = self._indices
+        view._read_only = True
+        view._checksums = dict(self._checksums)
+        view._pool, view._slots = self._pool, self._slots
+        # Secondary indexes are not copy-on-write, so snapshots leave them out
+        self._snapshots.add(view)
+        self._detached = False
+        return view
+    
+    @property
+    def read_only(self) -> bool:
+        """Whether this index is a read-only snapshot."""
+        return self._read_only
+    
+    def _prepare_write(self) -> None:
+        """Stop sharing the top-level index dicts with a live snapshot."""
+        if self._read_only:
+            raise TypeError("Cannot modify a read-only IndexDict snapshot")
+        if not self._snapshots:
+            # Every snapshot is gone, so nothing is shared any more
+            self._owned_buckets = set()
+        elif not self._detached:
+            self._indices = {name: dict(index_map) for name, index_map in self._indices.items()}
+            self._pool, self._slots = list(self._pool), dict(self._slots)
+            self._owned_buckets = set()
+            self._detached = True
+    
+    def _writable_bucket(self, index_type: str, key: Any) -> List[Book]:
+        """Get a bucket that may be mutated in place, creating or copying it if needed."""
+        index_map = self._indices[index_type]
+        bucket = index_map.get(key)
+        if bucket is None:
+            bucket = index_map[key] = []
+        elif self._snapshots and (index_type, key) not in self._owned_buckets:
+            bucket = index_map[key] = list(bucket)
+        else:
+            return bucket
+        if self._snapshots:
+            self._owned_buckets.add((index_type, key))
+        return bucket
+    
     def add_book(self, book: Book) -> None:
         """
         Add a book to all indices.
@@ -79,20 +209,41 @@ class IndexDict:
         Args:
             book: The book to add to indices
         """
+        self._prepare_write()
+        self._index_book(book)
+        self.logger.info(f"Indexed book: {book.title} by {book.author} ({book.year})")
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """
+        Add many books to all indices, logging once.
+        
+        Args:
+            books: The books to add to indices
+        """
+        self._prepare_write()
+        count = 0
+        for book in books:
+            self._index_book(book)
+            count += 1
+        self.logger.info(f"Indexed {count} books")
+    
+    def _index_book(self, book: Book) -> None:
+        """Add a book to every index; the caller has prepared for writing."""
+        digest = book_digest(book)
+        
         # Add to ISBN index
+        self._retire_entry('isbn', self._indices['isbn'].get(book.isbn))
         self._indices['isbn'][book.isbn] = book
+        self._checksums['isbn'] ^= digest
+        self._pool_book(book)
         
         # Add to author index
-        if book.author not in self._indices['author']:
-            self._indices['author'][book.author] = []
-        self._indices['author'][book.author].append(book)
+        self._writable_bucket('author', book.author).append(book)
+        self._checksums['author'] ^= digest
         
         # Add to year index
-        if book.year not in self._indices['year']:
-            self._indices['year'][book.year] = []
-        self._indices['year'][book.year].append(book)
-        
-        self.logger.info(f"Indexed book: {book.title} by {book.author} ({book.year})")
+        self._writable_bucket('year', book.year).append(book)
+        self._checksums['year'] ^= digest
     
     def remove_book(self, book: Book) -> None:
         """
@@ -101,35 +252,168 @@ class IndexDict:
         Args:
             book: The book to remove from indices
         """
+        self._prepare_write()
+        
         # Remove from ISBN index
         if book.isbn in self._indices['isbn']:
-            del self._indices['isbn'][book.isbn]
-        
-        # Remove from author index
-        if book.author in self._indices['author']:
-            self._indices['author'][book.author] = [
-                b for b in self._indices['author'][book.author] if b != book
-            ]
-            if not self._indices['author'][book.author]:  # If list is empty, remove key
-                del self._indices['author'][book.author]
-        
-        # Remove from year index
-        if book.year in self._indices['year']:
-            self._indices['year'][book.year] = [
-                b for b in self._indices['year'][book.year] if b != book
-            ]
-            if not self._indices['year'][book.year]:  # If list is empty, remove key
-                del self._indices['year'][book.year]
+            self._retire_entry('isbn', self._indices['isbn'].pop(book.isbn))
+            self._unpool(book.isbn)
+        
+        # Remove from author and year indices
+        for index_type, attribute in BUCKET_ATTRIBUTES.items():
+            index_map = self._indices[index_type]
+            key = getattr(book, attribute)
+            if key in index_map:
+                bucket = index_map[key]
+                index_map[key] = [b for b in bucket if b != book]
+                if len(index_map[key]) != len(bucket):
+                    self._retire_entry(index_type, [b for b in bucket if b == book])
+                if not index_map[key]:  # If list is empty, remove key
+                    del index_map[key]
         
         self.logger.info(f"Removed book from index: {book.title} by {book.author} ({book.year})")
     
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """
+        Remove and add many books, filtering each affected bucket only once.
+        
+        Args:
+            added: Books to add to indices
+            removed: Books to remove from indices, matched by ISBN
+        """
+        self._prepare_write()
+        removed_isbns = {book.isbn for book in removed}
+        isbn_index = self._indices['isbn']
+        for isbn in removed_isbns:
+            if isbn in isbn_index:
+                self._retire_entry('isbn', isbn_index.pop(isbn))
+                self._unpool(isbn)
+        
+        for index_type, attribute in BUCKET_ATTRIBUTES.items():
+            index_map = self._indices[index_type]
+            for key in {getattr(book, attribute) for book in removed}:
+                bucket = index_map.get(key)
+                if bucket is None:
+                    continue
+                kept = [b for b in bucket if b.isbn not in removed_isbns]
+                if len(kept) == len(bucket):
+                    continue
+                self._retire_entry(index_type, [b for b in bucket if b.isbn in removed_isbns])
+                if kept:
+                    index_map[key] = kept
+                else:
+                    del index_map[key]
+        
+        for book in added:
+            self._index_book(book)
+    
+    def _pool_book(self, book: Book) -> None:
+        """Put a book of the ISBN index into the sampling pool, replacing any book with its ISBN."""
+        slot = self._slots.get(book.isbn)
+        if slot is None:
+            self._slots[book.isbn] = len(self._pool)
+            self._pool.append(book)
+        else:
+            self._pool[slot] = book
+    
+    def _unpool(self, isbn: str) -> None:
+        """Take an ISBN out of the sampling pool by moving the last book into its slot."""
+        slot = self._slots.pop(isbn)
+        last = self._pool.pop()
+        if last.isbn != isbn:
+            self._pool[slot] = last
+            self._slots[last.isbn] = slot
+    
+    def sample_book(self, rng=random) -> Optional[Book]:
+        """
+        Pick an indexed book uniformly at random in O(1).
+        
+        Args:
+            rng: Source of randomness (the random module or a random.Random)
+        
+        Returns:
+            A book, or None if nothing is indexed
+        """
+        if not self._pool:
+            return None
+        return self._pool[rng.randrange(len(self._pool))]
+    
+    def sample_books(self, k: int, rng=random) -> List[Book]:
+        """
+        Pick k distinct indexed books uniformly at random in O(k).
+        
+        Args:
+            k: Number of books (all books if fewer are indexed)
+            rng: Source of randomness
+        
+        Returns:
+            List of at most k books
+        """
+        pool = self._pool
+        return [pool[i] for i in rng.sample(range(len(pool)), min(k, len(pool)))]
+    
+    def sample_key(self, index_type: str, rng=random) -> Any:
+        """
+        Pick a key of an index with probability proportional to its bucket size, in O(1).
+        
+        The key of a uniformly sampled book is exactly such a draw, so e.g. an
+        author with ten books is picked ten times as often as one with one.
+        
+        Args:
+            index_type: 'author', 'year' or 'isbn' (uniform over ISBNs)
+            rng: Source of randomness
+        
+        Returns:
+            A key of the index, or None if nothing is indexed
+        """
+        if index_type == 'isbn':
+            attribute = 'isbn'
+        elif index_type in BUCKET_ATTRIBUTES:
+            attribute = BUCKET_ATTRIBUTES[index_type]
+        else:
+            raise KeyError(f"Invalid key: {index_type}")
+        book = self.sample_book(rng)
+        return getattr(book, attribute) if book is not None else None
+    
+    def register_index(self, index: SecondaryIndex) -> None:
+        """
+        Register a secondary index for lookups through __getitem__.
+        
+        Args:
+            index: The index to register; its name must not clash with another index
+        """
+        if index.name in self._indices or index.name in self._secondary:
+            raise ValueError(f"Index '{index.name}' already exists")
+        self._secondary[index.name] = index
+        self.logger.info(f"Registered secondary index '{index.name}'")
+    
+    def unregister_index(self, name: str) -> SecondaryIndex:
+        """
+        Unregister a secondary index.
+        
+        Args:
+            name: Name of the index
+        
+        Returns:
+            The removed index
+        """
+        if name not in self._secondary:
+            raise KeyError(f"No secondary index named '{name}'")
+        self.logger.info(f"Unregistered secondary index '{name}'")
+        return self._secondary.pop(name)
+    
+    @property
+    def secondary_indices(self) -> Dict[str, SecondaryIndex]:
+        """Registered secondary indexes by name."""
+        return dict(self._secondary)
+    
     def get_by_isbn(self, isbn: str) -> Book:
         """
         Get a book by ISBN.
         
         Args:
             isbn: The ISBN to look up
-            
+        
         Returns:
             The book with the given ISBN
         """
@@ -141,7 +425,7 @@ class IndexDict:
         
         Args:
             author: The author to look up
-            
+        
         Returns:
             List of books by the author
         """
@@ -153,12 +437,38 @@ class IndexDict:
         
         Args:
             year: The year to look up
-            
+        
         Returns:
             List of books published in the year
         """
         return self._indices['year'].get(year, [])
     
+    def get_by_authors(self, authors: Iterable[str]) -> Dict[str, List[Book]]:
+        """
+        Get the books of several authors at once.
+        
+        Args:
+            authors: Authors to look up
+        
+        Returns:
+            Dictionary of author to their books
+        """
+        index = self._indices['author']
+        return {author: index.get(author, []) for author in authors}
+    
+    def get_by_years(self, years: Iterable[int]) -> Dict[int, List[Book]]:
+        """
+        Get the books of several years at once.
+        
+        Args:
+            years: Years to look up
+        
+        Returns:
+            Dictionary of year to the books published in it
+        """
+        index = self._indices['year']
+        return {year: index.get(year, []) for year in years}
+    
     def get_all_indices(self) -> Dict[str, Dict]:
         """
         Get all indices.
@@ -168,6 +478,158 @@ class IndexDict:
         """
         return self._indices.copy()
     
-    def update_index(self) -> None:
-        """Update the index (placeholder for future functionality)."""
-        self.logger.info("Index updated")
\ No newline at end of file
+    def checksum(self, index_type: str) -> int:
+        """Get the incremental checksum of one index."""
+        return self._checksums[index_type]
+    
+    def _admit_entry(self, index_type: str, entry: Union[Book, List[Book], None]) -> None:
+        """Fold a stored ISBN entry or bucket into the index checksum."""
+        self._checksums[index_type] ^= self._entry_digest(entry)
+    
+    # XOR is its own inverse, so retiring an entry is the same operation
+    _retire_entry = _admit_entry
+    
+    @staticmethod
+    def _entry_digest(entry: Union[Book, List[Book], None]) -> int:
+        """Get the combined digest of an ISBN entry or bucket."""
+        if entry is None:
+            return 0
+        if isinstance(entry, Book):
+            return book_digest(entry)
+        digest = 0
+        for book in entry:
+            digest ^= book_digest(book)
+        return digest
+    
+    def audit(self, books) -> IndexReport:
+        """
+        Cheaply check the indices against a collection using checksums.
+        
+        Runs in O(1): it compares the incrementally maintained checksums of
+        each index with the checksum of the collection.
+        
+        Args:
+            books: The BookCollection the indices should describe
+        
+        Returns:
+            An IndexReport listing the drifted indices
+        """
+        drifted = [name for name, value in self._checksums.items() if value != books.checksum]
+        if len(self._indices['isbn']) != len(books):
+            drifted.append('isbn')
+        return IndexReport(drifted=drifted, full=False)
+    
+    def verify(self, books) -> IndexReport:
+        """
+        Check every index entry against a collection.
+        
+        Args:
+            books: The BookCollection the indices should describe
+        
+        Returns:
+            An IndexReport describing all drift found
+        """
+        expected = {book.isbn: book for book in books}
+        isbn_index = self._indices['isbn']
+        missing = [isbn for isbn in expected if isbn not in isbn_index]
+        stale = [isbn for isbn in isbn_index if isbn not in expected]
+        drifted = ['isbn'] if missing or stale else []
+        
+        bucket_errors = []
+        for index_type, attribute in BUCKET_ATTRIBUTES.items():
+            seen = set()
+            for key, bucket in self._indices[index_type].items():
+                for book in bucket:
+                    if book.isbn not in expected or getattr(book, attribute) != key:
+                        bucket_errors.append((index_type, key, book.isbn))
+                    seen.add(book.isbn)
+            for isbn, book in expected.items():
+                if isbn not in seen:
+                    bucket_errors.append((index_type, getattr(book, attribute), isbn))
+            if any(error[0] == index_type for error in bucket_errors):
+                drifted.append(index_type)
+        
+        return IndexReport(drifted=drifted, missing=missing, stale=stale, bucket_errors=bucket_errors)
+    
+    @staticmethod
+    def _build_index(books: List[Book], index_type: str) -> Dict[Any, Any]:
+        """Build one index from scratch."""
+        if index_type == 'isbn':
+            return {book.isbn: book for book in books}
+        attribute = BUCKET_ATTRIBUTES[index_type]
+        index_map: Dict[Any, List[Book]] = {}
+        for book in books:
+            key = getattr(book, attribute)
+            bucket = index_map.get(key)
+            if bucket is None:
+                index_map[key] = [book]
+            else:
+                bucket.append(book)
+        return index_map
+    
+    def rebuild(self, books) -> None:
+        """
+        Rebuild every index from a collection in one pass.
+        
+        The new dicts and buckets are allocated at their exact size, so this
+        also compacts anything left fragmented by removals.
+        
+        Args:
+            books: The BookCollection to index
+        """
+        self._prepare_write()
+        book_list = list(books)
+        indices = {name: self._build_index(book_list, name) for name in self._indices}
+        
+        # Fresh dicts are not shared with any snapshot
+        self._indices = indices
+        self._pool = list(indices['isbn'].values())
+        self._slots = {isbn: slot for slot, isbn in enumerate(indices['isbn'])}
+        self._snapshots = weakref.WeakSet()
+        self._owned_buckets = set()
+        checksum = self._entry_digest(book_list)
+        self._checksums = {name: checksum for name in self._indices}
+        for index in self._secondary.values():
+            index.rebuild(book_list)
+        self.logger.info(f"Rebuilt indices for {len(book_list)} books")
+    
+    def compact(self) -> None:
+        """Drop empty buckets and re-allocate dicts and buckets at their exact size."""
+        self._prepare_write()
+        self._indices = {
+            name: {key: (list(entry) if isinstance(entry, list) else entry)
+                   for key, entry in index_map.items() if entry}
+            for name, index_map in self._indices.items()
+        }
+        self._pool, self._slots = list(self._pool), dict(self._slots)
+        self._snapshots = weakref.WeakSet()
+        self._owned_buckets = set()
+        self.logger.info("Compacted indices")
+    
+    def update_index(self, books=None, audit_only: bool = False) -> Optional[IndexReport]:
+        """
+        Check the indices against a collection and rebuild them.
+        
+        Args:
+            books: The BookCollection the indices should describe; without it
+                the indices can only be compacted
+            audit_only: Only run the O(1) checksum audit, without rebuilding
+        
+        Returns:
+            An IndexReport, or None if no collection was given
+        """
+        if books is None:
+            self.compact()
+            return None
+        
+        if audit_only:
+            report = self.audit(books)
+        else:
+            report = self.verify(books)
+            self.rebuild(books)
+        
+        if report.consistent:
+            self.logger.info("Index updated, no drift found")
+        else:
+            self.logger.warning(f"Index drift detected: {report}")
+        return report
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Collision-free ISBN-13 sequences shared by the catalog generator and the simulation
+"""
+
+# ISBN-13 prefixes (EAN "Bookland") and the size of the 9-digit space behind each
+ISBN_PREFIXES = ("978", "979")
+ISBN_BODY_SPACE = 10 ** 9
+# 3 ** 18 is coprime with 10 ** 9, so i -> i * stride mod 10 ** 9 is a bijection
+# that scatters consecutive indices across the ISBN space
+ISBN_STRIDE = 387420489
+
+
+def isbn13_check_digit(first_twelve: str) -> str:
+    """Compute the ISBN-13 check digit for the first twelve digits."""
+    total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(first_twelve))
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_isbn13(isbn: str) -> bool:
+    """Check the length, digits and check digit of an ISBN-13."""
+    return len(isbn) == 13 and isbn.isdigit() and isbn13_check_digit(isbn[:12]) == isbn[12]
+
+
+class IsbnSequence:
+    """
+    Valid ISBN-13s by index, distinct for distinct indices.
+    
+    The index is mapped through a bijection of the ISBN space, shifted by an
+    offset, so consecutive books get scattered ISBNs without any collision
+    check. Two sequences with different offsets only collide for one
+    particular distance between indices, about a billion apart on average.
+    """
+    
+    def __init__(self, offset: int = 0):
+        """
+        Initialize the sequence.
+        
+        Args:
+            offset: Shift of the bijection, e.g. drawn from a seeded random generator
+        """
+        self.offset = offset % ISBN_BODY_SPACE
+        self._next = 0
+    
+    def restart(self, offset: int = 0) -> None:
+        """Hand out ISBNs from index 0 again, with a new offset."""
+        self.offset = offset % ISBN_BODY_SPACE
+        self._next = 0
+    
+    @property
+    def capacity(self) -> int:
+        """Number of distinct ISBNs the sequence can produce."""
+        return len(ISBN_PREFIXES) * ISBN_BODY_SPACE
+    
+    def isbn(self, index: int) -> str:
+        """Get the ISBN at an index."""
+        if not 0 <= index < self.capacity:
+            raise ValueError(f"ISBN index {index} is outside the generator capacity")
+        prefix = ISBN_PREFIXES[index // ISBN_BODY_SPACE]
+        body = (self.offset + (index % ISBN_BODY_SPACE) * ISBN_STRIDE) % ISBN_BODY_SPACE
+        first_twelve = f"{prefix}{body:09d}"
+        return first_twelve + isbn13_check_digit(first_twelve)
+    
+    def next_isbn(self) -> str:
+        """Get the ISBN at the next index not handed out yet."""
+        isbn = self.isbn(self._next)
+        self._next += 1
+        return isbn
\ No newline at end of file
@@ -3,26 +3,78 @@ Library class implementing the main library management system
 """
 
 import logging
-from typing import List, Optional
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 from .library_base import LibraryItem
 from .book import Book
 from .book_collection import BookCollection
-from .index_dict import IndexDict
+from .index_dict import IndexDict, IndexReport
+from .catalog_stats import CatalogStats
+from .autocomplete import PrefixIndex
+from .sorted_index import SortedIndex
+from .hooks import MutationHook
+from .secondary_index import SecondaryIndex
+from .constants import BULK_CHUNK_SIZE, DEDUP_THRESHOLD, MERKLE_DEPTH
+from .dedup import DuplicateFinder
+from .snapshot import LibrarySnapshot
+from .shared_catalog import SharedCatalog
+from .storage import StorageBackend, create_backend
+from .memory import library_memory_usage
+from .normalize import normalize_key
+from .loans import Loan, LoanManager
+from .merkle import MerkleTree
+from .bitmap_index import BitmapIndex
+
+# Fields that can be completed: name -> (normalized key, displayed text) of a book
+AUTOCOMPLETE_FIELDS: Dict[str, Tuple[Callable[[Book], str], Callable[[Book], str]]] = {
+    "title": (lambda book: book.title_key, lambda book: book.title),
+    "author": (lambda book: book.author_key, lambda book: book.author),
+}
 
 
 class Library(LibraryItem):
     """Main library class that manages books and their indices."""
     
-    def __init__(self, name: str = "Main Library"):
+    def __init__(self, name: str = "Main Library", backend: Union[str, StorageBackend, None] = None):
         """
         Initialize the library.
         
         Args:
             name: Name of the library
+            backend: Storage backend instance or name ('memory' by default, or 'sqlite')
         """
         super().__init__(name)
-        self.books = BookCollection()
-        self.indices = IndexDict()
+        self.backend = create_backend(backend)
+        self.books: BookCollection = self.backend.create_collection()
+        self.indices: IndexDict = self.backend.create_indices()
+        self.stats = CatalogStats()
+        # Prefix tries for autocomplete, by field; empty until enable_autocomplete()
+        self.completions: Dict[str, PrefixIndex] = {}
+        # Books pre-sorted for browsing, by field; backends that keep books
+        # off-heap get orders of ISBNs resolved through the indices
+        lookup = None if self.backend.resident_books else self.indices.get_by_isbn
+        self.orders: Dict[str, SortedIndex] = {
+            "title": SortedIndex(lambda book: book.title_key, lookup),
+            "author": SortedIndex(lambda book: book.author_key, lookup),
+            "year": SortedIndex(lambda book: book.year, lookup),
+            "isbn": SortedIndex(lambda book: book.isbn, lookup),
+        }
+        # Copies, loans and due days for circulation
+        self.loans = LoanManager()
+        # Hash tree over ISBN buckets for diff and sync, None until enable_merkle_tree()
+        self.merkle: Optional[MerkleTree] = None
+        # Bitmaps for faceted filtering, None until enable_bitmap_index()
+        self.bitmaps: Optional[BitmapIndex] = None
+        # Structures notified of every add and remove, in registration order
+        self._hooks: List[MutationHook] = []
+        # Mutations buffered by an open batch(), by ISBN; None outside a batch
+        self._pending_adds: Optional[Dict[str, Book]] = None
+        self._pending_removes: Optional[Dict[str, Book]] = None
+        # Persistent backends may open with books already stored
+        self.add_hook(self.stats)
+        for hook in (*self.orders.values(), self.loans):
+            self.add_hook(hook)
         self.logger.info(f"Library '{self.name}' initialized with {len(self.books)} books")
     
     def add_book(self, book: Book) -> bool:
@@ -31,37 +83,539 @@ class Library(LibraryItem):
         
         Args:
             book: The book to add
-            
+        
         Returns:
             True if the book was added, False if it already existed
         """
-        if book in self.books:
+        # The ISBN index answers in O(1) where scanning the collection is O(n)
+        if self._lookup(book.isbn) is not None:
             self.logger.warning(f"Book already exists: {book.title}")
             return False
+        if self._pending_adds is not None:
+            self._pending_adds[book.isbn] = book
+            return True
         
         self.books.append(book)
         self.indices.add_book(book)
+        for hook in self._hooks:
+            hook.add_book(book)
         self.logger.info(f"Added book: {book.title} by {book.author}")
         return True
     
+    def add_books(self, books: Iterable[Book], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+        """
+        Bulk-ingest books, skipping ISBNs that are already present.
+        
+        Books are consumed in chunks, so a generator of millions of books can be
+        streamed in without materializing it, and only one log line is written
+        per chunk.
+        
+        Args:
+            books: Iterable of books to add
+            chunk_size: Number of books added to the collection and indices at once
+        
+        Returns:
+            Number of books added
+        """
+        if self._pending_adds is not None:
+            return sum(self.add_book(book) for book in books)
+        added_total = skipped_total = 0
+        iterator = iter(books)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            added, seen = [], set()
+            for book in chunk:
+                if book.isbn in seen or self.indices.get_by_isbn(book.isbn) is not None:
+                    continue
+                seen.add(book.isbn)
+                added.append(book)
+            self.books.extend(added)
+            self.indices.add_books(added)
+            for hook in self._hooks:
+                hook.add_books(added)
+            added_total += len(added)
+            skipped_total += len(chunk) - len(added)
+            self.logger.info(f"Bulk added {len(added)} books ({added_total} so far)")
+        if skipped_total:
+            self.logger.warning(f"Skipped {skipped_total} books with duplicate ISBNs")
+        return added_total
+    
     def remove_book(self, book: Book) -> bool:
         """
         Remove a book from the library.
         
         Args:
             book: The book to remove
-            
+        
         Returns:
             True if the book was removed, False if it didn't exist
         """
-        try:
-            self.books.remove(book)
-            self.indices.remove_book(book)
-            self.logger.info(f"Removed book: {book.title} by {book.author}")
+        if self._pending_removes is not None and book.isbn in self._pending_adds:
+            del self._pending_adds[book.isbn]
             return True
-        except ValueError:
+        # Books are equal by ISBN, so remove the stored record rather than the
+        # caller's copy, whose other fields may differ
+        stored = self._lookup(book.isbn)
+        if stored is None:
             self.logger.warning(f"Book not found: {book.title}")
             return False
+        if self._pending_removes is not None:
+            self._pending_removes[book.isbn] = stored
+            return True
+        self.books.remove(stored)
+        self.indices.remove_book(stored)
+        for hook in self._hooks:
+            hook.remove_book(stored)
+        self.logger.info(f"Removed book: {stored.title} by {stored.author}")
+        return True
+    
+    def _lookup(self, isbn: str) -> Optional[Book]:
+        """Get the book with the ISBN as it will be once any open batch commits."""
+        if self._pending_adds is not None:
+            if isbn in self._pending_adds:
+                return self._pending_adds[isbn]
+            if isbn in self._pending_removes:
+                return None
+        return self.indices.get_by_isbn(isbn)
+    
+    @contextmanager
+    def batch(self) -> Iterator['Library']:
+        """
+        Buffer add_book/add_books/remove_book calls and apply them together.
+        
+        Inside the block, mutations are validated and return the usual results
+        but only buffered; searches still see the catalog as it was before the
+        batch. On exit the net changes are applied to the collection, the
+        indices and every hook in one pass each, with one summary log line. If
+        the block raises, nothing is applied; if applying fails, every step
+        already applied is undone: the collection and the indices hold the
+        same books as before, and every hook, including one that raised
+        partway through, is left as it was before the batch. The order of the
+        collection is not restored: books the batch removed are put back at
+        its end.
+        
+        Yields:
+            The library
+        """
+        if self._pending_adds is not None:
+            raise RuntimeError("Library batches cannot be nested")
+        self._pending_adds, self._pending_removes = {}, {}
+        try:
+            yield self
+            added = list(self._pending_adds.values())
+            removed = list(self._pending_removes.values())
+        except BaseException:
+            self.logger.warning(f"Discarded batch of {len(self._pending_adds) + len(self._pending_removes)} mutations")
+            raise
+        finally:
+            self._pending_adds = self._pending_removes = None
+        if added or removed:
+            self._apply_batch(added, removed)
+    
+    def _apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """Apply the net changes of a batch, undoing the applied steps if one fails."""
+        undo: List[Callable[[], None]] = []
+        try:
+            for structure in (self.books, self.indices):
+                structure.apply_batch(added, removed)
+                undo.append(lambda structure=structure: structure.apply_batch(removed, added))
+            for hook in self._hooks:
+                undo.append(hook.apply_batch(added, removed))
+        except Exception:
+            for step in reversed(undo):
+                step()
+            self.logger.error(f"Rolled back batch of {len(added)} additions and {len(removed)} removals")
+            raise
+        self.logger.info(f"Committed batch: added {len(added)} books, removed {len(removed)} books")
+    
+    def add_hook(self, hook: MutationHook, backfill: bool = True) -> None:
+        """
+        Register a structure to be notified of every add and remove.
+        
+        Args:
+            hook: The hook to register
+            backfill: Feed the books already in the library to the hook first
+        """
+        if backfill:
+            hook.add_books(self.books)
+        self._hooks.append(hook)
+    
+    def remove_hook(self, hook: MutationHook) -> None:
+        """
+        Stop notifying a hook of mutations.
+        
+        Args:
+            hook: A previously registered hook
+        """
+        self._hooks.remove(hook)
+    
+    def create_index(self, name: str, key_func: Callable[[Book], Any], bucket: str = "list",
+                     multi_valued: bool = False) -> SecondaryIndex:
+        """
+        Create a secondary index over a user-defined key, kept up to date on every mutation.
+        
+        The index is queried like the built-in ones, e.g. library.indices[(name, value)].
+        
+        Args:
+            name: Name of the index
+            key_func: Function returning the key of a book, or None to leave it unindexed
+            bucket: Bucket structure, 'list' or 'set'
+            multi_valued: If True, key_func returns an iterable of keys per book
+        
+        Returns:
+            The new SecondaryIndex, already filled with the current books
+        """
+        index = SecondaryIndex(name, key_func, bucket=bucket, multi_valued=multi_valued)
+        self.indices.register_index(index)
+        self.add_hook(index)
+        self.logger.info(f"Created secondary index '{name}' with {len(index)} keys")
+        return index
+    
+    def drop_index(self, name: str) -> None:
+        """
+        Drop a secondary index created with create_index.
+        
+        Args:
+            name: Name of the index
+        """
+        self.remove_hook(self.indices.unregister_index(name))
+        self.logger.info(f"Dropped secondary index '{name}'")
+    
+    def enable_autocomplete(self, fields: Iterable[str] = ("title", "author")) -> Dict[str, PrefixIndex]:
+        """
+        Switch on autocomplete for the given fields.
+        
+        Every trie node caches its best completions, so the tries take
+        several times the memory of the books themselves; they are only
+        built for libraries that serve autocomplete.
+        
+        Args:
+            fields: Fields to complete ('title' and/or 'author')
+        
+        Returns:
+            The prefix indices by field, already filled with the current books
+        
+        Raises:
+            ValueError: If a field cannot be completed
+        """
+        fields = list(fields)
+        unknown = [field for field in fields if field not in AUTOCOMPLETE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown autocomplete fields: {unknown}")
+        self.disable_autocomplete()
+        for field in fields:
+            key_func, text_func = AUTOCOMPLETE_FIELDS[field]
+            self.completions[field] = PrefixIndex(key_func, text_func)
+            self.add_hook(self.completions[field])
+        self.logger.info(f"Enabled autocomplete over {fields} for {len(self.books)} books")
+        return self.completions
+    
+    def disable_autocomplete(self) -> None:
+        """Switch off autocomplete and free the tries."""
+        for completion_index in self.completions.values():
+            self.remove_hook(completion_index)
+        self.completions = {}
+    
+    def enable_merkle_tree(self, depth: int = MERKLE_DEPTH) -> MerkleTree:
+        """
+        Switch on the Merkle tree used by diff and sync_from.
+        
+        The tree keeps a digest per book and 2**depth buckets, so it is only
+        built for libraries that are compared or synced with others.
+        
+        Args:
+            depth: Levels below the root; both libraries of a diff need the same depth
+        
+        Returns:
+            The MerkleTree, already filled with the current books
+        """
+        self.disable_merkle_tree()
+        self.merkle = MerkleTree(depth)
+        self.add_hook(self.merkle)
+        self.logger.info(f"Enabled Merkle tree of depth {depth} for {len(self.books)} books")
+        return self.merkle
+    
+    def disable_merkle_tree(self) -> None:
+        """Switch off the Merkle tree and free it."""
+        if self.merkle is not None:
+            self.remove_hook(self.merkle)
+            self.merkle = None
+    
+    def _merkle_tree(self) -> MerkleTree:
+        """Get the Merkle tree, which must have been enabled."""
+        if self.merkle is None:
+            raise RuntimeError(f"Merkle tree of library '{self.name}' is not enabled; call enable_merkle_tree() first")
+        return self.merkle
+    
+    def enable_bitmap_index(self, facets: Optional[Mapping[str, Callable[[Book], Any]]] = None) -> BitmapIndex:
+        """
+        Switch on bitmap indexing for filter_books and facet_counts.
+        
+        Facets with many values, such as author, need about one chunk int per
+        book; leave them out of facets when memory matters more than
+        filtering by them.
+        
+        Args:
+            facets: Facet name -> function giving the value of a book
+                (genre, year, decade and author by default)
+        
+        Returns:
+            The BitmapIndex, already filled with the current books
+        """
+        if self.bitmaps is not None:
+            self.remove_hook(self.bitmaps)
+        lookup = None if self.backend.resident_books else self.indices.get_by_isbn
+        self.bitmaps = BitmapIndex(facets, lookup)
+        self.add_hook(self.bitmaps)
+        self.logger.info(f"Enabled bitmap index over {list(self.bitmaps.facets)} for {len(self.bitmaps)} books")
+        return self.bitmaps
+    
+    def disable_bitmap_index(self) -> None:
+        """Switch off bitmap indexing and free the bitmaps."""
+        if self.bitmaps is not None:
+            self.remove_hook(self.bitmaps)
+            self.bitmaps = None
+    
+    def _bitmap_index(self) -> BitmapIndex:
+        """Get the bitmap index, which must have been enabled."""
+        if self.bitmaps is None:
+            raise RuntimeError("Bitmap index is not enabled; call enable_bitmap_index() first")
+        return self.bitmaps
+    
+    def filter_books(self, **criteria: Any) -> List[Book]:
+        """
+        Find the books matching several facets at once, e.g. genre='Fiction', decade=1990.
+        
+        Args:
+            **criteria: Facet -> value, or a list, tuple or set of values any of
+                which may match (OR within a facet, AND across facets)
+        
+        Returns:
+            List of matching books
+        """
+        books = self._bitmap_index().books(criteria)
+        self.logger.info(f"Filtered books by {criteria}, found {len(books)} results")
+        return books
+    
+    def facet_counts(self, facet: str, **criteria: Any) -> Dict[Any, int]:
+        """
+        Count the matching books per value of a facet, e.g. per author among 1990s fiction.
+        
+        Args:
+            facet: Facet to count by
+            **criteria: Filter applied first, as for filter_books
+        
+        Returns:
+            Value -> number of matching books, for values with at least one
+        """
+        counts = self._bitmap_index().facet_counts(facet, criteria)
+        self.logger.info(f"Counted {len(counts)} values of '{facet}' for {criteria}")
+        return counts
+    
+    def snapshot(self) -> LibrarySnapshot:
+        """
+        Take an immutable point-in-time view of the books and indices.
+        
+        The snapshot shares storage with the library (copy-on-write), so it is
+        cheap to create and can be iterated without locks while the library
+        keeps changing. Take it between mutations, i.e. from the writer side.
+        
+        Returns:
+            A LibrarySnapshot
+        
+        Raises:
+            NotImplementedError: If the storage backend cannot take snapshots
+                (its supports_snapshots is False, as for 'sqlite' and 'tiered')
+        """
+        if not self.backend.supports_snapshots:
+            raise NotImplementedError(f"The '{self.backend.name}' storage backend does not support snapshots")
+        snapshot = LibrarySnapshot(self.name, self.books.snapshot(), self.indices.snapshot())
+        self.logger.info(f"Took snapshot of library '{self.name}' with {len(snapshot)} books")
+        return snapshot
+    
+    def diff(self, other: 'Library') -> List[int]:
+        """
+        Find where this library's records differ from another library's.
+        
+        Compares the Merkle trees top-down, so nearly identical catalogs are
+        compared in time proportional to the number of differing buckets
+        rather than the number of books.
+        
+        Args:
+            other: The library to compare with
+        
+        Returns:
+            Numbers of the ISBN buckets holding different records, in ascending order
+        
+        Raises:
+            RuntimeError: If either library has not enabled its Merkle tree
+        """
+        buckets = self._merkle_tree().diff(other._merkle_tree())
+        self.logger.info(f"Library '{self.name}' differs from '{other.name}' in {len(buckets)} buckets")
+        return buckets
+    
+    def sync_from(self, source: 'Library') -> Dict[str, int]:
+        """
+        Make this library hold the same records as another, copying only what changed.
+        
+        Only the differing buckets are compared record by record, by digest,
+        and only the books whose digests differ are fetched from the source.
+        The changes are applied as one batch.
+        
+        Args:
+            source: The library to copy from
+        
+        Returns:
+            Number of differing 'buckets' and of books 'added', 'updated' and 'removed'
+        
+        Raises:
+            RuntimeError: If either library has not enabled its Merkle tree
+        """
+        ours_tree, source_tree = self._merkle_tree(), source._merkle_tree()
+        buckets = ours_tree.diff(source_tree)
+        counts = {"buckets": len(buckets), "added": 0, "updated": 0, "removed": 0}
+        with self.batch():
+            for number in buckets:
+                ours = ours_tree.bucket(number)
+                theirs = source_tree.bucket(number)
+                for isbn, digest in theirs.items():
+                    known = ours.get(isbn)
+                    if known == digest:
+                        continue
+                    if known is None:
+                        counts["added"] += 1
+                    else:
+                        self.remove_book(self._lookup(isbn))
+                        counts["updated"] += 1
+                    book = source.indices.get_by_isbn(isbn)
+                    self.add_book(Book(book.title, book.author, book.year, book.genre, book.isbn))
+                for isbn in ours.keys() - theirs.keys():
+                    self.remove_book(self._lookup(isbn))
+                    counts["removed"] += 1
+        self.logger.info(f"Synced library '{self.name}' from '{source.name}': {counts}")
+        return counts
+    
+    def autocomplete(self, prefix: str, field: str = "title", k: int = 10) -> List[Tuple[str, int]]:
+        """
+        Complete a partially typed title or author name.
+        
+        Args:
+            prefix: Text typed so far; matching ignores case, accents and extra whitespace
+            field: Field to complete ('title' or 'author')
+            k: Maximum number of completions
+        
+        Returns:
+            List of (text, book count) pairs, most books first
+        
+        Raises:
+            RuntimeError: If autocomplete has not been enabled
+        """
+        if not self.completions:
+            raise RuntimeError("Autocomplete is not enabled; call enable_autocomplete() first")
+        completion_index = self.completions.get(field)
+        if completion_index is None:
+            self.logger.error(f"Unknown autocomplete field: {field}")
+            return []
+        return completion_index.complete(prefix, k)
+    
+    def browse(self, field: str = "title", offset: int = 0, limit: int = 20, reverse: bool = False,
+               start: Optional[Any] = None) -> List[Book]:
+        """
+        Get one page of books in title, author, year or ISBN order.
+        
+        Args:
+            field: Order to browse ('title', 'author', 'year' or 'isbn'); ties are ordered by ISBN
+            offset: Number of books to skip
+            limit: Maximum number of books in the page
+            reverse: Browse in descending order
+            start: Title, author, year or ISBN to start from instead of the first (or last) book
+        
+        Returns:
+            List of at most limit books
+        """
+        order = self.orders.get(field)
+        if order is None:
+            self.logger.error(f"Unknown browse order: {field}")
+            return []
+        if isinstance(start, str):
+            start = normalize_key(start)
+        page = order.page(offset, limit, reverse=reverse, start=start)
+        self.logger.info(f"Browsed {len(page)} books by {field} from offset {offset}")
+        return page
+    
+    def checkout_book(self, isbn: str, borrower: str) -> Optional[Loan]:
+        """
+        Lend a copy of a book to a borrower.
+        
+        Args:
+            isbn: ISBN of the book
+            borrower: Identifier of the borrower
+        
+        Returns:
+            The loan, or None if no copy is available or the borrower already has one
+        """
+        loan = self.loans.checkout(isbn, borrower)
+        if loan is None:
+            self.logger.warning(f"Cannot check out {isbn} to {borrower}")
+            return None
+        self.logger.info(f"Checked out {isbn} to {borrower}, due on day {loan.due}")
+        return loan
+    
+    def return_book(self, isbn: str, borrower: str) -> Optional[Loan]:
+        """
+        Take back a copy of a book from a borrower.
+        
+        Args:
+            isbn: ISBN of the book
+            borrower: Identifier of the borrower
+        
+        Returns:
+            The closed loan, or None if the borrower had no copy of the book
+        """
+        loan = self.loans.checkin(isbn, borrower)
+        if loan is None:
+            self.logger.warning(f"{borrower} has no copy of {isbn} to return")
+            return None
+        self.logger.info(f"Returned {isbn} from {borrower} on day {loan.returned}")
+        return loan
+    
+    def overdue_sweep(self, days: int = 0) -> List[Loan]:
+        """
+        Advance the loan clock and find the loans that became overdue.
+        
+        Only due-date heap entries that have passed are visited, so the sweep
+        costs O(log n) per overdue loan rather than a scan over all loans.
+        
+        Args:
+            days: Days to advance the clock before sweeping
+        
+        Returns:
+            Loans newly found overdue, earliest due first
+        """
+        today = self.loans.advance(days)
+        overdue = self.loans.sweep()
+        self.logger.info(f"Overdue sweep on day {today}: {len(overdue)} new, {self.loans.overdue_count} total")
+        return overdue
+    
+    def publish_shared(self, name: Optional[str] = None) -> SharedCatalog:
+        """
+        Publish the current books and their indices in shared memory.
+        
+        Worker processes attach with SharedCatalog.attach(catalog.name) and
+        query the segment read-only, without building their own Library.
+        Later changes to the library are not reflected; publish again.
+        
+        Args:
+            name: Name of the shared memory segment (generated if omitted)
+        
+        Returns:
+            The owning SharedCatalog; close() it to unlink the segment
+        """
+        catalog = SharedCatalog.publish(self.books, name=name)
+        self.logger.info(f"Published library '{self.name}' as shared catalog '{catalog.name}'")
+        return catalog
     
     def search_by_title(self, title: str) -> List[Book]:
         """
@@ -69,11 +623,11 @@ class Library(LibraryItem):
         
         Args:
             title: Title to search for
-            
+        
         Returns:
             List of books with matching title
         """
-        matching_books = [book for book in self.books if title.lower() in book.title.lower()]
+        matching_books = list(self.books.get_books_by_title(title))
         self.logger.info(f"Searched for books with title containing '{title}', found {len(matching_books)} results")
         return matching_books
     
@@ -83,7 +637,7 @@ class Library(LibraryItem):
         
         Args:
             author: Author to search for
-            
+        
         Returns:
             List of books by the author
         """
@@ -98,11 +652,11 @@ class Library(LibraryItem):
         
         Args:
             genre: Genre to search for
-            
+        
         Returns:
             List of books of the genre
         """
-        matching_books = [book for book in self.books if book.genre.lower() == genre.lower()]
+        matching_books = list(self.books.match_genre(genre))
         self.logger.info(f"Searched for books in genre '{genre}', found {len(matching_books)} results")
         return matching_books
     
@@ -112,7 +666,7 @@ class Library(LibraryItem):
         
         Args:
             year: Year to search for
-            
+        
         Returns:
             List of books published in the year
         """
@@ -121,13 +675,65 @@ class Library(LibraryItem):
         self.logger.info(f"Searched for books published in {year}, found {len(matching_books)} results")
         return matching_books
     
+    def search_many(self, queries: Iterable[Tuple[str, Any]]) -> List[List[Book]]:
+        """
+        Answer many searches at once, grouped by type with repeats answered once.
+        
+        Each search type is resolved in one pass: authors and years with one
+        batched index lookup, genres with one scan of the collection (or one
+        indexed IN query on SQLite) and titles with one scan testing every
+        distinct text. Genres and titles ignore case and accents like the
+        single searches, so 'Fiction' and 'fiction' count as one query.
+        
+        Args:
+            queries: (search_type, query) pairs; search types are those of
+                __call__ ('title', 'author', 'genre', 'year')
+        
+        Returns:
+            One list of matching books per query, in input order; unknown
+            search types and invalid years give empty lists
+        """
+        queries = list(queries)
+        keys: List[Any] = []
+        wanted: Dict[str, Dict[Any, None]] = {"title": {}, "author": {}, "genre": {}, "year": {}}
+        for search_type, query in queries:
+            key = None
+            if search_type in ("title", "genre"):
+                key = normalize_key(query)
+            elif search_type == "author":
+                key = query
+            elif search_type == "year":
+                try:
+                    key = int(query)
+                except (TypeError, ValueError):
+                    self.logger.error(f"Invalid year: {query}")
+            else:
+                self.logger.error(f"Unknown search type: {search_type}")
+            if key is not None:
+                wanted[search_type][key] = None
+            keys.append(key)
+        
+        results = {
+            "title": self.books.match_titles(wanted["title"]) if wanted["title"] else {},
+            "author": self.indices.get_by_authors(wanted["author"]) if wanted["author"] else {},
+            "genre": self.books.match_genres(wanted["genre"]) if wanted["genre"] else {},
+            "year": self.indices.get_by_years(wanted["year"]) if wanted["year"] else {},
+        }
+        answers = [
+            list(results[search_type][key]) if key is not None else []
+            for (search_type, _), key in zip(queries, keys)
+        ]
+        distinct = sum(len(values) for values in wanted.values())
+        self.logger.info(f"Answered {len(queries)} searches ({distinct} distinct) in one batch")
+        return answers
+    
     def search_by_isbn(self, isbn: str) -> Optional[Book]:
         """
         Search for a book by ISBN.
         
         Args:
             isbn: ISBN to search for
-            
+        
         Returns:
             Book with the given ISBN or None if not found
         """
@@ -138,6 +744,85 @@ class Library(LibraryItem):
             self.logger.info(f"No book found with ISBN '{isbn}'")
         return book
     
+    def search_by_isbn_prefix(self, prefix: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[Book]:
+        """
+        Lazily find the books whose ISBN starts with a prefix, e.g. a publisher group.
+        
+        Args:
+            prefix: ISBN prefix, written like the stored ISBNs
+            offset: Number of matching books to skip (for pagination)
+            limit: Maximum number of books to yield (all by default)
+        
+        Returns:
+            An iterator of books in ISBN order
+        """
+        self.logger.info(f"Searching for ISBNs starting with '{prefix}' from offset {offset}")
+        books = self.orders["isbn"].iter_prefix(prefix, offset)
+        return books if limit is None else islice(books, limit)
+    
+    def search_by_isbn_range(self, low: str, high: str, offset: int = 0,
+                             limit: Optional[int] = None) -> Iterator[Book]:
+        """
+        Lazily find the books with low <= ISBN <= high.
+        
+        Args:
+            low: Smallest ISBN to include
+            high: Largest ISBN to include
+            offset: Number of matching books to skip (for pagination)
+            limit: Maximum number of books to yield (all by default)
+        
+        Returns:
+            An iterator of books in ISBN order
+        """
+        self.logger.info(f"Searching for ISBNs from '{low}' to '{high}' from offset {offset}")
+        books = self.orders["isbn"].iter_range(low, high, offset)
+        return books if limit is None else islice(books, limit)
+    
+    def update_index(self, audit_only: bool = False) -> IndexReport:
+        """
+        Check the indices against the book collection and rebuild them.
+        
+        Args:
+            audit_only: Only run the cheap checksum audit, without rebuilding
+        
+        Returns:
+            An IndexReport describing any drift found
+        """
+        return self.indices.update_index(self.books, audit_only=audit_only)
+    
+    def find_duplicates(self, threshold: float = DEDUP_THRESHOLD, workers: Optional[int] = None) -> List[List[Book]]:
+        """
+        Find books that are probably the same work under different ISBNs.
+        
+        Uses MinHash/LSH over the normalized title and author, so the pass is
+        near-linear in the catalog size. The catalog is not modified.
+        
+        Args:
+            threshold: Minimum estimated similarity (0..1) of a duplicate pair
+            workers: Number of worker processes (all cores by default)
+        
+        Returns:
+            Clusters of possible duplicates (merge candidates), largest first
+        """
+        clusters = DuplicateFinder(threshold=threshold).find(self.books, workers=workers)
+        self.logger.info(f"Found {len(clusters)} clusters of possible duplicates")
+        return clusters
+    
+    def memory_usage(self) -> Dict[str, Any]:
+        """
+        Get a breakdown of the memory used by the library.
+        
+        Returns:
+            Bytes used by the Book objects, the collection, each index table and
+            its buckets, and each auxiliary structure such as the statistics,
+            plus the total and the average per book
+        """
+        return library_memory_usage(self)
+    
+    def close(self) -> None:
+        """Flush pending writes and release the storage backend."""
+        self.backend.close()
+    
     def display_info(self) -> str:
         """Display information about the library."""
         return f"Library '{self.name}' contains {len(self.books)} books"
@@ -149,7 +834,7 @@ class Library(LibraryItem):
         Args:
             query: Query string to search for
             search_type: Type of search ('title', 'author', 'genre', 'year')
-            
+        
         Returns:
             List of matching books
         """
@@ -177,8 +862,27 @@ class Library(LibraryItem):
     
     def get_unique_authors(self) -> int:
         """Get the number of unique authors in the library."""
-        authors = set(book.author for book in self.books)
-        return len(authors)
+        return self.stats.unique_authors
+    
+    def get_genre_counts(self) -> Mapping[str, int]:
+        """Get the number of books per genre."""
+        return self.stats.genre_counts()
+    
+    def get_decade_counts(self) -> Mapping[int, int]:
+        """Get the number of books per decade (keyed by the decade's first year)."""
+        return self.stats.decade_counts()
+    
+    def get_top_authors(self, k: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the most prolific authors.
+        
+        Args:
+            k: Number of authors to return
+        
+        Returns:
+            List of (author, book count) pairs, most prolific first
+        """
+        return self.stats.top_authors(k)
     
     def get_books_by_year_range(self, start_year: int, end_year: int) -> List[Book]:
         """
@@ -187,13 +891,11 @@ class Library(LibraryItem):
         Args:
             start_year: Start year of the range
             end_year: End year of the range
-            
+        
         Returns:
-            List of books published within the range
+            List of books published within the range, oldest first
         """
-        matching_books = [
-            book for book in self.books 
-            if start_year <= book.year <= end_year
-        ]
+        # The year order answers in O(log n + matches)
+        matching_books = self.orders["year"].range(start_year, end_year)
         self.logger.info(f"Found {len(matching_books)} books published between {start_year} and {end_year}")
         return matching_books
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Loans of book copies with due dates kept in a heap
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .book import Book
+from .constants import LOAN_DEFAULT_COPIES, LOAN_PERIOD_DAYS
+from .hooks import MutationHook
+
+
+class Loan:
+    """One copy of a book checked out by a borrower."""
+    
+    __slots__ = ("isbn", "borrower", "checked_out", "due", "returned", "overdue", "_slot")
+    
+    def __init__(self, isbn: str, borrower: str, checked_out: int, due: int):
+        """
+        Initialize the loan.
+        
+        Args:
+            isbn: ISBN of the borrowed book
+            borrower: Identifier of the borrower
+            checked_out: Day the copy was checked out
+            due: Day the copy is due back
+        """
+        self.isbn = isbn
+        self.borrower = borrower
+        self.checked_out = checked_out
+        self.due = due
+        # Day the copy came back, None while it is out
+        self.returned: Optional[int] = None
+        # Set by the overdue sweep that found the loan past its due day
+        self.overdue = False
+        # Position in LoanManager._active, for O(1) removal and sampling
+        self._slot = -1
+    
+    def __repr__(self) -> str:
+        """String representation of the loan."""
+        return (f"Loan(isbn='{self.isbn}', borrower='{self.borrower}', checked_out={self.checked_out}, "
+                f"due={self.due}, returned={self.returned})")
+
+
+class LoanManager(MutationHook):
+    """
+    Copies per ISBN, the loans out on them, and a min-heap of due days.
+    
+    Availability is two dict lookups, so checkout and return are O(1) (plus
+    O(log n) to push the due day). The heap holds (due, isbn, borrower) for
+    every loan not yet found overdue; a sweep pops only the entries that are
+    due, so finding what became overdue costs O(log n) per overdue loan
+    instead of a scan over all loans. Returned loans leave their heap entry
+    behind, and sweeps skip it; the heap is rebuilt once such stale entries
+    make up half of it.
+    
+    Time is a day counter advanced by advance(). As a mutation hook, the
+    manager gives every book added to the library default_copies copies and
+    withdraws them when the book is removed; copies already out stay on loan
+    until they are returned.
+    """
+    
+    def __init__(self, default_copies: int = LOAN_DEFAULT_COPIES, loan_days: int = LOAN_PERIOD_DAYS):
+        """
+        Initialize the manager.
+        
+        Args:
+            default_copies: Copies owned of every newly added book
+            loan_days: Days a copy may be kept
+        """
+        self.default_copies = default_copies
+        self.loan_days = loan_days
+        self.today = 0
+        # ISBN -> copies owned, for every book in the catalog
+        self._copies: Dict[str, int] = {}
+        # ISBN -> copies out on loan, only for ISBNs with outstanding loans
+        self._on_loan: Dict[str, int] = {}
+        # (isbn, borrower) -> outstanding loan
+        self._loans: Dict[Tuple[str, str], Loan] = {}
+        # Outstanding loans in no particular order, for sampling
+        self._active: List[Loan] = []
+        # (due, isbn, borrower) of loans not yet found overdue, plus stale entries
+        self._due: List[Tuple[int, str, str]] = []
+        self._stale = 0
+        # (isbn, borrower) -> outstanding loans found overdue by a sweep
+        self._overdue: Dict[Tuple[str, str], Loan] = {}
+    
+    def __len__(self) -> int:
+        """Get the number of outstanding loans."""
+        return len(self._loans)
+    
+    def __repr__(self) -> str:
+        """String representation of the manager."""
+        return f"LoanManager(day={self.today}, loans={len(self._loans)}, overdue={len(self._overdue)})"
+    
+    def add_book(self, book: Book) -> None:
+        """Stock the default number of copies of a new book."""
+        self._copies[book.isbn] = self.default_copies
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """Stock the default number of copies of many new books."""
+        self._copies.update(dict.fromkeys((book.isbn for book in books), self.default_copies))
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> Callable[[], None]:
+        """Apply a library batch; undoing restores the exact copy counts it replaced."""
+        touched = {book.isbn for book in removed}
+        touched.update(book.isbn for book in added)
+        previous = {isbn: self._copies[isbn] for isbn in touched if isbn in self._copies}
+        
+        def undo() -> None:
+            for isbn in touched:
+                self._copies.pop(isbn, None)
+            self._copies.update(previous)
+        
+        try:
+            for book in removed:
+                self._copies.pop(book.isbn, None)
+            self.add_books(added)
+        except Exception:
+            undo()
+            raise
+        return undo
+    
+    def remove_book(self, book: Book) -> None:
+        """Withdraw the copies of a removed book; loans already out stay open."""
+        self._copies.pop(book.isbn, None)
+    
+    def copies(self, isbn: str) -> int:
+        """Get the number of copies owned of a book."""
+        return self._copies.get(isbn, 0)
+    
+    def available(self, isbn: str) -> int:
+        """Get the number of copies of a book on the shelf, in O(1)."""
+        return max(self._copies.get(isbn, 0) - self._on_loan.get(isbn, 0), 0)
+    
+    def set_copies(self, isbn: str, copies: int) -> bool:
+        """
+        Change the number of copies owned of a book in the catalog.
+        
+        Args:
+            isbn: ISBN of the book
+            copies: New number of copies (copies out on loan still count)
+        
+        Returns:
+            False if the book is not in the catalog
+        """
+        if isbn not in self._copies:
+            return False
+        self._copies[isbn] = max(copies, 0)
+        return True
+    
+    def get_loan(self, isbn: str, borrower: str) -> Optional[Loan]:
+        """Get the outstanding loan of a book to a borrower, if any."""
+        return self._loans.get((isbn, borrower))
+    
+    def checkout(self, isbn: str, borrower: str) -> Optional[Loan]:
+        """
+        Lend a copy of a book, due loan_days from today.
+        
+        Args:
+            isbn: ISBN of the book
+            borrower: Identifier of the borrower
+        
+        Returns:
+            The new loan, or None if no copy is available or the borrower
+            already has one
+        """
+        key = (isbn, borrower)
+        if key in self._loans or not self.available(isbn):
+            return None
+        loan = Loan(isbn, borrower, self.today, self.today + self.loan_days)
+        self._loans[key] = loan
+        self._on_loan[isbn] = self._on_loan.get(isbn, 0) + 1
+        loan._slot = len(self._active)
+        self._active.append(loan)
+        heapq.heappush(self._due, (loan.due, isbn, borrower))
+        return loan
+    
+    def checkin(self, isbn: str, borrower: str) -> Optional[Loan]:
+        """
+        Take back a borrowed copy.
+        
+        Args:
+            isbn: ISBN of the book
+            borrower: Identifier of the borrower
+        
+        Returns:
+            The closed loan, or None if the borrower has no copy of the book
+        """
+        loan = self._loans.pop((isbn, borrower), None)
+        if loan is None:
+            return None
+        loan.returned = self.today
+        remaining = self._on_loan[isbn] - 1
+        if remaining:
+            self._on_loan[isbn] = remaining
+        else:
+            del self._on_loan[isbn]
+        # Swap-remove from the active list
+        last = self._active.pop()
+        if last is not loan:
+            last._slot = loan._slot
+            self._active[loan._slot] = last
+        if loan.overdue:
+            del self._overdue[(isbn, borrower)]
+        else:
+            self._stale += 1
+            if self._stale * 2 > len(self._due):
+                self._compact()
+        return loan
+    
+    def random_loan(self, rng) -> Optional[Loan]:
+        """Pick an outstanding loan uniformly at random in O(1), or None if there are none."""
+        if not self._active:
+            return None
+        return self._active[rng.randrange(len(self._active))]
+    
+    def advance(self, days: int = 1) -> int:
+        """
+        Move the clock forward.
+        
+        Args:
+            days: Number of days to advance
+        
+        Returns:
+            The new day
+        """
+        self.today += days
+        return self.today
+    
+    def sweep(self) -> List[Loan]:
+        """
+        Find the loans that became overdue since the last sweep.
+        
+        Pops due heap entries until the earliest one is not yet past due, so
+        the cost is O(log n) per loan found (or per stale entry skipped).
+        
+        Returns:
+            Newly overdue loans, earliest due first
+        """
+        due = self._due
+        found = []
+        while due and due[0][0] < self.today:
+            due_day, isbn, borrower = heapq.heappop(due)
+            loan = self._loans.get((isbn, borrower))
+            # The entry may belong to an earlier, returned loan of the same copy
+            if loan is None or loan.overdue or loan.due != due_day:
+                self._stale -= 1
+                continue
+            loan.overdue = True
+            self._overdue[(isbn, borrower)] = loan
+            found.append(loan)
+        return found
+    
+    @property
+    def overdue_count(self) -> int:
+        """Number of outstanding loans found overdue."""
+        return len(self._overdue)
+    
+    def overdue(self) -> List[Loan]:
+        """Get every outstanding loan found overdue by a sweep, in the order found."""
+        return list(self._overdue.values())
+    
+    def _compact(self) -> None:
+        """Rebuild the heap from the loans not yet found overdue, dropping stale entries."""
+        self._due = [(loan.due, loan.isbn, loan.borrower) for loan in self._active if not loan.overdue]
+        heapq.heapify(self._due)
+        self._stale = 0
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Memory accounting for library data structures
+"""
+
+import logging
+import os
+import sys
+import tracemalloc
+import types
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Objects owned by the interpreter or shared process-wide, never charged to a structure
+_SHARED_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, weakref.ref, logging.Logger,
+)
+
+
+def _is_shared(obj: Any) -> bool:
+    """Check whether an object is a process-wide singleton or shared runtime object."""
+    if obj is None or obj is True or obj is False:
+        return True
+    # CPython caches small integers, so they are never owned by one structure
+    if type(obj) is int and -5 <= obj <= 256:
+        return True
+    return isinstance(obj, _SHARED_TYPES)
+
+
+def _children(obj: Any) -> Iterable[Any]:
+    """Get the objects directly referenced by a container or instance."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield key
+            yield value
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        yield from obj
+    else:
+        instance_dict = getattr(obj, "__dict__", None)
+        if isinstance(instance_dict, dict):
+            yield instance_dict
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                yield getattr(obj, slot)
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Get the size of an object and everything it references.
+    
+    Objects whose id is already in ``seen`` are skipped, so passing one set to
+    successive calls charges every shared object (for example a string
+    referenced by many books) only to the first structure that reaches it.
+    
+    Args:
+        obj: The object to measure
+        seen: Ids of objects already accounted for; updated in place
+    
+    Returns:
+        Size in bytes
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or _is_shared(current):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        stack.extend(_children(current))
+    return total
+
+
+def library_memory_usage(library) -> Dict[str, Any]:
+    """
+    Break down the memory used by a library.
+    
+    Components are measured in order (books, hot-tier cache, collection,
+    indices, auxiliary structures) with a shared de-duplication set, so each
+    object is counted exactly once, in the first component that owns it.
+    Books of backends that keep them off-heap are not resident and count as 0.
+    
+    Args:
+        library: The Library to measure
+    
+    Returns:
+        Dictionary with bytes for 'books', 'cache' (books held by the
+        backend's hot tier), 'collection', per-index 'indices' ('table' and
+        'buckets'), per-attribute 'auxiliary' structures, 'total' and
+        'bytes_per_book', plus 'resident_books' telling whether the books
+        are kept in memory
+    """
+    # Ignore the library's own attribute dict and the structures measured separately
+    seen: Set[int] = {id(library), id(library.__dict__), id(library.backend)}
+    
+    # Backends that keep books off-heap build a new Book per item and drop it
+    # at once; nothing stays resident, and CPython would reuse the freed ids,
+    # so later books would look already counted
+    resident = library.backend.resident_books
+    books = sum(deep_sizeof(book, seen) for book in library.books) if resident else 0
+    # Books a backend keeps in memory in front of its store (the hot tier)
+    cache = getattr(library.backend, "cache", None)
+    cached = deep_sizeof(cache._books, seen) + deep_sizeof(cache._sizes, seen) if cache is not None else 0
+    collection = deep_sizeof(library.books, seen)
+    
+    indices: Dict[str, Dict[str, int]] = {}
+    index_maps = library.indices._indices
+    seen.update((id(library.indices), id(index_maps)))
+    for name, index_map in index_maps.items():
+        table = sys.getsizeof(index_map)
+        seen.add(id(index_map))
+        buckets = 0
+        for key, entry in index_map.items():
+            table += deep_sizeof(key, seen)
+            if isinstance(entry, list):
+                buckets += deep_sizeof(entry, seen)
+            else:
+                table += deep_sizeof(entry, seen)
+        indices[name] = {"table": table, "buckets": buckets}
+    for name, index in library.indices._secondary.items():
+        seen.update((id(index), id(vars(index)), id(index._buckets)))
+        table = sys.getsizeof(index._buckets) + sum(deep_sizeof(key, seen) for key in index._buckets)
+        buckets = sum(deep_sizeof(bucket, seen) for bucket in index._buckets.values())
+        indices[name] = {"table": table, "buckets": buckets}
+    # Checksums, copy-on-write bookkeeping and other IndexDict attributes
+    indices["overhead"] = {"table": deep_sizeof(vars(library.indices), seen), "buckets": 0}
+    
+    auxiliary = {
+        name: deep_sizeof(value, seen)
+        for name, value in vars(library).items()
+        if not name.startswith("_") and name not in ("books", "indices", "backend", "logger", "name")
+    }
+    
+    total = books + cached + collection + sum(auxiliary.values()) + sum(
+        sizes["table"] + sizes["buckets"] for sizes in indices.values()
+    )
+    count = len(library.books)
+    return {
+        "books": books,
+        "resident_books": resident,
+        "cache": cached,
+        "collection": collection,
+        "indices": indices,
+        "auxiliary": auxiliary,
+        "total": total,
+        "bytes_per_book": total / count if count else 0.0,
+    }
+
+
+def format_memory_usage(usage: Dict[str, Any]) -> str:
+    """Format a memory usage breakdown as a table of kilobytes."""
+    lines = [f"{'component':<28}{'KiB':>12}"]
+    if usage["resident_books"]:
+        lines.append(f"{'books':<28}{usage['books'] / 1024:>12.1f}")
+    else:
+        lines.append(f"{'books':<28}{'not resident':>12}")
+    if usage["cache"]:
+        lines.append(f"{'cache (hot tier)':<28}{usage['cache'] / 1024:>12.1f}")
+    lines.append(f"{'collection':<28}{usage['collection'] / 1024:>12.1f}")
+    for name, sizes in usage["indices"].items():
+        lines.append(f"{'index ' + name + ' (table)':<28}{sizes['table'] / 1024:>12.1f}")
+        if sizes["buckets"]:
+            lines.append(f"{'index ' + name + ' (buckets)':<28}{sizes['buckets'] / 1024:>12.1f}")
+    for name, size in usage["auxiliary"].items():
+        lines.append(f"{name:<28}{size / 1024:>12.1f}")
+    lines.append(f"{'total':<28}{usage['total'] / 1024:>12.1f}")
+    lines.append(f"{'bytes per book':<28}{usage['bytes_per_book']:>12.1f}")
+    return "\n".join(lines)
+
+
+def trace_allocations(run, *args, top: int = 15, **kwargs) -> str:
+    """
+    Run a callable under tracemalloc and report where memory was allocated.
+    
+    Args:
+        run: The callable to trace, e.g. run_simulation
+        *args: Positional arguments for the callable
+        top: Number of allocation sites to list
+        **kwargs: Keyword arguments for the callable
+    
+    Returns:
+        Report with the peak traced memory and the top allocation sites
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        # Keep the result alive so the structures it references show up in the snapshot
+        result = run(*args, **kwargs)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    del result
+    
+    # Only report allocations made by the library package itself
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(True, os.path.join(os.path.dirname(__file__), "*")),))
+    lines = [f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB",
+             f"Top {top} library allocation sites still alive:"]
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"  {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Merkle tree over ISBN-bucketed partitions of a catalog, for cheap diff and sync
+"""
+
+import hashlib
+import zlib
+from typing import Dict, Iterable, List
+from .book import Book
+from .constants import MERKLE_DEPTH
+from .hooks import MutationHook
+
+
+def record_digest(book: Book) -> int:
+    """
+    Get a stable 64-bit digest of every field of a book.
+    
+    Unlike book_digest, which uses Python's per-process string hashing, the
+    digest is the same in every process and on every host, so trees built
+    in different places can be compared.
+    """
+    record = "\x1f".join((book.isbn, book.title, book.author, str(book.year), book.genre))
+    return int.from_bytes(hashlib.blake2b(record.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class MerkleTree(MutationHook):
+    """
+    Hash tree over a catalog split into 2**depth buckets by a hash of the ISBN.
+    
+    The tree is a complete binary tree stored in one list: node 1 is the
+    root, node i has children 2i and 2i + 1, and the leaves are nodes
+    2**depth to 2**(depth + 1) - 1, one per bucket. Every node holds the XOR
+    of the record digests below it, so adding or removing a book updates one
+    leaf and its depth ancestors in O(depth) without rehashing any children.
+    
+    Two trees with the same depth that agree on a node agree (up to hash
+    collisions) on every record below it, so a diff descends only into the
+    subtrees that differ and touches O(changed buckets * depth) nodes.
+    """
+    
+    def __init__(self, depth: int = MERKLE_DEPTH):
+        """
+        Initialize an empty tree.
+        
+        Args:
+            depth: Levels below the root; the catalog is split into 2**depth buckets
+        """
+        self.depth = depth
+        self.leaves = 1 << depth
+        # Index 0 is unused so that the children of node i are 2i and 2i + 1
+        self._nodes: List[int] = [0] * (2 * self.leaves)
+        # Per bucket, ISBN -> record digest of the book stored under it
+        self._buckets: List[Dict[str, int]] = [{} for _ in range(self.leaves)]
+    
+    def __len__(self) -> int:
+        """Get the number of books in the tree."""
+        return sum(len(bucket) for bucket in self._buckets)
+    
+    def __repr__(self) -> str:
+        """String representation of the tree."""
+        return f"MerkleTree(depth={self.depth}, root={self.root:016x})"
+    
+    def bucket_of(self, isbn: str) -> int:
+        """Get the bucket an ISBN belongs to (stable across processes)."""
+        return zlib.crc32(isbn.encode("utf-8")) & (self.leaves - 1)
+    
+    def _update(self, bucket: int, digest: int) -> None:
+        """XOR a digest into a leaf and every ancestor up to the root."""
+        nodes = self._nodes
+        node = self.leaves + bucket
+        while node:
+            nodes[node] ^= digest
+            node >>= 1
+    
+    def add_book(self, book: Book) -> None:
+        """Fold a new book into its bucket and the path to the root."""
+        bucket = self.bucket_of(book.isbn)
+        digest = record_digest(book)
+        self._buckets[bucket][book.isbn] = digest
+        self._update(bucket, digest)
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """Fold many new books into their buckets, then recompute the inner nodes once."""
+        books = list(books)
+        if len(books) * self.depth < self.leaves:
+            for book in books:
+                self.add_book(book)
+            return
+        nodes, leaves = self._nodes, self.leaves
+        for book in books:
+            bucket = self.bucket_of(book.isbn)
+            digest = record_digest(book)
+            self._buckets[bucket][book.isbn] = digest
+            nodes[leaves + bucket] ^= digest
+        for node in range(leaves - 1, 0, -1):
+            nodes[node] = nodes[2 * node] ^ nodes[2 * node + 1]
+    
+    def remove_book(self, book: Book) -> None:
+        """Take a removed book out of its bucket and the path to the root."""
+        bucket = self.bucket_of(book.isbn)
+        # The digest stored at insertion, in case the book was edited since
+        digest = self._buckets[bucket].pop(book.isbn, None)
+        if digest is not None:
+            self._update(bucket, digest)
+    
+    @property
+    def root(self) -> int:
+        """Root hash, equal for two catalogs holding the same records."""
+        return self._nodes[1]
+    
+    def node(self, index: int) -> int:
+        """Get the hash of a node (1 is the root, 2**depth + b is bucket b)."""
+        return self._nodes[index]
+    
+    def bucket(self, number: int) -> Dict[str, int]:
+        """Get a copy of the ISBN -> record digest map of one bucket."""
+        return dict(self._buckets[number])
+    
+    def diff(self, other: 'MerkleTree') -> List[int]:
+        """
+        Find the buckets whose records differ from another tree's.
+        
+        Walks down from the root, skipping every subtree whose hash matches.
+        Only node() of the other tree is called, so a proxy to a tree in
+        another process or on another host can stand in for it.
+        
+        Args:
+            other: Tree of the same depth to compare with
+        
+        Returns:
+            Numbers of the differing buckets, in ascending order
+        
+        Raises:
+            ValueError: If the trees have different depths
+        """
+        if other.depth != self.depth:
+            raise ValueError(f"Cannot diff Merkle trees of depth {self.depth} and {other.depth}")
+        differing = []
+        pending = [1]
+        while pending:
+            node = pending.pop()
+            if self._nodes[node] == other.node(node):
+                continue
+            if node >= self.leaves:
+                differing.append(node - self.leaves)
+            else:
+                # Right child first so that buckets come off the stack in ascending order
+                pending.append(2 * node + 1)
+                pending.append(2 * node)
+        return differing
+    
+    def rebuild(self, books: Iterable[Book]) -> None:
+        """Recompute the whole tree from the given books."""
+        self._nodes = [0] * (2 * self.leaves)
+        self._buckets = [{} for _ in range(self.leaves)]
+        self.add_books(books)
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Unicode-aware normalization of search keys
+"""
+
+import unicodedata
+
+
+def normalize_key(text: str) -> str:
+    """
+    Fold text into a key for case- and accent-insensitive matching.
+    
+    The text is case-folded (so 'ß' matches 'ss'), decomposed with NFKD (so
+    compatibility forms such as ligatures and full-width letters match their
+    plain equivalents), stripped of combining marks (so 'é' matches 'e' and
+    'ё' matches 'е'), and its runs of whitespace are collapsed to one space.
+    
+    Args:
+        text: Text to normalize
+    
+    Returns:
+        The normalized key
+    """
+    if text.isascii():
+        # ASCII has nothing to decompose, and casefold() equals lower() on it
+        return " ".join(text.lower().split())
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
\ No newline at end of file
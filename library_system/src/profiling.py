@@ -0,0 +1,135 @@
+"""
+CPU profiling of simulation runs
+"""
+
+import ast
+import cProfile
+import logging
+import os
+import pstats
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from .simulation import EVENT_HANDLERS, run_simulation
+
+# Modules that drive the simulation rather than implement the library; their
+# time is reported by event type instead
+DRIVER_MODULES = {"simulation.py", "workload.py", "discrete_event.py", "profiling.py"}
+
+# Directory of the library's modules, every one of which is attributed by method
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Number of functions listed in the overall section of the report
+TOP_FUNCTIONS = 30
+
+
+@lru_cache(maxsize=None)
+def _qualified_names(filename: str) -> Dict[int, str]:
+    """
+    Map the first line of every function in a source file to its qualified name.
+    
+    Profile entries only carry a file, a line and a bare function name, so
+    the class of a method is recovered from the source. Methods are named
+    'Class.method'; module-level functions are prefixed with their module,
+    e.g. 'bitmap_index.bitmap_and'.
+    """
+    with open(filename, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename)
+    names = {}
+    
+    def visit(node: ast.AST, class_prefix: str, function_prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                prefix = f"{class_prefix}{child.name}."
+                visit(child, prefix, prefix)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # A decorated function's code starts at its first decorator
+                first_line = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                names[first_line] = f"{function_prefix}{child.name}"
+                prefix = f"{function_prefix}{child.name}."
+                visit(child, prefix, prefix)
+    
+    visit(tree, "", f"{os.path.splitext(os.path.basename(filename))[0]}.")
+    return names
+
+
+def _method_label(filename: str, line: int, function: str) -> Optional[str]:
+    """Get the report label of a profiled function, or None if it is not a library method."""
+    if function.startswith("<") or os.path.dirname(os.path.abspath(filename)) != SOURCE_DIR:
+        return None
+    if os.path.basename(filename) in DRIVER_MODULES:
+        return None
+    try:
+        names = _qualified_names(filename)
+    except (OSError, SyntaxError):
+        return function
+    return names.get(line, function)
+
+
+def _profile_rows(stats: pstats.Stats) -> Tuple[List[Tuple], List[Tuple]]:
+    """
+    Split profile entries into per-event-type and per-method rows.
+    
+    Returns:
+        Two lists of (label, calls, own seconds, cumulative seconds), sorted by
+        cumulative time
+    """
+    handler_names = {handler.__name__: event_type for event_type, handler in EVENT_HANDLERS.items()}
+    events, methods = [], []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        if os.path.basename(filename) == "simulation.py" and function in handler_names:
+            events.append((handler_names[function], calls, own, cumulative))
+            continue
+        label = _method_label(filename, line, function)
+        if label is not None:
+            methods.append((label, calls, own, cumulative))
+    events.sort(key=lambda row: row[3], reverse=True)
+    methods.sort(key=lambda row: row[3], reverse=True)
+    return events, methods
+
+
+def format_profile_report(stats: pstats.Stats) -> str:
+    """
+    Format a profile as a report attributed to event types and library methods.
+    
+    Args:
+        stats: Collected profile statistics
+    
+    Returns:
+        The report text
+    """
+    events, methods = _profile_rows(stats)
+    lines = [f"Total profiled time: {stats.total_tt:.4f}s", ""]
+    for title, rows in (("Time by event type", events), ("Time by library method", methods)):
+        lines.append(title)
+        lines.append(f"  {'name':<36}{'calls':>9}{'own (s)':>12}{'cumulative (s)':>16}{'per call (us)':>15}")
+        for label, calls, own, cumulative in rows:
+            lines.append(f"  {label:<36}{calls:>9}{own:>12.4f}{cumulative:>16.4f}{cumulative / calls * 1e6:>15.1f}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def profile_simulation(output_prefix: str = "simulation_profile", **simulation_options: Any) -> Dict[str, str]:
+    """
+    Run the simulation under cProfile and write the results.
+    
+    Args:
+        output_prefix: Path prefix of the output files
+        **simulation_options: Keyword arguments for run_simulation
+    
+    Returns:
+        Paths of the written files: 'report' (sorted text report) and 'stats'
+        (pstats file for viewers such as snakeviz or gprof2dot)
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(run_simulation, **simulation_options)
+    
+    paths = {"report": f"{output_prefix}.txt", "stats": f"{output_prefix}.prof"}
+    profiler.dump_stats(paths["stats"])
+    
+    stats = pstats.Stats(profiler)
+    with open(paths["report"], "w", encoding="utf-8") as report_file:
+        report_file.write(format_profile_report(stats))
+        report_file.write(f"\nTop {TOP_FUNCTIONS} functions by cumulative time\n")
+        pstats.Stats(profiler, stream=report_file).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+    logging.info(f"Wrote profile report to {paths['report']} and statistics to {paths['stats']}")
+    return paths
\ No newline at end of file
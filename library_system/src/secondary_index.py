@@ -0,0 +1,92 @@
+"""
+User-defined secondary indexes maintained through mutation hooks
+"""
+
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Set, Union
+from .book import Book
+from .hooks import MutationHook
+
+# Supported bucket structures
+BUCKET_TYPES = ("list", "set")
+
+
+class SecondaryIndex(MutationHook):
+    """An index from a user-defined key of each book to a bucket of books."""
+    
+    def __init__(self, name: str, key_func: Callable[[Book], Any], bucket: str = "list",
+                 multi_valued: bool = False):
+        """
+        Initialize the index.
+        
+        Args:
+            name: Name used to look the index up, e.g. IndexDict[(name, value)]
+            key_func: Function returning the key of a book, or None to leave it unindexed
+            bucket: Bucket structure, 'list' (insertion order) or 'set' (O(1) removal)
+            multi_valued: If True, key_func returns an iterable of keys per book
+        """
+        if bucket not in BUCKET_TYPES:
+            raise ValueError(f"Unknown bucket type '{bucket}', expected one of {BUCKET_TYPES}")
+        self.name = name
+        self.key_func = key_func
+        self.bucket = bucket
+        self.multi_valued = multi_valued
+        self._buckets: dict = {}
+    
+    def __len__(self) -> int:
+        """Get the number of distinct keys."""
+        return len(self._buckets)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        """Check whether any book has the key."""
+        return key in self._buckets
+    
+    def __repr__(self) -> str:
+        """String representation of the index."""
+        return f"SecondaryIndex(name='{self.name}', bucket='{self.bucket}', keys={len(self._buckets)})"
+    
+    def keys(self) -> Iterable[Hashable]:
+        """Get the indexed keys."""
+        return self._buckets.keys()
+    
+    def _keys_of(self, book: Book) -> Iterable[Hashable]:
+        """Get the keys a book is filed under."""
+        key = self.key_func(book)
+        if key is None:
+            return ()
+        return set(key) if self.multi_valued else (key,)
+    
+    def add_book(self, book: Book) -> None:
+        """File a book under its keys."""
+        for key in self._keys_of(book):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [] if self.bucket == "list" else set()
+            if self.bucket == "list":
+                bucket.append(book)
+            else:
+                bucket.add(book)
+    
+    def remove_book(self, book: Book) -> None:
+        """Remove a book from its buckets."""
+        for key in self._keys_of(book):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                continue
+            if self.bucket == "list":
+                bucket[:] = [b for b in bucket if b != book]
+            else:
+                bucket.discard(book)
+            if not bucket:
+                del self._buckets[key]
+    
+    def get(self, key: Hashable) -> Union[List[Book], Set[Book]]:
+        """Get the bucket of books for a key (empty if none)."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return [] if self.bucket == "list" else set()
+        return bucket
+    
+    def rebuild(self, books: Optional[Iterable[Book]]) -> None:
+        """Drop all buckets and re-index the given books."""
+        self._buckets = {}
+        self.add_books(books or ())
\ No newline at end of file
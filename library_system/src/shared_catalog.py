@@ -0,0 +1,239 @@
+"""
+Read-only catalog published in shared memory for multi-process query workers
+"""
+
+import logging
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .book import Book
+
+# Segment header: magic, book count, then the offset of each section in bytes
+HEADER = struct.Struct("<8s7Q")
+MAGIC = b"LIBSHM01"
+
+# String fields of a record, each stored as an (offset, length) pair into the string heap
+FIELDS = ("title", "author", "genre", "isbn")
+RECORD_WIDTH = 2 * len(FIELDS)
+_TITLE, _AUTHOR, _GENRE, _ISBN = range(len(FIELDS))
+
+# Serializes the resource tracker workaround in _open_untracked
+_ATTACH_LOCK = threading.Lock()
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing segment without registering it with the resource tracker.
+    
+    The tracker unlinks registered segments when the process exits, which must
+    not happen to a segment another process published. Python 3.13 adds
+    track=False for this; on older versions registration is suppressed while
+    the segment is opened. (Unregistering afterwards is not an option: a forked
+    worker shares its parent's tracker, so that would drop the publisher's entry.)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to a multiple of 8 so typed views of the section are aligned."""
+    return (offset + 7) & ~7
+
+
+class SharedCatalog:
+    """
+    An immutable catalog whose records and indices live in one shared memory segment.
+    
+    Layout, after the header:
+    
+    - heap: the UTF-8 bytes of every distinct string
+    - records: per book, an (offset, length) uint32 pair for each field in FIELDS
+    - years: per book, the year as int32
+    - isbn, author and year orders: uint32 record ids sorted by that key (ties by id)
+    
+    One process publishes the segment; any number of others attach to it by
+    name. Queries binary-search the orders directly in the shared buffer, so
+    attaching copies nothing and only the books returned are materialized.
+    """
+    
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool):
+        """
+        Map a segment. Use publish() or attach() instead of calling this directly.
+        
+        Args:
+            segment: The shared memory segment
+            owner: Whether this process created the segment and should unlink it
+        """
+        self.segment = segment
+        self.owner = owner
+        self.logger = logging.getLogger(__name__)
+        buffer = segment.buf if owner else segment.buf.toreadonly()
+        magic, count, heap_at, records_at, years_at, isbn_at, author_at, year_at = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment '{segment.name}' does not hold a catalog")
+        self._count = count
+        # Every view is released in close(), before the segment is unmapped
+        self._views = [buffer]
+        self._heap = self._view(buffer, heap_at, records_at - heap_at)
+        self._records = self._view(buffer, records_at, 4 * RECORD_WIDTH * count, "I")
+        self._years = self._view(buffer, years_at, 4 * count, "i")
+        self._isbn_order = self._view(buffer, isbn_at, 4 * count, "I")
+        self._author_order = self._view(buffer, author_at, 4 * count, "I")
+        self._year_order = self._view(buffer, year_at, 4 * count, "I")
+    
+    def _view(self, buffer: memoryview, offset: int, size: int, fmt: Optional[str] = None) -> memoryview:
+        """Get a (typed) view of one section of the segment."""
+        view = buffer[offset:offset + size]
+        self._views.append(view)
+        if fmt is not None:
+            view = view.cast(fmt)
+            self._views.append(view)
+        return view
+    
+    @classmethod
+    def publish(cls, books: Iterable[Book], name: Optional[str] = None) -> 'SharedCatalog':
+        """
+        Write books and their indices into a new shared memory segment.
+        
+        Args:
+            books: The books to publish; ISBNs must be unique
+            name: Name of the segment (generated if omitted)
+        
+        Returns:
+            The owning SharedCatalog; close() it when done, which also unlinks the segment
+        """
+        book_list = list(books)
+        count = len(book_list)
+        heap = bytearray()
+        interned: Dict[str, Tuple[int, int]] = {}
+        records = array("I")
+        years = array("i")
+        for book in book_list:
+            for text in (book.title, book.author, book.genre, book.isbn):
+                location = interned.get(text)
+                if location is None:
+                    encoded = text.encode("utf-8")
+                    location = interned[text] = (len(heap), len(encoded))
+                    heap += encoded
+                records.extend(location)
+            years.append(book.year)
+        # str order is code point order, which is also the byte order of UTF-8
+        orders = [
+            array("I", sorted(range(count), key=lambda i: book_list[i].isbn)),
+            array("I", sorted(range(count), key=lambda i: book_list[i].author)),
+            array("I", sorted(range(count), key=lambda i: book_list[i].year)),
+        ]
+        
+        sections = [heap, records, years, *orders]
+        offsets, position = [], _align(HEADER.size)
+        for section in sections:
+            offsets.append(position)
+            position = _align(position + len(section) * getattr(section, "itemsize", 1))
+        segment = shared_memory.SharedMemory(name=name, create=True, size=max(position, 1))
+        HEADER.pack_into(segment.buf, 0, MAGIC, count, *offsets)
+        for offset, section in zip(offsets, sections):
+            data = memoryview(section).cast("B")
+            segment.buf[offset:offset + len(data)] = data
+        catalog = cls(segment, owner=True)
+        catalog.logger.info(f"Published {count} books to shared memory segment '{segment.name}' "
+                            f"({position / 1024:.1f} KiB)")
+        return catalog
+    
+    @classmethod
+    def attach(cls, name: str) -> 'SharedCatalog':
+        """
+        Attach read-only to a catalog published by another process.
+        
+        Args:
+            name: Name of the segment
+        
+        Returns:
+            A SharedCatalog; close() it when done (the publisher owns the segment)
+        """
+        return cls(_open_untracked(name), owner=False)
+    
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment, passed to attach() by workers."""
+        return self.segment.name
+    
+    def __len__(self) -> int:
+        """Get the number of books."""
+        return self._count
+    
+    def __getitem__(self, record: int) -> Book:
+        """Get the book at a position in publication order."""
+        if not -self._count <= record < self._count:
+            raise IndexError("SharedCatalog index out of range")
+        return self._book(record % self._count)
+    
+    def __iter__(self) -> Iterator[Book]:
+        """Iterate over the books in publication order."""
+        return (self._book(record) for record in range(self._count))
+    
+    def __repr__(self) -> str:
+        """String representation of the catalog."""
+        return f"SharedCatalog(name='{self.name}', books={self._count}, owner={self.owner})"
+    
+    def __enter__(self) -> 'SharedCatalog':
+        """Enter a with block."""
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        """Close the catalog when the with block ends."""
+        self.close()
+    
+    def _field(self, record: int, field: int) -> bytes:
+        """Get the raw UTF-8 bytes of one field of a record."""
+        start = record * RECORD_WIDTH + 2 * field
+        offset, length = self._records[start], self._records[start + 1]
+        return self._heap[offset:offset + length].tobytes()
+    
+    def _book(self, record: int) -> Book:
+        """Materialize the book stored in a record."""
+        title, author, genre, isbn = (self._field(record, field).decode("utf-8") for field in range(len(FIELDS)))
+        return Book(title, author, self._years[record], genre, isbn)
+    
+    def _span(self, order: memoryview, key, value) -> range:
+        """Get the positions in an order whose record key equals value."""
+        return range(bisect_left(order, value, key=key), bisect_right(order, value, key=key))
+    
+    def search_by_isbn(self, isbn: str) -> Optional[Book]:
+        """Get the book with the given ISBN, if any."""
+        positions = self._span(self._isbn_order, lambda record: self._field(record, _ISBN), isbn.encode("utf-8"))
+        return self._book(self._isbn_order[positions.start]) if positions else None
+    
+    def search_by_author(self, author: str) -> List[Book]:
+        """Get the books by the given author, in publication order."""
+        positions = self._span(self._author_order, lambda record: self._field(record, _AUTHOR),
+                               author.encode("utf-8"))
+        return [self._book(self._author_order[position]) for position in positions]
+    
+    def search_by_year(self, year: int) -> List[Book]:
+        """Get the books published in the given year, in publication order."""
+        positions = self._span(self._year_order, self._years.__getitem__, year)
+        return [self._book(self._year_order[position]) for position in positions]
+    
+    def close(self) -> None:
+        """Unmap the segment, and unlink it if this process published it."""
+        if self._views is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = None
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+            self.logger.info(f"Unlinked shared memory segment '{self.segment.name}'")
\ No newline at end of file
@@ -4,124 +4,248 @@ Simulation module for the library management system
 
 import random
 import logging
-from typing import List
-from .constants import EVENT_TYPES, DEFAULT_STEPS, GENRES
+from contextlib import nullcontext
+from .constants import (
+    EVENT_TYPES, DEFAULT_STEPS, GENRES, MISSING_ISBN, TITLES, AUTHORS, MIN_YEAR, MAX_YEAR
+)
 from .library import Library
+from .storage import StorageBackend
 from .book import Book
+from .catalog_generator import read_catalog
+from .isbn import ISBN_BODY_SPACE, IsbnSequence
+from .trace import Event, TraceWriter
+from .workload import WorkloadGenerator, WorkloadProfile
+
+
+# ISBNs of simulated books, restarted from the seed by run_simulation, so no
+# two books of a run share an ISBN and seeded runs repeat theirs
+_isbns = IsbnSequence()
 
 
 def generate_random_book() -> Book:
     """Generate a random book for simulation purposes."""
-    titles = [
-        "The Great Adventure", "Mystery of the Old House", "Journey to the Unknown",
-        "Secrets of the Forest", "Tales from the Past", "Dreams and Reality",
-        "Echoes of Time", "Shadows and Light", "Legends of Tomorrow", "Whispers in the Wind"
-    ]
-    authors = [
-        "John Smith", "Emily Johnson", "Michael Brown", "Sarah Davis", "Robert Wilson",
-        "Jennifer Taylor", "David Anderson", "Lisa Martinez", "James Thomas", "Patricia Garcia"
-    ]
-    
-    title = random.choice(titles)
-    author = random.choice(authors)
-    year = random.randint(1900, 2025)
+    title = random.choice(TITLES)
+    author = random.choice(AUTHORS)
+    year = random.randint(MIN_YEAR, MAX_YEAR)
     genre = random.choice(GENRES)
-    isbn = f"{random.randint(1000000000, 9999999999)}"
+    isbn = _isbns.next_isbn()
     
     return Book(title=title, author=author, year=year, genre=genre, isbn=isbn)
 
 
-def run_simulation(steps: int = DEFAULT_STEPS, seed: int | None = None) -> None:
+def generate_event(library: Library) -> Event:
+    """
+    Draw the next random event for the current state of the library.
+    
+    Args:
+        library: The library the event will be executed against
+    
+    Returns:
+        An event tuple (event_type, *params)
+    """
+    event_type = random.choice(EVENT_TYPES)
+    
+    if event_type == "add_book":
+        book = generate_random_book()
+        return (event_type, book.title, book.author, book.year, book.genre, book.isbn)
+    
+    if event_type == "remove_book":
+        if len(library.books) == 0:
+            return (event_type, None)
+        # Pick a random book to remove
+        return (event_type, library.books.sample_book().isbn)
+    
+    if event_type in ("search_author", "search_genre", "search_year"):
+        if len(library.books) == 0:
+            return (event_type, None)
+        # Pick the search key from a random existing book, without copying the collection
+        sample_book = library.books.sample_book()
+        attribute = event_type.split("_", 1)[1]
+        return (event_type, getattr(sample_book, attribute))
+    
+    if event_type == "get_missing_book":
+        return (event_type, MISSING_ISBN)
+    
+    return (event_type,)
+
+
+def _event_add_book(library: Library, title: str, author: str, year: int, genre: str, isbn: str) -> str:
+    """Add a new book."""
+    book = Book(title, author, year, genre, isbn)
+    if library.add_book(book):
+        return f"Added book: {book.title} by {book.author}"
+    return f"Failed to add book (already exists): {book.title}"
+
+
+def _event_remove_book(library: Library, isbn: str | None) -> str:
+    """Remove the book with the given ISBN."""
+    if isbn is None:
+        return "No books to remove"
+    book_to_remove = library.indices.get_by_isbn(isbn)
+    if book_to_remove is not None and library.remove_book(book_to_remove):
+        return f"Removed book: {book_to_remove.title} by {book_to_remove.author}"
+    return f"Failed to remove book: {isbn}"
+
+
+def _event_search_author(library: Library, author: str | None) -> str:
+    """Search for books by an author."""
+    if author is None:
+        return "No books in library for author search"
+    results = library.search_by_author(author)
+    return f"Searched for author '{author}', found {len(results)} books"
+
+
+def _event_search_genre(library: Library, genre: str | None) -> str:
+    """Search for books of a genre."""
+    if genre is None:
+        return "No books in library for genre search"
+    results = library.search_by_genre(genre)
+    return f"Searched for genre '{genre}', found {len(results)} books"
+
+
+def _event_search_year(library: Library, year: int | None) -> str:
+    """Search for books published in a year."""
+    if year is None:
+        return "No books in library for year search"
+    results = library.search_by_year(year)
+    return f"Searched for year {year}, found {len(results)} books"
+
+
+def _event_update_index(library: Library) -> str:
+    """Verify and rebuild the library indices."""
+    report = library.update_index()
+    if report.consistent:
+        return "Updated library indices"
+    return f"Updated library indices, repaired drift in: {', '.join(report.drifted)}"
+
+
+def _event_search_isbn(library: Library, isbn: str) -> str:
+    """Look up a book by ISBN."""
+    book = library.search_by_isbn(isbn)
+    if book is None:
+        return f"Searched for ISBN {isbn}, book not found"
+    return f"Searched for ISBN {isbn}, found {book.title}"
+
+
+def _event_get_missing_book(library: Library, isbn: str) -> str:
+    """Try to get a book that doesn't exist."""
+    book = library.search_by_isbn(isbn)
+    if book is None:
+        return f"Tried to get book with ISBN {isbn}, book not found (as expected)"
+    return f"Unexpectedly found book with fake ISBN {isbn}"
+
+
+def _event_checkout_book(library: Library, isbn: str | None, borrower: str) -> str:
+    """Lend a copy of a book."""
+    if isbn is None:
+        return "No books in library to check out"
+    loan = library.checkout_book(isbn, borrower)
+    if loan is None:
+        return f"Could not check out {isbn} to {borrower} (no copy available)"
+    return f"Checked out {isbn} to {borrower}, due on day {loan.due}"
+
+
+def _event_return_book(library: Library, isbn: str | None, borrower: str | None) -> str:
+    """Take back a borrowed copy."""
+    if isbn is None:
+        return "No loans to return"
+    if library.return_book(isbn, borrower) is None:
+        return f"Failed to return {isbn} from {borrower}"
+    return f"Returned {isbn} from {borrower}"
+
+
+def _event_overdue_sweep(library: Library, days: int) -> str:
+    """Advance the loan clock and report newly overdue loans."""
+    overdue = library.overdue_sweep(days)
+    return f"Day {library.loans.today}: {len(overdue)} loans became overdue, {library.loans.overdue_count} overdue in total"
+
+
+# One handler per event type, so profilers attribute time to each event type
+EVENT_HANDLERS = {
+    "add_book": _event_add_book,
+    "remove_book": _event_remove_book,
+    "search_author": _event_search_author,
+    "search_genre": _event_search_genre,
+    "search_year": _event_search_year,
+    "update_index": _event_update_index,
+    "search_isbn": _event_search_isbn,
+    "get_missing_book": _event_get_missing_book,
+    "checkout_book": _event_checkout_book,
+    "return_book": _event_return_book,
+    "overdue_sweep": _event_overdue_sweep,
+}
+
+
+def execute_event(library: Library, event: Event) -> str:
+    """
+    Execute an event against a library.
+    
+    Args:
+        library: The library to run the event against
+        event: An event tuple (event_type, *params)
+    
+    Returns:
+        A human-readable description of the outcome
+    """
+    handler = EVENT_HANDLERS.get(event[0])
+    if handler is None:
+        raise ValueError(f"Unknown event type: {event[0]}")
+    return handler(library, *event[1:])
+
+
+def run_simulation(steps: int = DEFAULT_STEPS, seed: int | None = None, backend: str | StorageBackend | None = None,
+                   trace_path: str | None = None, workload: WorkloadProfile | None = None,
+                   catalog_path: str | None = None, close: bool = True) -> Library:
     """
     Run the library simulation for a specified number of steps.
     
     Args:
         steps: Number of simulation steps to run
         seed: Random seed for reproducible results
+        backend: Storage backend name or instance (defaults to in-memory)
+        trace_path: File to record the generated event stream to (optional)
+        workload: Workload profile shaping the events (uniform events by default)
+        catalog_path: Catalog file bulk-loaded into the library before the run (optional)
+        close: Close the library before returning; pass False to keep querying
+            it, and close it once done
+    
+    Returns:
+        The simulated library (closed unless close=False)
     """
     if seed is not None:
         random.seed(seed)
         logging.info(f"Set random seed to {seed}")
+    _isbns.restart(random.randrange(ISBN_BODY_SPACE))
     
     # Create a library instance
-    library = Library(name="Simulation Library")
+    library = Library(name="Simulation Library", backend=backend)
     logging.info(f"Starting simulation with {steps} steps")
+    if catalog_path:
+        library.add_books(read_catalog(catalog_path))
+        print(f"Loaded catalog {catalog_path}: {library.display_info()}")
+    
+    generator = WorkloadGenerator(workload) if workload is not None else None
+    next_event = generator.next_event if generator is not None else generate_event
     
-    for step in range(steps):
-        event_type = random.choice(EVENT_TYPES)
-        logging.info(f"Step {step + 1}: Executing event '{event_type}'")
+    with TraceWriter(trace_path, steps=steps, seed=seed) if trace_path else nullcontext() as trace:
+        if generator is not None and workload.initial_books:
+            for event in generator.initial_events():
+                if trace is not None:
+                    trace.write(event)
+                execute_event(library, event)
+            print(f"Preloaded catalog: {library.display_info()}")
         
-        if event_type == "add_book":
-            book = generate_random_book()
-            success = library.add_book(book)
-            if success:
-                print(f"Added book: {book.title} by {book.author}")
-            else:
-                print(f"Failed to add book (already exists): {book.title}")
-                
-        elif event_type == "remove_book":
-            if len(library.books) > 0:
-                # Pick a random book to remove
-                book_idx = random.randint(0, len(library.books) - 1)
-                book_to_remove = library.books[book_idx]
-                success = library.remove_book(book_to_remove)
-                if success:
-                    print(f"Removed book: {book_to_remove.title} by {book_to_remove.author}")
-                else:
-                    print(f"Failed to remove book: {book_to_remove.title}")
-            else:
-                print("No books to remove")
-                
-        elif event_type == "search_author":
-            if len(library.books) > 0:
-                # Pick a random author from existing books
-                sample_book = random.choice(list(library.books)) if hasattr(library.books, '__iter__') else library.books[0] if len(library.books) > 0 else None
-                if sample_book:
-                    results = library.search_by_author(sample_book.author)
-                    print(f"Searched for author '{sample_book.author}', found {len(results)} books")
-                else:
-                    print("No books available for author search")
-            else:
-                print("No books in library for author search")
-                
-        elif event_type == "search_genre":
-            if len(library.books) > 0:
-                # Pick a random genre from existing books
-                sample_book = random.choice(list(library.books)) if hasattr(library.books, '__iter__') else library.books[0] if len(library.books) > 0 else None
-                if sample_book:
-                    results = library.search_by_genre(sample_book.genre)
-                    print(f"Searched for genre '{sample_book.genre}', found {len(results)} books")
-                else:
-                    print("No books available for genre search")
-            else:
-                print("No books in library for genre search")
-                
-        elif event_type == "search_year":
-            if len(library.books) > 0:
-                # Pick a random year from existing books
-                sample_book = random.choice(list(library.books)) if hasattr(library.books, '__iter__') else library.books[0] if len(library.books) > 0 else None
-                if sample_book:
-                    results = library.search_by_year(sample_book.year)
-                    print(f"Searched for year {sample_book.year}, found {len(results)} books")
-                else:
-                    print("No books available for year search")
-            else:
-                print("No books in library for year search")
-                
-        elif event_type == "update_index":
-            library.indices.update_index()
-            print("Updated library indices")
-            
-        elif event_type == "get_missing_book":
-            # Try to get a book that doesn't exist
-            fake_isbn = "9999999999999"
-            book = library.search_by_isbn(fake_isbn)
-            if book is None:
-                print(f"Tried to get book with ISBN {fake_isbn}, book not found (as expected)")
-            else:
-                print(f"Unexpectedly found book with fake ISBN {fake_isbn}")
+        for step in range(steps):
+            event = next_event(library)
+            logging.info(f"Step {step + 1}: Executing event '{event[0]}'")
+            if trace is not None:
+                trace.write(event)
+            print(execute_event(library, event))
     
     # Print final library status
     print(f"\nSimulation completed!")
     print(f"Final library status: {library.display_info()}")
-    print(f"Total unique authors: {library.get_unique_authors()}")
\ No newline at end of file
+    print(f"Total unique authors: {library.get_unique_authors()}")
+    if close:
+        library.close()
+    return library
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Immutable point-in-time views of a library
+"""
+
+from typing import Iterator, List, Optional
+from .book import Book
+from .book_collection import BookCollection
+from .index_dict import IndexDict
+
+
+class LibrarySnapshot:
+    """A read-only view of a library's books and indices at a moment in time."""
+    
+    def __init__(self, name: str, books: BookCollection, indices: IndexDict):
+        """
+        Initialize the snapshot.
+        
+        Args:
+            name: Name of the library the snapshot was taken from
+            books: Read-only view of the book collection
+            indices: Read-only view of the indices
+        """
+        self.name = name
+        self.books = books
+        self.indices = indices
+    
+    def __iter__(self) -> Iterator[Book]:
+        """Iterate over the books as they were when the snapshot was taken."""
+        return iter(self.books)
+    
+    def __len__(self) -> int:
+        """Get the number of books in the snapshot."""
+        return len(self.books)
+    
+    def __repr__(self) -> str:
+        """String representation of the snapshot."""
+        return f"LibrarySnapshot(name='{self.name}', books={len(self.books)})"
+    
+    def search_by_isbn(self, isbn: str) -> Optional[Book]:
+        """Get the book with the given ISBN, if it was present."""
+        return self.indices.get_by_isbn(isbn)
+    
+    def search_by_author(self, author: str) -> List[Book]:
+        """Get the books by the given author."""
+        return self.indices.get_by_author(author)
+    
+    def search_by_year(self, year: int) -> List[Book]:
+        """Get the books published in the given year."""
+        return self.indices.get_by_year(year)
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Ordered indexes for browsing the catalog page by page
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from .book import Book
+from .hooks import MutationHook
+
+# Sorts after every ISBN, so (key, _AFTER_ISBNS) bounds all entries with that key
+_AFTER_ISBNS = "\U0010ffff"
+
+# Batches at least this large are merged by re-sorting instead of inserted one by one
+MERGE_THRESHOLD = 64
+
+# Entries a lazy scan copies out of the order at a time
+SCAN_CHUNK = 256
+
+
+class SortedIndex(MutationHook):
+    """
+    Books kept sorted by a key, with ties broken by ISBN.
+    
+    Entries are (key, isbn, book) tuples in one sorted list, so a page is a
+    binary search plus a slice: O(log n + page) instead of sorting the whole
+    collection for every request. With a lookup function the entries hold
+    None instead of the book, which is fetched by ISBN when returned, so the
+    index does not keep every book in memory.
+    """
+    
+    def __init__(self, key_func: Callable[[Book], Any], lookup: Optional[Callable[[str], Optional[Book]]] = None):
+        """
+        Initialize the index.
+        
+        Args:
+            key_func: Function returning the sort key of a book
+            lookup: Function returning the book with an ISBN, if books should not be held
+        """
+        self.key_func = key_func
+        self.lookup = lookup
+        self._entries: List[Tuple[Any, str, Optional[Book]]] = []
+    
+    def __len__(self) -> int:
+        """Get the number of indexed books."""
+        return len(self._entries)
+    
+    def __iter__(self):
+        """Iterate over the books in order."""
+        return self._books(self._entries)
+    
+    def __repr__(self) -> str:
+        """String representation of the index."""
+        return f"SortedIndex(books={len(self._entries)})"
+    
+    def _entry(self, book: Book) -> Tuple[Any, str, Optional[Book]]:
+        """Build the entry of a book."""
+        return (self.key_func(book), book.isbn, book if self.lookup is None else None)
+    
+    def _books(self, entries: Iterable[Tuple[Any, str, Optional[Book]]]) -> List[Book]:
+        """Get the books of entries, fetching them by ISBN if they are not held."""
+        if self.lookup is None:
+            return [entry[2] for entry in entries]
+        return [book for book in map(self.lookup, (entry[1] for entry in entries)) if book is not None]
+    
+    def add_book(self, book: Book) -> None:
+        """Insert a book at its place in the order."""
+        insort(self._entries, self._entry(book))
+    
+    def add_books(self, books: Iterable[Book]) -> None:
+        """Insert many books; large batches are merged with one sort."""
+        batch = [self._entry(book) for book in books]
+        if len(batch) < MERGE_THRESHOLD:
+            for entry in batch:
+                insort(self._entries, entry)
+            return
+        batch.sort()
+        # Timsort finds the two sorted runs and merges them in linear time
+        self._entries += batch
+        self._entries.sort()
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> Callable[[], None]:
+        """
+        Apply a library batch; large batches build a new list in one merge.
+        
+        The new list replaces the old one only once it is complete, so a
+        failure leaves the order untouched, and undoing just puts the old
+        list back.
+        """
+        if len(added) + len(removed) < MERGE_THRESHOLD:
+            return super().apply_batch(added, removed)
+        previous = self._entries
+        gone = {book.isbn for book in removed}
+        entries = [entry for entry in previous if entry[1] not in gone]
+        entries += sorted(self._entry(book) for book in added)
+        # Timsort finds the two sorted runs and merges them in linear time
+        entries.sort()
+        self._entries = entries
+        
+        def undo() -> None:
+            self._entries = previous
+        
+        return undo
+    
+    def remove_book(self, book: Book) -> None:
+        """Remove a book from the order."""
+        position = bisect_left(self._entries, (self.key_func(book), book.isbn))
+        if position < len(self._entries) and self._entries[position][1] == book.isbn:
+            del self._entries[position]
+    
+    def position(self, key: Any) -> int:
+        """Get the offset of the first book whose key is not less than the given key."""
+        return bisect_left(self._entries, (key,))
+    
+    def page(self, offset: int = 0, limit: int = 20, reverse: bool = False,
+             start: Optional[Any] = None) -> List[Book]:
+        """
+        Get one page of books in order.
+        
+        Args:
+            offset: Number of books to skip (counted from the start key, if given)
+            limit: Maximum number of books in the page
+            reverse: Walk the order from the end (descending keys)
+            start: Key to seek to before skipping: the first key not less than it,
+                or when reversed the last key not greater than it
+        
+        Returns:
+            List of at most limit books
+        """
+        entries = self._entries
+        if not reverse:
+            first = offset + (self.position(start) if start is not None else 0)
+            return self._books(entries[first:first + limit])
+        end = bisect_right(entries, (start, _AFTER_ISBNS)) if start is not None else len(entries)
+        end -= offset
+        if end <= 0:
+            return []
+        return self._books(reversed(entries[max(end - limit, 0):end]))
+    
+    def range(self, low: Any, high: Any) -> List[Book]:
+        """
+        Get the books with low <= key <= high, in order.
+        
+        Args:
+            low: Smallest key to include
+            high: Largest key to include
+        
+        Returns:
+            List of books
+        """
+        first = self.position(low)
+        last = bisect_right(self._entries, (high, _AFTER_ISBNS))
+        return self._books(self._entries[first:last])
+    
+    def iter_range(self, low: Any, high: Optional[Any] = None, offset: int = 0) -> Iterator[Book]:
+        """
+        Lazily iterate over the books with low <= key <= high, in order.
+        
+        Entries are copied out in chunks, and each chunk is located again by
+        binary search after the last entry returned, so the scan stays
+        correct when books are added or removed between steps.
+        
+        Args:
+            low: Smallest key to include
+            high: Largest key to include (no upper bound if None)
+            offset: Number of matching books to skip, in O(log n)
+        
+        Returns:
+            An iterator of books
+        """
+        position = self.position(low) + offset
+        while True:
+            chunk = self._entries[position:position + SCAN_CHUNK]
+            if high is not None:
+                end = bisect_right(chunk, (high, _AFTER_ISBNS))
+                if end < len(chunk):
+                    yield from self._books(chunk[:end])
+                    return
+            if not chunk:
+                return
+            yield from self._books(chunk)
+            key, isbn, _ = chunk[-1]
+            # The smallest entry after (key, isbn), wherever the list has shifted since
+            position = bisect_left(self._entries, (key, isbn + "\0"))
+    
+    def iter_prefix(self, prefix: str, offset: int = 0) -> Iterator[Book]:
+        """
+        Lazily iterate over the books whose string key starts with a prefix, in order.
+        
+        Args:
+            prefix: Key prefix to match
+            offset: Number of matching books to skip
+        
+        Returns:
+            An iterator of books
+        """
+        return self.iter_range(prefix, prefix + _AFTER_ISBNS, offset)
+    
+    def rebuild(self, books: Iterable[Book]) -> None:
+        """Drop all entries and index the given books."""
+        self._entries = sorted(self._entry(book) for book in books)
\ No newline at end of file
@@ -0,0 +1,598 @@
+"""
+SQLite storage backend with covering indexes and full-text title search
+"""
+
+import logging
+import random
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from .book import Book
+from .book_collection import BookCollection
+from .constants import SQLITE_BATCH_SIZE, SQLITE_SAMPLE_MAX_SPAN
+from .index_dict import IndexDict, IndexReport
+from .normalize import normalize_key
+from .storage import StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    isbn TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    genre TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    genre_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_isbn ON books (isbn, title, author, year, genre);
+CREATE INDEX IF NOT EXISTS books_author ON books (author, id, title, year, genre, isbn);
+CREATE INDEX IF NOT EXISTS books_year ON books (year, id, title, author, genre, isbn);
+CREATE INDEX IF NOT EXISTS books_genre ON books (genre, id, title, author, year, isbn);
+CREATE INDEX IF NOT EXISTS books_genre_key ON books (genre_key, id, title, author, year, genre, isbn);
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5 (
+    title_key, content='books', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title_key) VALUES (new.id, new.title_key);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title_key) VALUES ('delete', old.id, old.title_key);
+END;
+"""
+
+# Databases created before the normalized key columns existed are upgraded in place
+MIGRATE_KEYS = """
+DROP TRIGGER IF EXISTS books_fts_insert;
+DROP TRIGGER IF EXISTS books_fts_delete;
+DROP TABLE IF EXISTS books_fts;
+ALTER TABLE books ADD COLUMN title_key TEXT NOT NULL DEFAULT '';
+ALTER TABLE books ADD COLUMN genre_key TEXT NOT NULL DEFAULT '';
+UPDATE books SET title_key = normalize_key(title), genre_key = normalize_key(genre);
+"""
+
+COLUMNS = "title, author, year, genre, isbn"
+INSERT_BOOK = (
+    "INSERT INTO books (isbn, title, author, year, genre, title_key, genre_key) VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+DELETE_BOOK = "DELETE FROM books WHERE isbn = ?"
+SELECT_BY_ISBN = f"SELECT {COLUMNS} FROM books WHERE isbn = ?"
+SELECT_BY_AUTHOR = f"SELECT {COLUMNS} FROM books WHERE author = ? ORDER BY id"
+SELECT_BY_YEAR = f"SELECT {COLUMNS} FROM books WHERE year = ? ORDER BY id"
+SELECT_BY_GENRE = f"SELECT {COLUMNS} FROM books WHERE genre = ? ORDER BY id"
+SELECT_BY_GENRE_KEY = f"SELECT {COLUMNS} FROM books WHERE genre_key = ? ORDER BY id"
+SELECT_BY_TITLE_FTS = (
+    "SELECT b.title, b.author, b.year, b.genre, b.isbn "
+    "FROM books_fts JOIN books AS b ON b.id = books_fts.rowid "
+    "WHERE books_fts MATCH ? ORDER BY b.id"
+)
+SELECT_BY_TITLE_LIKE = f"SELECT {COLUMNS} FROM books WHERE title_key LIKE ? ESCAPE '\\' ORDER BY id"
+SELECT_PAGE = f"SELECT id, {COLUMNS} FROM books WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_AT = f"SELECT {COLUMNS} FROM books ORDER BY id LIMIT 1 OFFSET ?"
+SELECT_BY_ID = f"SELECT {COLUMNS} FROM books WHERE id = ?"
+SELECT_ID_RANGE = "SELECT MIN(id), MAX(id) FROM books"
+SELECT_POSITION = "SELECT COUNT(*) FROM books WHERE id < (SELECT id FROM books WHERE isbn = ?)"
+
+# The trigram tokenizer cannot match queries shorter than one trigram
+MIN_FTS_QUERY = 3
+
+# Values bound per IN (...) list, well below SQLite's limit on host parameters
+MAX_IN_VALUES = 500
+
+
+def _row_to_book(row: Tuple) -> Book:
+    """Build a Book from a (title, author, year, genre, isbn) row."""
+    title, author, year, genre, isbn = row
+    return Book(title=title, author=author, year=year, genre=genre, isbn=isbn)
+
+
+class SQLiteStore:
+    """A SQLite database holding the books table, with batched writes."""
+    
+    def __init__(self, path: str = ":memory:", batch_size: int = SQLITE_BATCH_SIZE):
+        """
+        Open (or create) the database.
+        
+        Args:
+            path: Database file, or ':memory:' for a private in-memory database
+            batch_size: Number of buffered mutations that triggers a write transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, cached_statements=64, check_same_thread=False)
+        migrated = self._migrate()
+        self.connection.executescript(SCHEMA)
+        if migrated:
+            # The full-text table was recreated empty; fill it from the new key column
+            with self.connection:
+                self.connection.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        self._pending: List[Tuple[str, tuple]] = []
+        # ISBN -> pending state: the Book for a buffered insert, None for a buffered delete
+        self._pending_state: Dict[str, Optional[Book]] = {}
+        self._count = self.connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        self.logger = logging.getLogger(__name__)
+    
+    def _migrate(self) -> bool:
+        """
+        Add the normalized key columns to a database written by an older version.
+        
+        Returns:
+            True if the database was upgraded
+        """
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(books)")]
+        if not columns or "title_key" in columns:
+            return False
+        self.connection.create_function("normalize_key", 1, normalize_key, deterministic=True)
+        self.connection.executescript(f"BEGIN; {MIGRATE_KEYS} COMMIT;")
+        return True
+    
+    def __len__(self) -> int:
+        """Get the number of stored books, including buffered mutations."""
+        return self._count
+    
+    def contains(self, isbn: str) -> bool:
+        """Check whether a book with the ISBN is stored, without flushing."""
+        return self.lookup(isbn) is not None
+    
+    def lookup(self, isbn: str) -> Optional[Book]:
+        """Get the book with the ISBN, answering from the buffer instead of flushing."""
+        if isbn in self._pending_state:
+            return self._pending_state[isbn]
+        # Buffered mutations never touch this ISBN, so the committed row is current
+        row = self.connection.execute(SELECT_BY_ISBN, (isbn,)).fetchone()
+        return _row_to_book(row) if row is not None else None
+    
+    def insert(self, book: Book) -> bool:
+        """
+        Buffer an insert.
+        
+        Returns:
+            False if a book with the same ISBN is already stored
+        """
+        if self.contains(book.isbn):
+            return False
+        self._pending.append((INSERT_BOOK, (book.isbn, book.title, book.author, book.year, book.genre,
+                                            book.title_key, book.genre_key)))
+        self._pending_state[book.isbn] = book
+        self._count += 1
+        self._maybe_flush()
+        return True
+    
+    def delete(self, isbn: str) -> bool:
+        """
+        Buffer a delete.
+        
+        Returns:
+            False if no book with the ISBN is stored
+        """
+        if not self.contains(isbn):
+            return False
+        self._pending.append((DELETE_BOOK, (isbn,)))
+        self._pending_state[isbn] = None
+        self._count -= 1
+        self._maybe_flush()
+        return True
+    
+    def _maybe_flush(self) -> None:
+        """Flush once the buffer reaches the batch size."""
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Write all buffered mutations in a single transaction."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._pending_state.clear()
+        with self.connection:
+            # Consecutive statements of the same kind go through one executemany
+            start = 0
+            while start < len(pending):
+                statement = pending[start][0]
+                end = start
+                while end < len(pending) and pending[end][0] == statement:
+                    end += 1
+                self.connection.executemany(statement, [params for _, params in pending[start:end]])
+                start = end
+        self.logger.info(f"Flushed {len(pending)} mutations to {self.path}")
+    
+    def query(self, statement: str, params: tuple = ()) -> List[Book]:
+        """Flush buffered mutations and run a book-returning query."""
+        self.flush()
+        return [_row_to_book(row) for row in self.connection.execute(statement, params)]
+    
+    def scalar(self, statement: str, params: tuple = ()) -> Any:
+        """Flush buffered mutations and run a single-value query."""
+        self.flush()
+        return self.connection.execute(statement, params).fetchone()[0]
+    
+    def query_rows(self, statement: str, params: tuple = ()) -> List[Tuple]:
+        """Flush buffered mutations and fetch raw rows."""
+        self.flush()
+        return self.connection.execute(statement, params).fetchall()
+    
+    def query_groups(self, column: str, values: Iterable[Any]) -> Dict[Any, List[Book]]:
+        """
+        Flush buffered mutations and fetch the books matching each of several column values.
+        
+        Args:
+            column: Indexed column to match, e.g. 'author' or 'genre_key'
+            values: Values to look up; each becomes one IN (...) entry
+        
+        Returns:
+            Dictionary of value to its books in insertion order
+        """
+        groups: Dict[Any, List[Book]] = {value: [] for value in values}
+        keys = list(groups)
+        for start in range(0, len(keys), MAX_IN_VALUES):
+            chunk = keys[start:start + MAX_IN_VALUES]
+            statement = (f"SELECT {column}, {COLUMNS} FROM books "
+                         f"WHERE {column} IN ({', '.join('?' * len(chunk))}) ORDER BY id")
+            for row in self.query_rows(statement, tuple(chunk)):
+                groups[row[0]].append(_row_to_book(row[1:]))
+        return groups
+    
+    def sample(self, k: int, rng=random) -> List[Book]:
+        """
+        Flush buffered mutations and pick k distinct books uniformly at random.
+        
+        Row ids are drawn between the smallest and largest id and looked up by
+        primary key, retrying ids freed by deletes, so each book costs a few
+        O(log n) probes while the id range is dense. Sparse tables are sampled
+        by position instead, and samples of most of the table by one scan.
+        
+        Args:
+            k: Number of books (all books if fewer are stored)
+            rng: Source of randomness
+        
+        Returns:
+            List of at most k books
+        """
+        self.flush()
+        count = self._count
+        k = min(k, count)
+        if k <= 0:
+            return []
+        if 2 * k > count:
+            return rng.sample(list(self.iter_books()), k)
+        low, high = self.connection.execute(SELECT_ID_RANGE).fetchone()
+        execute = self.connection.execute
+        if high - low + 1 > SQLITE_SAMPLE_MAX_SPAN * count:
+            return [_row_to_book(execute(SELECT_AT, (position,)).fetchone())
+                    for position in rng.sample(range(count), k)]
+        chosen: Dict[int, Book] = {}
+        while len(chosen) < k:
+            row_id = rng.randint(low, high)
+            if row_id in chosen:
+                continue
+            row = execute(SELECT_BY_ID, (row_id,)).fetchone()
+            if row is not None:
+                chosen[row_id] = _row_to_book(row)
+        return list(chosen.values())
+    
+    def iter_books(self, page_size: int = 1000) -> Iterator[Book]:
+        """Iterate over all books in insertion order, one page at a time."""
+        last_id = -1
+        while True:
+            rows = self.query_rows(SELECT_PAGE, (last_id, page_size))
+            for row in rows:
+                yield _row_to_book(row[1:])
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+    
+    def execute(self, statement: str) -> None:
+        """Flush buffered mutations and run a maintenance statement."""
+        self.flush()
+        self.connection.execute(statement)
+        self.connection.commit()
+    
+    def clear(self) -> None:
+        """Delete every book."""
+        self._pending.clear()
+        self._pending_state.clear()
+        with self.connection:
+            self.connection.execute("DELETE FROM books")
+        self._count = 0
+    
+    def close(self) -> None:
+        """Flush and close the connection."""
+        self.flush()
+        self.connection.close()
+
+
+class SQLiteBookCollection(BookCollection):
+    """A BookCollection stored in SQLite; books are kept in insertion order with unique ISBNs."""
+    
+    def __init__(self, store: SQLiteStore, books: Optional[List[Book]] = None):
+        """
+        Initialize the collection.
+        
+        Args:
+            store: The SQLite store holding the books
+            books: Initial books to insert (optional)
+        """
+        super().__init__()
+        self.store = store
+        if books:
+            self.extend(books)
+    
+    def __getitem__(self, key: Union[int, slice]) -> Union[Book, BookCollection]:
+        """Get a book by position, or an in-memory BookCollection for a slice."""
+        if isinstance(key, slice):
+            return BookCollection(books=list(self)[key])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("BookCollection index out of range")
+        return self.store.query(SELECT_AT, (key,))[0]
+    
+    def __iter__(self) -> Iterator[Book]:
+        """Iterate over the stored books."""
+        return self.store.iter_books()
+    
+    def __len__(self) -> int:
+        """Get the number of stored books."""
+        return len(self.store)
+    
+    def __contains__(self, book: object) -> bool:
+        """Check whether a book with the same ISBN is stored."""
+        return isinstance(book, Book) and self.store.contains(book.isbn)
+    
+    def __repr__(self) -> str:
+        """String representation of the collection."""
+        return f"SQLiteBookCollection(path='{self.store.path}', books={len(self)})"
+    
+    def sample_book(self, rng=random) -> Optional[Book]:
+        """Pick a stored book uniformly at random by probing row ids."""
+        books = self.store.sample(1, rng)
+        return books[0] if books else None
+    
+    def sample_books(self, k: int, rng=random) -> List[Book]:
+        """Pick k distinct stored books uniformly at random."""
+        return self.store.sample(k, rng)
+    
+    def snapshot(self) -> BookCollection:
+        """SQLite collections have no copy-on-write views (supports_snapshots is False)."""
+        raise TypeError("SQLite collections cannot be snapshotted")
+    
+    def append(self, book: Book) -> None:
+        """Add a book; books whose ISBN is already stored are ignored."""
+        self.store.insert(book)
+    
+    def remove(self, book: Book) -> None:
+        """Remove a book, raising ValueError if it is not stored."""
+        if not self.store.delete(book.isbn):
+            raise ValueError(f"{book!r} is not in the collection")
+    
+    def extend(self, books: List[Book]) -> None:
+        """Add multiple books."""
+        for book in books:
+            self.store.insert(book)
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """Remove and add many books in one write transaction."""
+        for book in removed:
+            self.store.delete(book.isbn)
+        for book in added:
+            self.store.insert(book)
+        self.store.flush()
+    
+    def clear(self) -> None:
+        """Remove all books."""
+        self.store.clear()
+    
+    def index(self, book: Book) -> int:
+        """Find the position of a book in insertion order."""
+        if book not in self:
+            raise ValueError(f"{book!r} is not in the collection")
+        return self.store.scalar(SELECT_POSITION, (book.isbn,))
+    
+    def count(self, book: Book) -> int:
+        """Count occurrences of a book (at most one, since ISBNs are unique)."""
+        return int(book in self)
+    
+    def get_books_by_author(self, author: str) -> BookCollection:
+        """Get all books by a specific author."""
+        return BookCollection(books=self.store.query(SELECT_BY_AUTHOR, (author,)))
+    
+    def get_books_by_year(self, year: int) -> BookCollection:
+        """Get all books published in a specific year."""
+        return BookCollection(books=self.store.query(SELECT_BY_YEAR, (year,)))
+    
+    def get_books_by_genre(self, genre: str) -> BookCollection:
+        """Get all books of a specific genre."""
+        return BookCollection(books=self.store.query(SELECT_BY_GENRE, (genre,)))
+    
+    def match_genre(self, genre: str) -> BookCollection:
+        """Get all books of a genre, ignoring case and accents."""
+        return BookCollection(books=self.store.query(SELECT_BY_GENRE_KEY, (normalize_key(genre),)))
+    
+    def match_genres(self, genres: Iterable[str]) -> Dict[str, List[Book]]:
+        """Get the books of several genres with one IN query per chunk of genres."""
+        return self.store.query_groups("genre_key", (normalize_key(genre) for genre in genres))
+    
+    def match_titles(self, titles: Iterable[str]) -> Dict[str, List[Book]]:
+        """Get the books whose title contains each text, with one full-text query per distinct text."""
+        keys = dict.fromkeys(normalize_key(title) for title in titles)
+        return {key: list(self.get_books_by_title(key)) for key in keys}
+    
+    def get_books_by_title(self, title: str) -> BookCollection:
+        """Get all books whose title contains the given text, ignoring case and accents."""
+        title = normalize_key(title)
+        if len(title) >= MIN_FTS_QUERY:
+            phrase = '"' + title.replace('"', '""') + '"'
+            return BookCollection(books=self.store.query(SELECT_BY_TITLE_FTS, (phrase,)))
+        pattern = title.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return BookCollection(books=self.store.query(SELECT_BY_TITLE_LIKE, (f"%{pattern}%",)))
+
+
+class SQLiteIndexDict(IndexDict):
+    """An IndexDict served by the covering indexes of the SQLite books table."""
+    
+    def __init__(self, store: SQLiteStore):
+        """
+        Initialize the indices.
+        
+        Args:
+            store: The SQLite store holding the books
+        """
+        super().__init__()
+        self.store = store
+    
+    def __getitem__(self, key: Union[str, tuple]) -> Any:
+        """Get indexed items by ISBN or by an (index_type, value) tuple."""
+        if isinstance(key, tuple) and len(key) == 2:
+            index_type, value = key
+            if index_type == 'isbn':
+                return self.get_by_isbn(value)
+            if index_type == 'author':
+                return self.get_by_author(value)
+            if index_type == 'year':
+                return self.get_by_year(value)
+            if index_type in self._secondary:
+                return self._secondary[index_type].get(value)
+        elif isinstance(key, str):
+            return self.get_by_isbn(key)
+        raise KeyError(f"Invalid key: {key}")
+    
+    def __setitem__(self, key: Union[str, tuple], value: Union[Book, List[Book]]) -> None:
+        """SQLite indices are derived from the table and cannot be assigned."""
+        raise TypeError("SQLite indices are maintained by the database")
+    
+    def __iter__(self):
+        """Iterate over all (index_type, key) pairs."""
+        keys = set()
+        for index_type in ('isbn', 'author', 'year'):
+            rows = self.store.query_rows(f"SELECT DISTINCT {index_type} FROM books")
+            keys.update((index_type, row[0]) for row in rows)
+        return iter(keys)
+    
+    def __len__(self) -> int:
+        """Get total number of indexed entries across all indices."""
+        return len(self.store) + self.store.scalar(
+            "SELECT (SELECT COUNT(DISTINCT author) FROM books) + (SELECT COUNT(DISTINCT year) FROM books)"
+        )
+    
+    def sample_book(self, rng=random) -> Optional[Book]:
+        """Pick a stored book uniformly at random by probing row ids."""
+        books = self.store.sample(1, rng)
+        return books[0] if books else None
+    
+    def sample_books(self, k: int, rng=random) -> List[Book]:
+        """Pick k distinct stored books uniformly at random."""
+        return self.store.sample(k, rng)
+    
+    def snapshot(self) -> IndexDict:
+        """SQLite indices have no copy-on-write views (supports_snapshots is False)."""
+        raise TypeError("SQLite indices cannot be snapshotted")
+    
+    def add_book(self, book: Book) -> None:
+        """Make sure the book's row exists; the database indexes it."""
+        self.store.insert(book)
+        self.logger.info(f"Indexed book: {book.title} by {book.author} ({book.year})")
+    
+    def add_books(self, books) -> None:
+        """Make sure the rows of many books exist."""
+        for book in books:
+            self.store.insert(book)
+    
+    def remove_book(self, book: Book) -> None:
+        """Make sure the book's row is gone; the database unindexes it."""
+        self.store.delete(book.isbn)
+        self.logger.info(f"Removed book from index: {book.title} by {book.author} ({book.year})")
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """Make sure the rows of removed books are gone and those of added books exist."""
+        for book in removed:
+            self.store.delete(book.isbn)
+        for book in added:
+            self.store.insert(book)
+        self.store.flush()
+    
+    def get_by_isbn(self, isbn: str) -> Optional[Book]:
+        """Get a book by ISBN."""
+        return self.store.lookup(isbn)
+    
+    def get_by_author(self, author: str) -> List[Book]:
+        """Get all books by an author."""
+        return self.store.query(SELECT_BY_AUTHOR, (author,))
+    
+    def get_by_year(self, year: int) -> List[Book]:
+        """Get all books published in a year."""
+        return self.store.query(SELECT_BY_YEAR, (year,))
+    
+    def get_by_authors(self, authors: Iterable[str]) -> Dict[str, List[Book]]:
+        """Get the books of several authors with one IN query per chunk of authors."""
+        return self.store.query_groups("author", authors)
+    
+    def get_by_years(self, years: Iterable[int]) -> Dict[int, List[Book]]:
+        """Get the books of several years with one IN query per chunk of years."""
+        return self.store.query_groups("year", years)
+    
+    def get_all_indices(self) -> Dict[str, Dict]:
+        """Materialize all indices as in-memory dicts."""
+        books = list(self.store.iter_books())
+        return {name: self._build_index(books, name) for name in ('isbn', 'author', 'year')}
+    
+    def audit(self, books) -> IndexReport:
+        """Run SQLite's quick structural check of the table and its indexes."""
+        result = self.store.scalar("PRAGMA quick_check")
+        return IndexReport(drifted=[] if result == "ok" else ['isbn', 'author', 'year'], full=False)
+    
+    def verify(self, books) -> IndexReport:
+        """Run SQLite's full check that every index matches the table."""
+        result = self.store.scalar("PRAGMA integrity_check")
+        return IndexReport(drifted=[] if result == "ok" else ['isbn', 'author', 'year'])
+    
+    def rebuild(self, books) -> None:
+        """Rebuild the table indexes and the title full-text index."""
+        self.store.execute("REINDEX books")
+        self.store.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        for index in self._secondary.values():
+            index.rebuild(self.store.iter_books())
+        self.logger.info(f"Rebuilt indices for {len(self.store)} books")
+    
+    def compact(self) -> None:
+        """Merge full-text index segments and reclaim free pages."""
+        self.store.execute("INSERT INTO books_fts (books_fts) VALUES ('optimize')")
+        self.store.execute("VACUUM")
+        self.logger.info("Compacted indices")
+
+
+class SQLiteBackend(StorageBackend):
+    """Backend storing books in a local SQLite database."""
+    
+    name = "sqlite"
+    # Books live in the database; library structures keep ISBNs, not Book objects
+    resident_books = False
+    supports_snapshots = False
+    
+    def __init__(self, path: str = ":memory:", batch_size: int = SQLITE_BATCH_SIZE):
+        """
+        Initialize the backend.
+        
+        Args:
+            path: Database file, or ':memory:' for a private in-memory database
+            batch_size: Number of buffered mutations written per transaction
+        """
+        self.store = SQLiteStore(path, batch_size=batch_size)
+    
+    def create_collection(self) -> SQLiteBookCollection:
+        """Create the SQLite-backed collection."""
+        return SQLiteBookCollection(self.store)
+    
+    def create_indices(self) -> SQLiteIndexDict:
+        """Create the SQLite-backed indices."""
+        return SQLiteIndexDict(self.store)
+    
+    def flush(self) -> None:
+        """Write out buffered mutations."""
+        self.store.flush()
+    
+    def close(self) -> None:
+        """Flush and close the database."""
+        self.store.close()
+    
+    def __repr__(self) -> str:
+        """String representation of the backend."""
+        return f"SQLiteBackend(path='{self.store.path}')"
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Storage backends providing the book collection and indices of a library
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Type, Union
+from .book_collection import BookCollection
+from .index_dict import IndexDict
+
+
+class StorageBackend(ABC):
+    """Abstract storage backend that creates a library's collection and indices."""
+    
+    name = "abstract"
+    # Whether every Book stays in memory; if not, the library's own structures
+    # keep ISBNs and resolve them through the indices instead of holding books
+    resident_books = True
+    # Whether the collection and indices can take copy-on-write snapshots
+    supports_snapshots = True
+    
+    @abstractmethod
+    def create_collection(self) -> BookCollection:
+        """Create the collection that stores the books."""
+        pass
+    
+    @abstractmethod
+    def create_indices(self) -> IndexDict:
+        """Create the indices over the stored books."""
+        pass
+    
+    def flush(self) -> None:
+        """Write out any buffered mutations."""
+        pass
+    
+    def close(self) -> None:
+        """Flush and release the resources held by the backend."""
+        self.flush()
+    
+    def __repr__(self) -> str:
+        """String representation of the backend."""
+        return f"{self.__class__.__name__}()"
+
+
+class MemoryBackend(StorageBackend):
+    """Default backend keeping books in a list and indices in dicts."""
+    
+    name = "memory"
+    
+    def create_collection(self) -> BookCollection:
+        """Create an in-memory BookCollection."""
+        return BookCollection()
+    
+    def create_indices(self) -> IndexDict:
+        """Create an in-memory IndexDict."""
+        return IndexDict()
+
+
+def available_backends() -> Dict[str, Type[StorageBackend]]:
+    """Get the registered backend classes by name."""
+    from .sqlite_backend import SQLiteBackend
+    from .tiered_backend import TieredBackend
+    return {
+        MemoryBackend.name: MemoryBackend,
+        SQLiteBackend.name: SQLiteBackend,
+        TieredBackend.name: TieredBackend,
+    }
+
+
+def create_backend(backend: Union[str, StorageBackend, None] = None, **options) -> StorageBackend:
+    """
+    Resolve a backend instance.
+    
+    Args:
+        backend: A backend instance, a registered backend name, or None for the default
+        **options: Keyword arguments for the backend constructor when a name is given
+    
+    Returns:
+        A StorageBackend instance
+    """
+    if isinstance(backend, StorageBackend):
+        return backend
+    backends = available_backends()
+    name = backend or MemoryBackend.name
+    if name not in backends:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return backends[name](**options)
\ No newline at end of file
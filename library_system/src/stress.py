@@ -0,0 +1,177 @@
+"""
+Multi-threaded stress test: many clients sharing one Library
+"""
+
+import logging
+import random
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Union
+from .catalog_generator import read_catalog
+from .discrete_event import percentile
+from .library import Library
+from .simulation import execute_event
+from .storage import StorageBackend
+from .workload import WorkloadGenerator, WorkloadProfile
+
+
+def check_invariants(library: Library) -> List[str]:
+    """
+    Check the structures of a library against each other.
+    
+    Args:
+        library: The library to check
+    
+    Returns:
+        Descriptions of the violated invariants (empty if all hold)
+    """
+    violations = []
+    books = list(library.books)
+    isbns = [book.isbn for book in books]
+    if len(set(isbns)) != len(isbns):
+        violations.append(f"duplicate ISBNs in the collection: {len(isbns) - len(set(isbns))}")
+    report = library.indices.verify(library.books)
+    if not report.consistent:
+        violations.append(f"indices disagree with the collection: {', '.join(report.drifted)}")
+    if sum(library.get_genre_counts().values()) != len(books):
+        violations.append(f"genre counts total {sum(library.get_genre_counts().values())}, not {len(books)}")
+    for field, order in library.orders.items():
+        if len(order) != len(books):
+            violations.append(f"browse order '{field}' holds {len(order)} books, not {len(books)}")
+    return violations
+
+
+def _client(library: Library, generator: WorkloadGenerator, events: int, guard, start: threading.Barrier,
+            result: Dict[str, Any]) -> None:
+    """Run one client's events against the shared library, recording latencies and errors."""
+    clock = time.perf_counter
+    latencies = result["latencies"]
+    errors = result["errors"]
+    start.wait()
+    began = clock()
+    for _ in range(events):
+        event_start = clock()
+        try:
+            with guard:
+                execute_event(library, generator.next_event(library))
+        except Exception as error:
+            errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+        latencies.append(clock() - event_start)
+    result["seconds"] = clock() - began
+
+
+def run_stress(clients: int = 4, events_per_client: int = 1000, seed: Optional[int] = None,
+               backend: Union[str, StorageBackend, None] = None, workload: Optional[WorkloadProfile] = None,
+               lock: bool = True, switch_interval: Optional[float] = None,
+               catalog_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the event mix from several client threads against one shared Library.
+    
+    Every client draws its events from its own workload generator and
+    executes them as fast as it can. With lock=True each event runs under
+    one shared lock, the coarse-grained baseline any finer-grained
+    concurrency work has to beat; with lock=False clients race, which
+    exposes lost updates and structures drifting apart. The invariants are
+    checked once all clients have finished.
+    
+    Args:
+        clients: Number of client threads
+        events_per_client: Events each client executes
+        seed: Random seed for the initial catalog and the events
+        backend: Storage backend name or instance (defaults to in-memory)
+        workload: Workload profile of every client (uniform by default)
+        lock: Serialize events with a shared lock
+        switch_interval: Interpreter thread switch interval in seconds while the
+            clients run; shorter intervals interleave threads more finely
+        catalog_path: Catalog file bulk-loaded into the library first (optional)
+    
+    Returns:
+        Report with the total events, wall-clock seconds and throughput, the
+        per-client 'clients' list (events, errors by exception type,
+        throughput, latency 'mean', 'p50' and 'p99' in seconds) and the
+        violated 'invariants'
+    """
+    if seed is not None:
+        random.seed(seed)
+    library = Library(name="Stress Library", backend=backend)
+    if catalog_path:
+        library.add_books(read_catalog(catalog_path))
+    profile = workload or WorkloadProfile()
+    for event in WorkloadGenerator(profile).initial_events():
+        execute_event(library, event)
+    
+    guard = threading.Lock() if lock else nullcontext()
+    barrier = threading.Barrier(clients + 1)
+    results = [{"latencies": [], "errors": {}, "seconds": 0.0} for _ in range(clients)]
+    threads = [
+        threading.Thread(target=_client, name=f"client-{i}",
+                         args=(library, WorkloadGenerator(profile), events_per_client, guard, barrier, results[i]))
+        for i in range(clients)
+    ]
+    previous_interval = sys.getswitchinterval()
+    if switch_interval is not None:
+        sys.setswitchinterval(switch_interval)
+    try:
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+    finally:
+        sys.setswitchinterval(previous_interval)
+    
+    invariants = check_invariants(library)
+    library.close()
+    
+    per_client = []
+    for result in results:
+        latencies = sorted(result["latencies"])
+        per_client.append({
+            "events": len(latencies),
+            "errors": result["errors"],
+            "throughput": len(latencies) / result["seconds"] if result["seconds"] else 0.0,
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+        })
+    total = sum(client["events"] for client in per_client)
+    report = {
+        "clients": per_client,
+        "lock": lock,
+        "events": total,
+        "seconds": elapsed,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "invariants": invariants,
+    }
+    if invariants:
+        logging.warning(f"Stress run broke {len(invariants)} invariants: {'; '.join(invariants)}")
+    return report
+
+
+def format_stress_report(report: Dict[str, Any]) -> str:
+    """Format a stress report as a per-client table and the invariant check results."""
+    lines = [
+        f"{len(report['clients'])} clients, {'one shared lock' if report['lock'] else 'no lock'}: "
+        f"{report['events']} events in {report['seconds']:.3f}s ({report['throughput']:.0f} events/s)",
+        f"  {'client':<10}{'events':>8}{'errors':>8}{'events/s':>11}{'mean (us)':>11}{'p50 (us)':>10}{'p99 (us)':>10}",
+    ]
+    for number, client in enumerate(report["clients"]):
+        lines.append(f"  {number:<10}{client['events']:>8}{sum(client['errors'].values()):>8}"
+                     f"{client['throughput']:>11.0f}{client['mean'] * 1e6:>11.1f}"
+                     f"{client['p50'] * 1e6:>10.1f}{client['p99'] * 1e6:>10.1f}")
+    errors: Dict[str, int] = {}
+    for client in report["clients"]:
+        for name, count in client["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+    if errors:
+        lines.append("  errors: " + ", ".join(f"{name} x{count}" for name, count in sorted(errors.items())))
+    if report["invariants"]:
+        lines.append("Invariants violated:")
+        lines.extend(f"  - {violation}" for violation in report["invariants"])
+    else:
+        lines.append("All invariants hold: indices match the collection and ISBNs are unique")
+    return "\n".join(lines)
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+Tiered storage backend: in-memory indices and an LRU tier of hot books over an on-disk store
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from .book import Book
+from .constants import SQLITE_BATCH_SIZE, TIERED_CACHE_BUDGET
+from .index_dict import IndexDict, IndexReport
+from .sqlite_backend import SQLiteBookCollection, SQLiteIndexDict, SQLiteStore
+from .storage import StorageBackend
+
+
+def book_size(book: Book) -> int:
+    """Estimate the bytes a resident Book keeps alive: the object, its attribute dict and values."""
+    attributes = vars(book)
+    return sys.getsizeof(book) + sys.getsizeof(attributes) + sum(sys.getsizeof(value) for value in attributes.values())
+
+
+def index_isbns(books: Iterable[Book], isbns: Set[str], authors: Dict[str, List[str]],
+                years: Dict[int, List[str]]) -> Tuple[Set[str], Dict[str, List[str]], Dict[int, List[str]]]:
+    """Add books to ISBN-valued indices by ISBN, author and year, and return the indices."""
+    for book in books:
+        isbns.add(book.isbn)
+        authors.setdefault(book.author, []).append(book.isbn)
+        years.setdefault(book.year, []).append(book.isbn)
+    return isbns, authors, years
+
+
+def _as_sets(index):
+    """Get an ISBN index with its buckets as sets, since bucket order depends on how books were written."""
+    return {key: set(bucket) for key, bucket in index.items()} if isinstance(index, dict) else index
+
+
+class BookCache:
+    """
+    The hot tier: Book objects in least-recently-used order under a byte budget.
+    
+    A miss faults the book in from the cold store and evicts the least
+    recently used books until the estimated size fits the budget again.
+    Writes go around the cache, so bulk ingest and full scans do not flush
+    the working set.
+    """
+    
+    def __init__(self, store: SQLiteStore, budget: int = TIERED_CACHE_BUDGET):
+        """
+        Initialize the cache.
+        
+        Args:
+            store: Cold store the books are loaded from
+            budget: Estimated bytes of Book objects to keep resident
+        """
+        self.store = store
+        self.budget = budget
+        self._books: 'OrderedDict[str, Book]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.resident_bytes = 0
+        self.hits = 0
+        self.faults = 0
+        self.evictions = 0
+        self.fault_seconds = 0.0
+    
+    def __len__(self) -> int:
+        """Get the number of resident books."""
+        return len(self._books)
+    
+    def __repr__(self) -> str:
+        """String representation of the cache."""
+        return f"BookCache(books={len(self._books)}, bytes={self.resident_bytes}, budget={self.budget})"
+    
+    def get(self, isbn: str) -> Optional[Book]:
+        """Get a stored book, from memory if it is resident or from the cold store otherwise."""
+        book = self._books.get(isbn)
+        if book is not None:
+            self.hits += 1
+            self._books.move_to_end(isbn)
+            return book
+        start = time.perf_counter()
+        book = self.store.lookup(isbn)
+        self.fault_seconds += time.perf_counter() - start
+        self.faults += 1
+        if book is not None:
+            self._admit(book)
+        return book
+    
+    def discard(self, isbn: str) -> None:
+        """Drop a book from the hot tier, e.g. because it was removed."""
+        if self._books.pop(isbn, None) is not None:
+            self.resident_bytes -= self._sizes.pop(isbn)
+    
+    def clear(self) -> None:
+        """Drop every resident book."""
+        self._books.clear()
+        self._sizes.clear()
+        self.resident_bytes = 0
+    
+    def _admit(self, book: Book) -> None:
+        """Make a faulted-in book resident, evicting the coldest books over budget."""
+        size = book_size(book)
+        self._books[book.isbn] = book
+        self._sizes[book.isbn] = size
+        self.resident_bytes += size
+        while self.resident_bytes > self.budget and self._books:
+            isbn, _ = self._books.popitem(last=False)
+            self.resident_bytes -= self._sizes.pop(isbn)
+            self.evictions += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the cache metrics for sizing the budget.
+        
+        Returns:
+            Hits, faults, hit rate, mean fault latency in microseconds,
+            evictions, resident books and bytes, and the budget
+        """
+        lookups = self.hits + self.faults
+        return {
+            "hits": self.hits,
+            "faults": self.faults,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_fault_us": self.fault_seconds / self.faults * 1e6 if self.faults else 0.0,
+            "evictions": self.evictions,
+            "resident_books": len(self._books),
+            "resident_bytes": self.resident_bytes,
+            "budget_bytes": self.budget,
+        }
+
+
+def format_cache_metrics(metrics: Dict[str, Any]) -> str:
+    """Format cache metrics as a short table."""
+    return "\n".join([
+        f"{'hot tier':<20}{'value':>14}",
+        f"{'lookups':<20}{metrics['hits'] + metrics['faults']:>14}",
+        f"{'hit rate':<20}{metrics['hit_rate']:>14.1%}",
+        f"{'faults':<20}{metrics['faults']:>14}",
+        f"{'mean fault (us)':<20}{metrics['mean_fault_us']:>14.1f}",
+        f"{'evictions':<20}{metrics['evictions']:>14}",
+        f"{'resident books':<20}{metrics['resident_books']:>14}",
+        f"{'resident KiB':<20}{metrics['resident_bytes'] / 1024:>14.1f}",
+        f"{'budget KiB':<20}{metrics['budget_bytes'] / 1024:>14.1f}",
+    ])
+
+
+class TieredIndexDict(SQLiteIndexDict):
+    """
+    Indices kept in memory as ISBNs, resolved to books through the hot tier.
+    
+    Membership checks never touch the disk; only the books a query returns
+    are looked up in the cache, and only the cold ones are read from the store.
+    """
+    
+    def __init__(self, store: SQLiteStore, cache: BookCache):
+        """
+        Initialize the indices from the books already stored.
+        
+        Args:
+            store: The cold store holding the books
+            cache: The hot tier
+        """
+        super().__init__(store)
+        self.cache = cache
+        self._isbns, self._authors, self._years = index_isbns(store.iter_books(), set(), {}, {})
+    
+    def _index_all(self, books: Iterable[Book]) -> None:
+        """Index books by ISBN, author and year without keeping them."""
+        index_isbns(books, self._isbns, self._authors, self._years)
+    
+    def _unindex(self, book: Book) -> None:
+        """Remove a book from the in-memory indices and the hot tier."""
+        if book.isbn not in self._isbns:
+            return
+        self._isbns.discard(book.isbn)
+        for index, key in ((self._authors, book.author), (self._years, book.year)):
+            bucket = index.get(key)
+            if bucket is not None and book.isbn in bucket:
+                bucket.remove(book.isbn)
+                if not bucket:
+                    del index[key]
+        self.cache.discard(book.isbn)
+    
+    def _resolve(self, isbns: Iterable[str]) -> List[Book]:
+        """Get the books for indexed ISBNs through the hot tier."""
+        books = []
+        for isbn in isbns:
+            book = self.cache.get(isbn)
+            if book is not None:
+                books.append(book)
+        return books
+    
+    def add_book(self, book: Book) -> None:
+        """Store a book and index its ISBN."""
+        if book.isbn not in self._isbns:
+            self._index_all((book,))
+        super().add_book(book)
+    
+    def add_books(self, books) -> None:
+        """Store and index many books."""
+        books = [book for book in books if book.isbn not in self._isbns]
+        self._index_all(books)
+        super().add_books(books)
+    
+    def remove_book(self, book: Book) -> None:
+        """Delete a book and unindex it."""
+        self._unindex(book)
+        super().remove_book(book)
+    
+    def apply_batch(self, added: List[Book], removed: List[Book]) -> None:
+        """Apply the net changes of a batch to the store and the in-memory indices."""
+        for book in removed:
+            self._unindex(book)
+        self._index_all(book for book in added if book.isbn not in self._isbns)
+        super().apply_batch(added, removed)
+    
+    def get_by_isbn(self, isbn: str) -> Optional[Book]:
+        """Get a book by ISBN; unknown ISBNs are answered from memory."""
+        return self.cache.get(isbn) if isbn in self._isbns else None
+    
+    def get_by_author(self, author: str) -> List[Book]:
+        """Get all books by an author."""
+        return self._resolve(self._authors.get(author, ()))
+    
+    def get_by_year(self, year: int) -> List[Book]:
+        """Get all books published in a year."""
+        return self._resolve(self._years.get(year, ()))
+    
+    def get_by_authors(self, authors: Iterable[str]) -> Dict[str, List[Book]]:
+        """Get the books of several authors."""
+        return {author: self.get_by_author(author) for author in authors}
+    
+    def get_by_years(self, years: Iterable[int]) -> Dict[int, List[Book]]:
+        """Get the books of several years."""
+        return {year: self.get_by_year(year) for year in years}
+    
+    def _drifted(self) -> List[str]:
+        """Get the in-memory indices whose ISBN count disagrees with the store."""
+        count = len(self.store)
+        drifted = [] if len(self._isbns) == count else ['isbn']
+        for name, index in (('author', self._authors), ('year', self._years)):
+            if sum(len(bucket) for bucket in index.values()) != count:
+                drifted.append(name)
+        return drifted
+    
+    def audit(self, books) -> IndexReport:
+        """Check the entry counts of the in-memory indices and run SQLite's quick check."""
+        report = super().audit(books)
+        return IndexReport(drifted=report.drifted + self._drifted(), full=False)
+    
+    def verify(self, books) -> IndexReport:
+        """Compare the in-memory indices with the stored books and run SQLite's full check."""
+        expected = index_isbns(self.store.iter_books(), set(), {}, {})
+        actual = (self._isbns, self._authors, self._years)
+        drifted = list(super().verify(books).drifted)
+        drifted += [name for name, want, have in zip(('isbn', 'author', 'year'), expected, actual)
+                    if _as_sets(want) != _as_sets(have)]
+        return IndexReport(drifted=drifted)
+    
+    def rebuild(self, books) -> None:
+        """Rebuild the in-memory indices from the store and drop the hot tier."""
+        self._isbns, self._authors, self._years = index_isbns(self.store.iter_books(), set(), {}, {})
+        self.cache.clear()
+        super().rebuild(books)
+
+
+class TieredBackend(StorageBackend):
+    """
+    Backend keeping indices and hot books in memory and every book on disk.
+    
+    Books live in a SQLite file (the cold tier); the ISBN, author and year
+    indices are kept in memory as ISBNs, and Book objects are cached in an
+    LRU hot tier bounded by a byte budget. Library structures that would
+    otherwise keep every Book resident (the browse orders) store ISBNs and
+    resolve them through the indices.
+    """
+    
+    name = "tiered"
+    supports_snapshots = False
+    resident_books = False
+    
+    def __init__(self, path: Optional[str] = None, budget: int = TIERED_CACHE_BUDGET,
+                 batch_size: int = SQLITE_BATCH_SIZE):
+        """
+        Initialize the backend.
+        
+        Args:
+            path: Database file of the cold tier (a temporary file removed on close by default)
+            budget: Estimated bytes of Book objects kept in the hot tier
+            batch_size: Number of buffered mutations written per transaction
+        """
+        self._temporary = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix="library-cold-", suffix=".db")
+            os.close(handle)
+        self.store = SQLiteStore(path, batch_size=batch_size)
+        self.cache = BookCache(self.store, budget)
+        self.logger = logging.getLogger(__name__)
+    
+    def create_collection(self) -> SQLiteBookCollection:
+        """Create the collection, stored in the cold tier."""
+        return SQLiteBookCollection(self.store)
+    
+    def create_indices(self) -> IndexDict:
+        """Create the in-memory indices over the cold tier."""
+        return TieredIndexDict(self.store, self.cache)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Get the hot tier metrics (hit rate, fault latency, residency)."""
+        return self.cache.metrics()
+    
+    def flush(self) -> None:
+        """Write out buffered mutations."""
+        self.store.flush()
+    
+    def close(self) -> None:
+        """Flush and close the cold tier, deleting it if it was temporary."""
+        self.store.close()
+        if self._temporary and os.path.exists(self.store.path):
+            os.remove(self.store.path)
+        self.logger.info(f"Closed tiered backend: {self.cache.metrics()['hit_rate']:.1%} hit rate")
+    
+    def __repr__(self) -> str:
+        """String representation of the backend."""
+        return f"TieredBackend(path='{self.store.path}', budget={self.cache.budget})"
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Recording and replaying simulation event streams
+"""
+
+import gzip
+import json
+import logging
+import time
+from typing import IO, Any, Dict, Iterator, Optional, Tuple
+from .library import Library
+
+# An event is a tuple of the event type followed by its parameters
+Event = Tuple[Any, ...]
+
+TRACE_FORMAT = "library-trace"
+TRACE_VERSION = 1
+
+
+def _open_trace(path: str, mode: str) -> IO[str]:
+    """Open a trace file, gzip-compressed if its name ends with '.gz'."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceWriter:
+    """Writes events to a trace file, one compact JSON array per line."""
+    
+    def __init__(self, path: str, **metadata):
+        """
+        Open the trace file and write its header.
+        
+        Args:
+            path: Trace file to create ('.gz' for gzip compression)
+            **metadata: Extra header fields, e.g. the seed and number of steps
+        """
+        self.path = path
+        self.events = 0
+        self._file = _open_trace(path, "w")
+        header = {"format": TRACE_FORMAT, "version": TRACE_VERSION, **metadata}
+        self._file.write(json.dumps(header, separators=(",", ":")) + "\n")
+    
+    def write(self, event: Event) -> None:
+        """Append an event to the trace."""
+        self._file.write(json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self.events += 1
+    
+    def close(self) -> None:
+        """Close the trace file."""
+        self._file.close()
+        logging.info(f"Recorded {self.events} events to {self.path}")
+    
+    def __enter__(self) -> 'TraceWriter':
+        """Enter the context manager."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the trace file on exit."""
+        self.close()
+
+
+def read_trace_header(path: str) -> Dict[str, Any]:
+    """Read the header of a trace file."""
+    with _open_trace(path, "r") as trace_file:
+        header = json.loads(trace_file.readline())
+    if header.get("format") != TRACE_FORMAT:
+        raise ValueError(f"Not a library trace file: {path}")
+    return header
+
+
+def read_trace(path: str) -> Iterator[Event]:
+    """
+    Iterate over the events of a trace file.
+    
+    Args:
+        path: Trace file to read
+    
+    Returns:
+        An iterator of event tuples
+    """
+    with _open_trace(path, "r") as trace_file:
+        header = json.loads(trace_file.readline())
+        if header.get("format") != TRACE_FORMAT:
+            raise ValueError(f"Not a library trace file: {path}")
+        for line in trace_file:
+            yield tuple(json.loads(line))
+
+
+def replay_trace(path: str, library: Optional[Library] = None) -> Dict[str, Any]:
+    """
+    Execute every event of a trace against a library as fast as possible.
+    
+    Args:
+        path: Trace file to replay
+        library: Library to replay against (a fresh in-memory one by default)
+    
+    Returns:
+        Throughput statistics: total events, elapsed seconds, events per second,
+        and per-event-type counts and seconds
+    """
+    # Imported here because the simulation module records traces itself
+    from .simulation import execute_event
+    
+    if library is None:
+        library = Library(name="Replay Library")
+    # Decode up front so the timing covers only the library work
+    events = list(read_trace(path))
+    
+    per_type: Dict[str, Dict[str, float]] = {}
+    clock = time.perf_counter
+    start = clock()
+    for event in events:
+        event_start = clock()
+        execute_event(library, event)
+        stats = per_type.setdefault(event[0], {"count": 0, "seconds": 0.0})
+        stats["count"] += 1
+        stats["seconds"] += clock() - event_start
+    elapsed = clock() - start
+    
+    return {
+        "events": len(events),
+        "seconds": elapsed,
+        "events_per_second": len(events) / elapsed if elapsed else float("inf"),
+        "per_type": per_type,
+    }
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+Configurable workload profiles for the library simulation
+"""
+
+import json
+import random
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
+from .book import Book
+from .hooks import MutationHook
+from .isbn import ISBN_BODY_SPACE, IsbnSequence
+from .constants import (
+    EVENT_TYPES, EXTRA_EVENT_TYPES, MUTATION_EVENT_TYPES, GENRES, MISSING_ISBN,
+    TITLES, AUTHORS, MIN_YEAR, MAX_YEAR
+)
+from .library import Library
+from .trace import Event
+
+SUPPORTED_EVENT_TYPES = EVENT_TYPES + EXTRA_EVENT_TYPES
+
+# Built-in profiles selectable by name
+PRESET_PROFILES: Dict[str, Dict[str, Any]] = {
+    "uniform": {},
+    "read_heavy": {
+        "event_weights": {
+            "add_book": 4, "remove_book": 3, "search_author": 30, "search_genre": 10,
+            "search_year": 15, "search_isbn": 35, "update_index": 1, "get_missing_book": 2,
+        },
+        "author_skew": 1.1,
+        "isbn_skew": 1.1,
+        "author_pool": 500,
+        "title_pool": 2000,
+        "initial_books": 1000,
+        "burst_probability": 0.01,
+        "burst_length": 50,
+    },
+    "circulation": {
+        "event_weights": {
+            "add_book": 2, "remove_book": 1, "search_author": 10, "search_isbn": 10,
+            "checkout_book": 40, "return_book": 30, "overdue_sweep": 7,
+        },
+        "isbn_skew": 1.0,
+        "initial_books": 1000,
+        "borrower_pool": 300,
+    },
+}
+
+
+class WorkloadProfile:
+    """Event mix, key popularity and catalog growth parameters of a workload."""
+    
+    def __init__(self, event_weights: Optional[Dict[str, float]] = None, author_skew: float = 0.0,
+                 isbn_skew: float = 0.0, author_pool: int = len(AUTHORS), title_pool: int = len(TITLES),
+                 initial_books: int = 0, max_books: Optional[int] = None,
+                 burst_probability: float = 0.0, burst_length: int = 1, borrower_pool: int = 1000):
+        """
+        Initialize the profile.
+        
+        Args:
+            event_weights: Relative weight of each event type (uniform over EVENT_TYPES by default)
+            author_skew: Zipf exponent of author popularity (0 means uniform)
+            isbn_skew: Zipf exponent of book popularity for reads (0 means uniform)
+            author_pool: Number of distinct authors to draw from
+            title_pool: Number of distinct titles to draw from
+            initial_books: Books added before the measured steps
+            max_books: Catalog size at which adds turn into removals (unbounded by default)
+            burst_probability: Chance per step of starting a burst of mutations
+            burst_length: Number of consecutive mutation events in a burst
+            borrower_pool: Number of distinct borrowers checking out books
+        """
+        self.event_weights = dict(event_weights or {event_type: 1 for event_type in EVENT_TYPES})
+        unknown = set(self.event_weights) - set(SUPPORTED_EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown event types in workload: {', '.join(sorted(unknown))}")
+        if not any(weight > 0 for weight in self.event_weights.values()):
+            raise ValueError("Workload needs at least one event type with a positive weight")
+        self.author_skew = author_skew
+        self.isbn_skew = isbn_skew
+        self.author_pool = author_pool
+        self.title_pool = title_pool
+        self.initial_books = initial_books
+        self.max_books = max_books
+        self.burst_probability = burst_probability
+        self.burst_length = burst_length
+        self.borrower_pool = borrower_pool
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WorkloadProfile':
+        """Create a profile from a dict of constructor arguments."""
+        return cls(**data)
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'WorkloadProfile':
+        """Load a profile from a JSON file."""
+        with open(path, encoding="utf-8") as profile_file:
+            return cls.from_dict(json.load(profile_file))
+    
+    @classmethod
+    def load(cls, source: str) -> 'WorkloadProfile':
+        """Load a profile from a preset name or a JSON file path."""
+        if source in PRESET_PROFILES:
+            return cls.from_dict(PRESET_PROFILES[source])
+        return cls.from_file(source)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the profile as a JSON-serializable dict."""
+        return dict(vars(self))
+    
+    def __repr__(self) -> str:
+        """String representation of the profile."""
+        return f"WorkloadProfile({self.to_dict()})"
+
+
+def parse_event_weights(text: str) -> Dict[str, float]:
+    """
+    Parse event weights given on the command line.
+    
+    Args:
+        text: Comma-separated 'event_type=weight' pairs
+    
+    Returns:
+        Dictionary of event type to weight
+    """
+    weights = {}
+    for item in text.split(","):
+        event_type, _, weight = item.partition("=")
+        if not weight:
+            raise ValueError(f"Expected event_type=weight, got '{item}'")
+        weights[event_type.strip()] = float(weight)
+    return weights
+
+
+class ZipfSampler:
+    """Draws ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** exponent."""
+    
+    def __init__(self, exponent: float, rng: random.Random | None = None):
+        """
+        Initialize the sampler.
+        
+        Args:
+            exponent: Zipf exponent; 0 gives a uniform distribution
+            rng: Random number generator (the module-level one by default)
+        """
+        self.exponent = exponent
+        self.rng = rng or random
+        # Prefix sums of the weights, grown on demand; any prefix serves a smaller n
+        self._cumulative: List[float] = []
+    
+    def sample(self, n: int) -> int:
+        """Draw a rank in [0, n) in O(log n)."""
+        if self.exponent == 0:
+            return self.rng.randrange(n)
+        cumulative = self._cumulative
+        while len(cumulative) < n:
+            previous = cumulative[-1] if cumulative else 0.0
+            cumulative.append(previous + 1.0 / (len(cumulative) + 1) ** self.exponent)
+        return bisect_right(cumulative, self.rng.random() * cumulative[n - 1], 0, n - 1)
+
+
+class CatalogPositions(MutationHook):
+    """
+    ISBNs of a library's books in a dense position array, for O(1) popularity picks.
+    
+    Popularity follows position, so picking a popular book is a Zipf draw
+    over positions plus one array read, whatever the backend. Removing a
+    book moves the last ISBN into its slot, so only that one book changes
+    popularity rank.
+    """
+    
+    def __init__(self):
+        """Initialize an empty array."""
+        self._isbns: List[str] = []
+        self._slots: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        """Get the number of positions."""
+        return len(self._isbns)
+    
+    def add_book(self, book: Book) -> None:
+        """Give a new book the next position."""
+        if book.isbn not in self._slots:
+            self._slots[book.isbn] = len(self._isbns)
+            self._isbns.append(book.isbn)
+    
+    def remove_book(self, book: Book) -> None:
+        """Free a removed book's position, filling it with the last book."""
+        slot = self._slots.pop(book.isbn, None)
+        if slot is None:
+            return
+        last = self._isbns.pop()
+        if slot < len(self._isbns):
+            self._isbns[slot] = last
+            self._slots[last] = slot
+    
+    def isbn_at(self, position: int) -> str:
+        """Get the ISBN of the book at a position."""
+        return self._isbns[position]
+
+
+class WorkloadGenerator:
+    """Generates simulation events shaped by a WorkloadProfile."""
+    
+    def __init__(self, profile: WorkloadProfile):
+        """
+        Initialize the generator.
+        
+        Args:
+            profile: The workload profile to follow
+        """
+        self.profile = profile
+        self.authors = self._vocabulary(AUTHORS, profile.author_pool)
+        self.titles = self._vocabulary(TITLES, profile.title_pool)
+        self._event_types = [event for event, weight in profile.event_weights.items() if weight > 0]
+        self._cum_weights = self._cumulate([profile.event_weights[event] for event in self._event_types])
+        self._mutation_types = [event for event in MUTATION_EVENT_TYPES if profile.event_weights.get(event, 0) > 0]
+        self._mutation_weights = self._cumulate([profile.event_weights[event] for event in self._mutation_types])
+        self._author_sampler = ZipfSampler(profile.author_skew)
+        self._book_sampler = ZipfSampler(profile.isbn_skew)
+        self._burst_remaining = 0
+        # Same collision-free scheme as generated catalogs, so adds never clash on ISBN
+        self._isbns = IsbnSequence(random.randrange(ISBN_BODY_SPACE))
+        # Positions of the books of the library being driven, registered on it as a hook
+        self._positions: Optional[CatalogPositions] = None
+        self._positions_library: Optional[Library] = None
+    
+    @staticmethod
+    def _vocabulary(base: List[str], size: int) -> List[str]:
+        """Extend a word list to the requested size with numbered variants."""
+        return [base[i % len(base)] + (f" {i // len(base) + 1}" if i >= len(base) else "") for i in range(size)]
+    
+    @staticmethod
+    def _cumulate(weights: List[float]) -> List[float]:
+        """Get prefix sums of weights for random.choices."""
+        total, result = 0.0, []
+        for weight in weights:
+            total += weight
+            result.append(total)
+        return result
+    
+    def generate_book(self) -> Book:
+        """Generate a book whose author follows the profile's popularity skew."""
+        author = self.authors[self._author_sampler.sample(len(self.authors))]
+        return Book(
+            title=random.choice(self.titles),
+            author=author,
+            year=random.randint(MIN_YEAR, MAX_YEAR),
+            genre=random.choice(GENRES),
+            isbn=self._isbns.next_isbn(),
+        )
+    
+    def initial_events(self) -> List[Event]:
+        """Get the add events that build the initial catalog."""
+        return [self._add_event() for _ in range(self.profile.initial_books)]
+    
+    def _add_event(self) -> Event:
+        """Create an add_book event for a new random book."""
+        book = self.generate_book()
+        return ("add_book", book.title, book.author, book.year, book.genre, book.isbn)
+    
+    def _choose_event_type(self) -> str:
+        """Pick the next event type, honouring mutation bursts."""
+        if self._burst_remaining == 0 and self._mutation_types and random.random() < self.profile.burst_probability:
+            self._burst_remaining = self.profile.burst_length
+        if self._burst_remaining > 0:
+            self._burst_remaining -= 1
+            return random.choices(self._mutation_types, cum_weights=self._mutation_weights)[0]
+        return random.choices(self._event_types, cum_weights=self._cum_weights)[0]
+    
+    def _catalog_positions(self, library: Library) -> CatalogPositions:
+        """Get the position array of a library, registering it on the first event for that library."""
+        if self._positions_library is not library:
+            if self._positions_library is not None:
+                self._positions_library.remove_hook(self._positions)
+            self._positions = CatalogPositions()
+            library.add_hook(self._positions)
+            self._positions_library = library
+        return self._positions
+    
+    def _popular_isbn(self, library: Library) -> str:
+        """Pick the ISBN of a book, popular (low) positions more often."""
+        positions = self._catalog_positions(library)
+        return positions.isbn_at(self._book_sampler.sample(len(positions)))
+    
+    def next_event(self, library: Library) -> Event:
+        """
+        Draw the next event for the current state of the library.
+        
+        Args:
+            library: The library the event will be executed against
+        
+        Returns:
+            An event tuple (event_type, *params)
+        """
+        event_type = self._choose_event_type()
+        size = len(library.books)
+        max_books = self.profile.max_books
+        if event_type == "add_book" and max_books is not None and size >= max_books:
+            event_type = "remove_book"
+        
+        if event_type == "add_book":
+            return self._add_event()
+        if event_type == "search_author":
+            return (event_type, self.authors[self._author_sampler.sample(len(self.authors))])
+        if event_type == "get_missing_book":
+            return (event_type, MISSING_ISBN)
+        if event_type == "update_index":
+            return (event_type,)
+        if event_type == "overdue_sweep":
+            # Each sweep closes one day of the simulated loan clock
+            return (event_type, 1)
+        if event_type == "return_book":
+            loan = library.loans.random_loan(random)
+            return (event_type, None, None) if loan is None else (event_type, loan.isbn, loan.borrower)
+        if event_type == "checkout_book":
+            borrower = f"reader-{random.randrange(self.profile.borrower_pool)}"
+            if size == 0:
+                return (event_type, None, borrower)
+            return (event_type, self._popular_isbn(library), borrower)
+        
+        if size == 0:
+            return (event_type, None) if event_type != "search_isbn" else (event_type, MISSING_ISBN)
+        if event_type == "remove_book":
+            return (event_type, library.books.sample_book().isbn)
+        # Reads pick popular books more often; popularity follows catalog position
+        book = library.indices.get_by_isbn(self._popular_isbn(library))
+        attribute = event_type.split("_", 1)[1]
+        return (event_type, getattr(book, attribute))
\ No newline at end of file
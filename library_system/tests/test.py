@@ -2,12 +2,58 @@
 Tests for the Library Management System
 """
 
+import gc
+import logging
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+from itertools import islice
 import pytest
+import main
 from src.book import Book
 from src.book_collection import BookCollection
 from src.index_dict import IndexDict
 from src.library import Library
-from src.simulation import generate_random_book, run_simulation
+from src.simulation import generate_random_book, run_simulation, execute_event
+from src.trace import TraceWriter, read_trace, read_trace_header, replay_trace
+from src.profiling import profile_simulation
+from src.memory import deep_sizeof, format_memory_usage, trace_allocations
+from src.catalog_generator import CatalogGenerator, read_catalog, write_catalog
+from src.isbn import is_valid_isbn13
+from src.autocomplete import PrefixIndex
+from src.hooks import MutationHook
+from src import dedup, sorted_index
+from src import library as library_module
+from src.dedup import DuplicateFinder, normalize_text
+from src.workload import WorkloadGenerator, WorkloadProfile, ZipfSampler, parse_event_weights
+from src.sqlite_backend import SQLiteBackend
+from src.shared_catalog import SharedCatalog
+from src.storage import create_backend
+from src.normalize import normalize_key
+from src.tiered_backend import TieredBackend, book_size, format_cache_metrics
+from src.stress import check_invariants, format_stress_report, run_stress
+from src.bitmap_index import BitmapIndex, bitmap_and, bitmap_count, bitmap_or, bitmap_rows
+from src.merkle import MerkleTree, record_digest
+from src.discrete_event import format_queueing_report, percentile, run_discrete_event
+
+
+@pytest.fixture(params=["memory", "sqlite", "tiered"])
+def backend(request, monkeypatch):
+    """Storage backend name; Library tests run against every backend, whose storage is closed afterwards."""
+    opened = []
+    
+    def tracked_create_backend(*args, **options):
+        storage = create_backend(*args, **options)
+        opened.append(storage)
+        return storage
+    
+    # Close the databases and temporary files of every library the test opened
+    monkeypatch.setattr(library_module, "create_backend", tracked_create_backend)
+    yield request.param
+    for storage in opened:
+        storage.close()
 
 
 class TestBook:
@@ -212,16 +258,16 @@ class TestIndexDict:
 class TestLibrary:
     """Test cases for the Library class."""
     
-    def test_library_creation(self):
+    def test_library_creation(self, backend):
         """Test creating a library."""
-        library = Library("Test Library")
+        library = Library("Test Library", backend=backend)
         assert library.name == "Test Library"
         assert len(library.books) == 0
         assert library.display_info() == "Library 'Test Library' contains 0 books"
     
-    def test_add_book(self):
+    def test_add_book(self, backend):
         """Test adding a book to the library."""
-        library = Library()
+        library = Library(backend=backend)
         book = Book("Title", "Author", 2023, "Fiction", "1234567890")
         
         result = library.add_book(book)
@@ -230,9 +276,9 @@ class TestLibrary:
         assert library.books[0] == book
         assert library.search_by_isbn("1234567890") == book
     
-    def test_remove_book(self):
+    def test_remove_book(self, backend):
         """Test removing a book from the library."""
-        library = Library()
+        library = Library(backend=backend)
         book = Book("Title", "Author", 2023, "Fiction", "1234567890")
         library.add_book(book)
         
@@ -241,9 +287,25 @@ class TestLibrary:
         assert len(library.books) == 0
         assert library.search_by_isbn("1234567890") is None
     
-    def test_search_by_author(self):
+    def test_remove_book_by_equal_isbn(self, backend):
+        """Test that removing by an ISBN-equal book with other fields removes the stored record everywhere."""
+        library = Library(backend=backend)
+        library.enable_autocomplete()
+        library.add_book(Book("Alpha", "X", 2000, "Fiction", "1"))
+        
+        assert library.remove_book(Book("Beta", "Y", 1990, "Poetry", "1")) is True
+        assert len(library.books) == 0
+        assert library.get_unique_authors() == 0
+        assert dict(library.get_genre_counts()) == {}
+        assert library.browse("title") == []
+        assert library.autocomplete("al") == []
+        assert library.search_by_author("X") == []
+        assert library.update_index(audit_only=True).consistent
+        assert library.remove_book(Book("Alpha", "X", 2000, "Fiction", "1")) is False
+    
+    def test_search_by_author(self, backend):
         """Test searching for books by author."""
-        library = Library()
+        library = Library(backend=backend)
         book1 = Book("Title1", "Author1", 2023, "Fiction", "1234567890")
         book2 = Book("Title2", "Author1", 2022, "Non-Fiction", "0987654321")
         library.add_book(book1)
@@ -254,9 +316,9 @@ class TestLibrary:
         assert book1 in results
         assert book2 in results
     
-    def test_search_by_year(self):
+    def test_search_by_year(self, backend):
         """Test searching for books by year."""
-        library = Library()
+        library = Library(backend=backend)
         book1 = Book("Title1", "Author1", 2023, "Fiction", "1234567890")
         book2 = Book("Title2", "Author2", 2023, "Non-Fiction", "0987654321")
         library.add_book(book1)
@@ -267,9 +329,9 @@ class TestLibrary:
         assert book1 in results
         assert book2 in results
     
-    def test_call_method(self):
+    def test_call_method(self, backend):
         """Test calling the library as a function."""
-        library = Library()
+        library = Library(backend=backend)
         book = Book("Test Title", "Test Author", 2023, "Fiction", "1234567890")
         library.add_book(book)
         
@@ -291,8 +353,1453 @@ class TestSimulation:
         assert book.genre != ""
         assert book.isbn != ""
     
+    def test_simulated_isbns_never_collide(self):
+        """Test that simulated and workload books get distinct, valid ISBN-13s from the catalog scheme."""
+        run_simulation(steps=0, seed=8)
+        simulated = [generate_random_book().isbn for _ in range(5000)]
+        generator = WorkloadGenerator(WorkloadProfile())
+        generated = [generator.generate_book().isbn for _ in range(5000)]
+        for isbns in (simulated, generated):
+            assert len(set(isbns)) == len(isbns)
+            assert all(is_valid_isbn13(isbn) for isbn in isbns)
+        run_simulation(steps=0, seed=8)
+        assert generate_random_book().isbn == simulated[0]
+    
     def test_run_simulation(self):
         """Test running the simulation."""
         # Just make sure it runs without errors
         run_simulation(steps=5, seed=42)
-        assert True  # If we reach here, the simulation ran without errors
\ No newline at end of file
+        assert True  # If we reach here, the simulation ran without errors
+
+
+class TestCatalogStats:
+    """Test cases for incrementally maintained catalog statistics."""
+    
+    def test_counts_follow_mutations(self):
+        """Test that genre, decade and author counts track add/remove."""
+        library = Library()
+        book1 = Book("Title1", "Author1", 2023, "Fiction", "1234567890")
+        book2 = Book("Title2", "Author1", 2021, "Mystery", "0987654321")
+        book3 = Book("Title3", "Author2", 1999, "Fiction", "1111111111")
+        for book in (book1, book2, book3):
+            library.add_book(book)
+        
+        assert library.get_unique_authors() == 2
+        assert dict(library.get_genre_counts()) == {"Fiction": 2, "Mystery": 1}
+        assert dict(library.get_decade_counts()) == {2020: 2, 1990: 1}
+        
+        library.remove_book(book3)
+        assert library.get_unique_authors() == 1
+        assert dict(library.get_genre_counts()) == {"Fiction": 1, "Mystery": 1}
+        assert dict(library.get_decade_counts()) == {2020: 2}
+    
+    def test_failed_mutations_do_not_change_counts(self):
+        """Test that duplicate adds and missing removals leave counters untouched."""
+        library = Library()
+        book = Book("Title", "Author", 2023, "Fiction", "1234567890")
+        library.add_book(book)
+        library.add_book(book)
+        library.remove_book(Book("Other", "Other", 2000, "Poetry", "0000000000"))
+        
+        assert library.stats.author_count("Author") == 1
+        assert dict(library.get_genre_counts()) == {"Fiction": 1}
+    
+    def test_top_authors(self):
+        """Test the top-k author leaderboard."""
+        library = Library()
+        counts = {"A": 3, "B": 1, "C": 2}
+        isbn = 0
+        for author, count in counts.items():
+            for _ in range(count):
+                isbn += 1
+                library.add_book(Book("T", author, 2000, "Fiction", str(isbn)))
+        
+        assert library.get_top_authors(2) == [("A", 3), ("C", 2)]
+        
+        for book in library.search_by_author("A")[:2]:
+            library.remove_book(book)
+        assert library.get_top_authors() == [("C", 2), ("B", 1), ("A", 1)]
+
+
+class TestSnapshot:
+    """Test cases for copy-on-write library snapshots."""
+    
+    def test_snapshot_is_isolated_from_later_mutations(self):
+        """Test that a snapshot keeps its contents while the library changes."""
+        library = Library()
+        book1 = Book("Title1", "Author1", 2023, "Fiction", "1234567890")
+        book2 = Book("Title2", "Author1", 2023, "Fiction", "0987654321")
+        library.add_book(book1)
+        
+        snapshot = library.snapshot()
+        library.add_book(book2)
+        library.remove_book(book1)
+        
+        assert list(snapshot) == [book1]
+        assert snapshot.search_by_author("Author1") == [book1]
+        assert snapshot.search_by_year(2023) == [book1]
+        assert snapshot.search_by_isbn("0987654321") is None
+        assert library.search_by_author("Author1") == [book2]
+        assert list(library.books) == [book2]
+    
+    def test_snapshot_shares_storage_until_write(self):
+        """Test that taking a snapshot does not copy the collection."""
+        library = Library()
+        library.add_book(Book("Title", "Author", 2023, "Fiction", "1234567890"))
+        
+        snapshot = library.snapshot()
+        assert snapshot.books._books is library.books._books
+        assert snapshot.indices._indices is library.indices._indices
+    
+    def test_older_snapshot_survives_newer_one(self):
+        """Test that dropping a newer snapshot does not expose an older one to later writes."""
+        library = Library()
+        book1 = Book("Title1", "Author1", 2023, "Fiction", "1")
+        library.add_book(book1)
+        older = library.snapshot()
+        newer = library.snapshot()
+        del newer
+        gc.collect()
+        library.add_book(Book("Title2", "Author1", 2023, "Fiction", "2"))
+        library.remove_book(book1)
+        
+        assert list(older) == [book1]
+        assert older.search_by_isbn("1") is book1
+        assert older.search_by_isbn("2") is None
+        assert older.search_by_author("Author1") == [book1]
+        assert [book.isbn for book in library.books] == ["2"]
+    
+    def test_snapshot_support_by_backend(self, backend):
+        """Test that backends without snapshots fail with a backend-neutral error naming the backend."""
+        library = Library(backend=backend)
+        library.add_book(Book("Title", "Author", 2023, "Fiction", "1234567890"))
+        if library.backend.supports_snapshots:
+            assert len(library.snapshot()) == 1
+        else:
+            with pytest.raises(NotImplementedError, match=f"'{backend}' storage backend"):
+                library.snapshot()
+            with pytest.raises(TypeError):
+                library.books.snapshot()
+            with pytest.raises(TypeError):
+                library.indices.snapshot()
+        library.close()
+    
+    def test_snapshot_is_read_only(self):
+        """Test that snapshot views reject mutations."""
+        library = Library()
+        snapshot = library.snapshot()
+        book = Book("Title", "Author", 2023, "Fiction", "1234567890")
+        
+        with pytest.raises(TypeError):
+            snapshot.books.append(book)
+        with pytest.raises(TypeError):
+            snapshot.indices.add_book(book)
+    
+    def test_successive_snapshots(self):
+        """Test that each snapshot sees its own point in time."""
+        library = Library()
+        books = [Book(f"T{i}", "Author", 2000, "Fiction", str(i)) for i in range(3)]
+        snapshots = []
+        for book in books:
+            library.add_book(book)
+            snapshots.append(library.snapshot())
+        
+        assert [len(s) for s in snapshots] == [1, 2, 3]
+        assert [len(s.search_by_author("Author")) for s in snapshots] == [1, 2, 3]
+
+
+class TestIndexUpdate:
+    """Test cases for index verification, audit and rebuild."""
+    
+    def _library(self):
+        """Create a library with three indexed books."""
+        library = Library()
+        library.add_book(Book("Title1", "Author1", 2023, "Fiction", "1234567890"))
+        library.add_book(Book("Title2", "Author1", 2022, "Mystery", "0987654321"))
+        library.add_book(Book("Title3", "Author2", 2023, "Fiction", "1111111111"))
+        return library
+    
+    def test_consistent_indices(self):
+        """Test that a library maintained through its API reports no drift."""
+        library = self._library()
+        assert library.update_index(audit_only=True).consistent
+        assert library.update_index().consistent
+    
+    def test_drift_is_reported_and_repaired(self):
+        """Test that books bypassing the indices are detected and reindexed."""
+        library = self._library()
+        extra = Book("Title4", "Author3", 2000, "Poetry", "2222222222")
+        library.books.append(extra)
+        
+        audit = library.update_index(audit_only=True)
+        assert not audit.consistent
+        
+        report = library.update_index()
+        assert report.missing == ["2222222222"]
+        assert set(report.drifted) == {"isbn", "author", "year"}
+        assert library.search_by_author("Author3") == [extra]
+        assert library.update_index(audit_only=True).consistent
+    
+    def test_stale_entries_are_removed(self):
+        """Test that index entries without a book in the collection are dropped."""
+        library = self._library()
+        stale = library.books[0]
+        library.books.remove(stale)
+        
+        report = library.update_index()
+        assert report.stale == ["1234567890"]
+        assert library.search_by_isbn("1234567890") is None
+        assert stale not in library.search_by_year(2023)
+    
+    def test_checksum_tracks_direct_index_writes(self):
+        """Test that __setitem__ keeps the audit checksum accurate."""
+        library = self._library()
+        library.indices[('author', 'Author1')] = []
+        assert library.update_index(audit_only=True).drifted == ["author"]
+    
+    def test_compact_drops_empty_buckets(self):
+        """Test compaction without a collection."""
+        index_dict = IndexDict()
+        index_dict[('author', 'Nobody')] = []
+        index_dict.update_index()
+        assert ('author', 'Nobody') not in set(index_dict)
+
+
+class TestSQLiteBackend:
+    """Test cases for the SQLite storage backend."""
+    
+    def test_books_persist_across_reopen(self, tmp_path):
+        """Test that a file-backed library keeps its books and statistics."""
+        path = str(tmp_path / "catalog.db")
+        library = Library(backend=SQLiteBackend(path))
+        library.add_book(Book("Title1", "Author1", 2023, "Fiction", "1234567890"))
+        library.add_book(Book("Title2", "Author2", 2022, "Mystery", "0987654321"))
+        library.close()
+        
+        reopened = Library(backend=SQLiteBackend(path))
+        assert len(reopened.books) == 2
+        assert reopened.search_by_isbn("0987654321").title == "Title2"
+        assert reopened.get_unique_authors() == 2
+        reopened.close()
+    
+    def test_mutations_are_batched(self):
+        """Test that writes are buffered until the batch fills or a read needs them."""
+        backend = SQLiteBackend(batch_size=3)
+        library = Library(backend=backend)
+        for i in range(2):
+            library.add_book(Book(f"Title{i}", "Author", 2000, "Fiction", str(i)))
+        
+        count = backend.store.connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        assert count == 0
+        assert len(library.books) == 2
+        assert library.add_book(Book("Dup", "Author", 2000, "Fiction", "1")) is False
+        
+        assert len(library.search_by_author("Author")) == 2
+        count = backend.store.connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        assert count == 2
+    
+    def test_title_search(self):
+        """Test full-text and short substring title search."""
+        library = Library(backend="sqlite")
+        library.add_book(Book("The Great Adventure", "Author1", 2023, "Fiction", "1234567890"))
+        library.add_book(Book("Echoes of Time", "Author2", 2022, "Fiction", "0987654321"))
+        
+        assert [b.isbn for b in library.search_by_title("great adv")] == ["1234567890"]
+        assert [b.isbn for b in library.search_by_title("of")] == ["0987654321"]
+        assert len(library.search_by_title("")) == 2
+    
+    def test_collection_and_index_interfaces(self):
+        """Test list-like and dict-like access on the SQLite collection and indices."""
+        library = Library(backend="sqlite")
+        books = [Book(f"Title{i}", f"Author{i % 2}", 2000 + i, "Fiction", str(i)) for i in range(4)]
+        for book in books:
+            library.add_book(book)
+        
+        assert library.books[-1] == books[3]
+        assert list(library.books[1:3]) == books[1:3]
+        assert library.books.index(books[2]) == 2
+        assert library.indices[('author', 'Author1')] == [books[1], books[3]]
+        assert len(library.indices) == 4 + 2 + 4
+        assert library.update_index().consistent
+
+
+class TestTrace:
+    """Test cases for event trace recording and replay."""
+    
+    def test_trace_round_trip(self, tmp_path):
+        """Test that events survive writing and reading, with and without gzip."""
+        events = [
+            ("add_book", "Title", "Author", 2023, "Fiction", "1234567890"),
+            ("search_author", "Author"),
+            ("remove_book", None),
+            ("update_index",),
+        ]
+        for name in ("trace.jsonl", "trace.jsonl.gz"):
+            path = str(tmp_path / name)
+            with TraceWriter(path, seed=1, steps=len(events)) as trace:
+                for event in events:
+                    trace.write(event)
+            assert list(read_trace(path)) == events
+            assert read_trace_header(path)["seed"] == 1
+    
+    def test_replay_reproduces_recorded_run(self, tmp_path):
+        """Test that replaying a recorded simulation ends in the same state."""
+        path = str(tmp_path / "trace.jsonl")
+        run_simulation(steps=60, seed=7, trace_path=path)
+        
+        first, second = Library(), Library()
+        stats = replay_trace(path, first)
+        replay_trace(path, second)
+        
+        assert stats["events"] == 60
+        assert sum(s["count"] for s in stats["per_type"].values()) == 60
+        assert [b.isbn for b in first.books] == [b.isbn for b in second.books]
+    
+    def test_execute_event(self):
+        """Test executing individual events."""
+        library = Library()
+        message = execute_event(library, ("add_book", "Title", "Author", 2023, "Fiction", "1234567890"))
+        assert message == "Added book: Title by Author"
+        assert execute_event(library, ("remove_book", "1234567890")).startswith("Removed book")
+        assert len(library.books) == 0
+        with pytest.raises(ValueError):
+            execute_event(library, ("unknown_event",))
+
+
+class TestWorkload:
+    """Test cases for workload profiles and the skewed event generator."""
+    
+    def test_profile_loading_and_validation(self, tmp_path):
+        """Test loading profiles from presets and files and rejecting bad weights."""
+        assert WorkloadProfile.load("read_heavy").initial_books > 0
+        
+        path = tmp_path / "profile.json"
+        path.write_text('{"event_weights": {"search_isbn": 9, "add_book": 1}, "author_skew": 1.2}')
+        profile = WorkloadProfile.load(str(path))
+        assert profile.event_weights == {"search_isbn": 9, "add_book": 1}
+        assert profile.author_skew == 1.2
+        
+        with pytest.raises(ValueError):
+            WorkloadProfile(event_weights={"fly_to_moon": 1})
+        assert parse_event_weights("add_book=1, search_year=2.5") == {"add_book": 1.0, "search_year": 2.5}
+    
+    def test_zipf_sampler_is_skewed(self):
+        """Test that low ranks dominate a skewed distribution."""
+        random.seed(3)
+        sampler = ZipfSampler(1.2)
+        draws = [sampler.sample(1000) for _ in range(5000)]
+        assert all(0 <= rank < 1000 for rank in draws)
+        assert draws.count(0) > draws.count(10) * 5
+        assert sampler.sample(1) == 0
+    
+    def test_event_mix_follows_weights(self):
+        """Test that the generated mix follows the profile and the catalog cap."""
+        random.seed(4)
+        profile = WorkloadProfile(event_weights={"add_book": 1, "search_author": 9}, max_books=5)
+        generator = WorkloadGenerator(profile)
+        library = Library()
+        events = []
+        for _ in range(500):
+            event = generator.next_event(library)
+            execute_event(library, event)
+            events.append(event[0])
+        
+        assert 350 < events.count("search_author") < 490
+        assert len(library.books) <= 5
+    
+    def test_popular_picks_use_tracked_positions(self, backend, monkeypatch):
+        """Test that popular books are picked from the generator's position array, not by collection offset."""
+        random.seed(6)
+        profile = WorkloadProfile(event_weights={"add_book": 3, "remove_book": 1, "search_isbn": 4,
+                                                 "checkout_book": 2}, initial_books=50)
+        generator = WorkloadGenerator(profile)
+        library = Library(backend=backend)
+        for event in generator.initial_events():
+            execute_event(library, event)
+        
+        def offset_lookup(self, index):
+            raise AssertionError("collection indexed by position")
+        
+        monkeypatch.setattr(type(library.books), "__getitem__", offset_lookup)
+        for _ in range(300):
+            event = generator.next_event(library)
+            execute_event(library, event)
+            if event[0] == "search_isbn":
+                assert library.search_by_isbn(event[1]) is not None
+        positions = generator._catalog_positions(library)
+        assert sorted(positions.isbn_at(i) for i in range(len(positions))) == sorted(
+            book.isbn for book in library.books)
+        library.close()
+    
+    def test_bursts_contain_only_mutations(self):
+        """Test that a burst produces back-to-back mutation events."""
+        random.seed(5)
+        profile = WorkloadProfile(event_weights={"add_book": 1, "search_year": 100},
+                                  burst_probability=1.0, burst_length=20)
+        generator = WorkloadGenerator(profile)
+        events = [generator.next_event(Library())[0] for _ in range(20)]
+        assert events == ["add_book"] * 20
+    
+    def test_run_simulation_with_workload(self):
+        """Test that the simulation runs with a preset profile."""
+        run_simulation(steps=20, seed=1, workload=WorkloadProfile.load("read_heavy"))
+
+
+class TestProfiling:
+    """Test cases for the simulation profiling mode."""
+    
+    def test_profile_report_attributes_time(self, tmp_path):
+        """Test that the report breaks time down by event type and method."""
+        paths = profile_simulation(str(tmp_path / "profile"), steps=40, seed=42)
+        report = open(paths["report"], encoding="utf-8").read()
+        
+        assert "Time by event type" in report
+        assert "add_book" in report
+        assert "Library.add_book" in report
+        assert "IndexDict.add_book" in report
+        assert os.path.getsize(paths["stats"]) > 0
+    
+    def test_profile_report_attributes_hook_methods(self, tmp_path):
+        """Test that methods of every library module, hooks included, are attributed to their class."""
+        paths = profile_simulation(str(tmp_path / "profile"), steps=40, seed=42)
+        report = open(paths["report"], encoding="utf-8").read()
+        methods = report.split("Time by library method")[1].split("Top ")[0]
+        labels = {line.split()[0] for line in methods.splitlines()[2:] if line.strip()}
+        
+        for label in ("SortedIndex.add_book", "CatalogStats.add_book", "LoanManager.add_book",
+                      "normalize.normalize_key"):
+            assert label in labels
+        assert "run_simulation" not in methods
+
+
+class TestMemoryUsage:
+    """Test cases for memory accounting."""
+    
+    def test_deep_sizeof_counts_shared_objects_once(self):
+        """Test that objects reachable twice are only counted once."""
+        shared = "x" * 1000
+        seen = set()
+        first = deep_sizeof([shared], seen)
+        second = deep_sizeof([shared], seen)
+        assert first > 1000
+        assert second < 1000
+    
+    def test_library_breakdown(self):
+        """Test that the breakdown covers every component and adds up."""
+        library = Library()
+        for i in range(50):
+            library.add_book(Book(f"Title{i}", f"Author{i % 5}", 2000 + i % 3, "Fiction", str(i)))
+        usage = library.memory_usage()
+        
+        assert usage["books"] > 0
+        assert usage["collection"] > 0
+        assert set(usage["indices"]) >= {"isbn", "author", "year"}
+        assert usage["indices"]["author"]["buckets"] > 0
+        assert "stats" in usage["auxiliary"]
+        parts = usage["books"] + usage["cache"] + usage["collection"] + sum(usage["auxiliary"].values()) + sum(
+            sizes["table"] + sizes["buckets"] for sizes in usage["indices"].values()
+        )
+        assert usage["total"] == parts
+        assert usage["bytes_per_book"] == usage["total"] / 50
+    
+    def test_books_by_backend(self, backend):
+        """Test that only resident books are charged and the hot tier is reported on its own."""
+        library = Library(backend=backend)
+        library.add_books([Book(f"Title{i}", f"Author{i % 5}", 2000, "Fiction", str(i)) for i in range(200)])
+        for i in range(20):
+            library.search_by_isbn(str(i))
+        usage = library.memory_usage()
+        
+        assert usage["resident_books"] is library.backend.resident_books
+        if backend == "memory":
+            assert usage["books"] > 200 * 100
+        else:
+            assert usage["books"] == 0
+            assert "not resident" in format_memory_usage(usage)
+        assert (usage["cache"] > 0) == (backend == "tiered")
+    
+    def test_trace_allocations(self):
+        """Test the allocation tracing report."""
+        report = trace_allocations(run_simulation, steps=30, seed=1)
+        assert report.startswith("Traced memory")
+
+
+class TestCatalogGenerator:
+    """Test cases for the synthetic catalog generator and bulk ingest."""
+    
+    def test_isbns_are_unique_and_valid(self):
+        """Test that generated ISBNs never collide and carry a valid check digit."""
+        generator = CatalogGenerator(seed=1)
+        books = list(generator.iter_books(20000))
+        assert len({book.isbn for book in books}) == 20000
+        assert all(is_valid_isbn13(book.isbn) for book in books)
+        assert generator.isbn(generator.capacity - 1).startswith("979")
+    
+    def test_generation_is_reproducible_and_partitionable(self):
+        """Test that seeds reproduce catalogs and index ranges do not overlap."""
+        first = [b.isbn for b in CatalogGenerator(seed=7).iter_books(100)]
+        again = [b.isbn for b in CatalogGenerator(seed=7).iter_books(100)]
+        later = [b.isbn for b in CatalogGenerator(seed=7).iter_books(100, start=100)]
+        assert first == again
+        assert not set(first) & set(later)
+    
+    def test_vocabulary_is_configurable(self):
+        """Test that custom vocabularies are used."""
+        generator = CatalogGenerator(seed=2, first_names=["Ada"], last_names=["Lovelace"],
+                                     genres=["Poetry"], min_year=1843, max_year=1843)
+        book = next(generator.iter_books(1))
+        assert book.author == "Ada Lovelace"
+        assert book.genre == "Poetry"
+        assert book.year == 1843
+    
+    def test_catalog_file_round_trip(self, tmp_path):
+        """Test writing and reading CSV and JSON lines catalogs."""
+        books = list(CatalogGenerator(seed=3).iter_books(50))
+        for name in ("catalog.csv", "catalog.jsonl.gz"):
+            path = str(tmp_path / name)
+            assert write_catalog(path, iter(books)) == 50
+            loaded = list(read_catalog(path))
+            assert [(b.title, b.author, b.year, b.genre, b.isbn) for b in loaded] == \
+                [(b.title, b.author, b.year, b.genre, b.isbn) for b in books]
+    
+    def test_bulk_ingest(self, backend):
+        """Test that bulk ingest streams books in and skips duplicate ISBNs."""
+        library = Library(backend=backend)
+        books = list(CatalogGenerator(seed=4).iter_books(100))
+        library.add_book(books[0])
+        
+        added = library.add_books(iter(books + books[:10]), chunk_size=32)
+        assert added == 99
+        assert len(library.books) == 100
+        assert library.search_by_isbn(books[50].isbn) == books[50]
+        assert len(library.search_by_author(books[50].author)) == library.stats.author_count(books[50].author)
+
+
+class TestSecondaryIndex:
+    """Test cases for user-defined secondary indexes and mutation hooks."""
+    
+    def test_index_follows_mutations(self, backend):
+        """Test that a secondary index is backfilled and kept up to date."""
+        library = Library(backend=backend)
+        fiction = Book("Dune", "Frank Herbert", 1965, "Sci-Fi", "111")
+        library.add_book(fiction)
+        index = library.create_index("genre", lambda book: book.genre.lower())
+        assert library.indices[("genre", "sci-fi")] == [fiction]
+        
+        other = Book("Emma", "Jane Austen", 1815, "Romance", "222")
+        library.add_book(other)
+        library.add_books([Book("Solaris", "Stanislaw Lem", 1961, "Sci-Fi", "333")])
+        assert len(library.indices[("genre", "sci-fi")]) == 2
+        library.remove_book(other)
+        assert "romance" not in index
+        assert library.indices[("genre", "romance")] == []
+    
+    def test_multi_valued_set_index(self):
+        """Test an index filing each book under several keys in set buckets."""
+        library = Library()
+        book = Book("War and Peace", "Leo Tolstoy", 1869, "Fiction", "444")
+        library.add_book(book)
+        library.create_index("words", lambda b: b.title.lower().split(), bucket="set", multi_valued=True)
+        assert library.indices[("words", "peace")] == {book}
+        library.remove_book(book)
+        assert library.indices[("words", "war")] == set()
+    
+    def test_drop_and_name_clash(self):
+        """Test that built-in names are reserved and dropped indexes stop updating."""
+        library = Library()
+        with pytest.raises(ValueError):
+            library.create_index("author", lambda book: book.author)
+        index = library.create_index("decade", lambda book: book.year // 10 * 10)
+        library.drop_index("decade")
+        library.add_book(Book("Title", "Author", 2001, "Fiction", "555"))
+        assert len(index) == 0
+        with pytest.raises(KeyError):
+            library.indices[("decade", 2000)]
+    
+    def test_rebuild_repairs_secondary_index(self):
+        """Test that update_index rebuilds secondary indexes with the built-in ones."""
+        library = Library()
+        library.add_book(Book("Title", "Author", 2001, "Fiction", "666"))
+        index = library.create_index("genre", lambda book: book.genre)
+        index.rebuild([])
+        library.update_index()
+        assert len(library.indices[("genre", "Fiction")]) == 1
+
+
+class TestAutocomplete:
+    """Test cases for prefix autocomplete."""
+    
+    def test_completions_ranked_by_count(self, backend):
+        """Test that completions ignore case and rank by number of books."""
+        library = Library(backend=backend)
+        library.enable_autocomplete()
+        library.add_book(Book("The Hobbit", "J. R. R. Tolkien", 1937, "Fantasy", "1"))
+        library.add_book(Book("The Hobbit", "J. R. R. Tolkien", 1951, "Fantasy", "2"))
+        library.add_book(Book("The  Handmaid's Tale", "Margaret Atwood", 1985, "Fiction", "3"))
+        library.add_book(Book("Dune", "Frank Herbert", 1965, "Sci-Fi", "4"))
+        
+        assert library.autocomplete("the h") == [("The Hobbit", 2), ("The  Handmaid's Tale", 1)]
+        assert library.autocomplete("THE HA", k=1) == [("The  Handmaid's Tale", 1)]
+        assert library.autocomplete("marg", field="author") == [("Margaret Atwood", 1)]
+        assert library.autocomplete("x") == []
+        assert library.autocomplete("d", field="isbn") == []
+    
+    def test_removal_updates_ranking(self):
+        """Test that removing books demotes and finally drops completions."""
+        library = Library()
+        library.enable_autocomplete()
+        books = [Book("Alpha", "A", 2000, "Fiction", str(i)) for i in range(3)]
+        books.append(Book("Alps", "B", 2000, "Fiction", "9"))
+        library.add_books(books)
+        assert library.autocomplete("al")[0] == ("Alpha", 3)
+        for book in books[:3]:
+            library.remove_book(book)
+        assert library.autocomplete("al") == [("Alps", 1)]
+        library.remove_book(books[3])
+        assert library.autocomplete("") == []
+    
+    def test_autocomplete_is_opt_in(self, backend):
+        """Test that the tries are only built on request, backfilled, and freed again."""
+        library = Library(backend=backend)
+        library.add_book(Book("Dune", "Frank Herbert", 1965, "Sci-Fi", "1"))
+        assert library.completions == {}
+        with pytest.raises(RuntimeError):
+            library.autocomplete("du")
+        with pytest.raises(ValueError):
+            library.enable_autocomplete(["isbn"])
+        
+        library.enable_autocomplete(["author"])
+        assert library.autocomplete("fr", field="author") == [("Frank Herbert", 1)]
+        assert library.autocomplete("du") == []
+        library.disable_autocomplete()
+        assert library.completions == {}
+        assert all(not isinstance(hook, PrefixIndex) for hook in library._hooks)
+    
+    def test_cache_matches_full_scan(self):
+        """Test cached top-k answers against a brute-force count after random churn."""
+        random.seed(5)
+        index = PrefixIndex(lambda book: book.title_key, lambda book: book.title, cache_size=3)
+        pool = list(CatalogGenerator(seed=5).iter_books(300))
+        live = []
+        for _ in range(2000):
+            if live and random.random() < 0.4:
+                index.remove_book(live.pop(random.randrange(len(live))))
+            else:
+                live.append(random.choice(pool))
+                index.add_book(live[-1])
+        for prefix in ("", "t", "the", "s"):
+            counts = {}
+            for book in live:
+                if book.title.lower().startswith(prefix):
+                    counts[book.title] = counts.get(book.title, 0) + 1
+            expected = sorted(counts.items(), key=lambda item: (-item[1], item[0].casefold()))
+            assert index.complete(prefix, 3) == expected[:3]
+            assert index.complete(prefix, 10) == expected[:10]
+
+
+class TestBrowseOrders:
+    """Test cases for pre-sorted browse orders."""
+    
+    def _library(self, backend="memory"):
+        """Create a library with books in no particular order."""
+        library = Library(backend=backend)
+        library.add_book(Book("dune", "Frank Herbert", 1965, "Sci-Fi", "3"))
+        library.add_book(Book("Emma", "Jane Austen", 1815, "Romance", "1"))
+        library.add_books([
+            Book("Anna Karenina", "Leo Tolstoy", 1877, "Fiction", "2"),
+            Book("Beloved", "Toni Morrison", 1987, "Fiction", "5"),
+            Book("Carrie", "Stephen King", 1974, "Horror", "4"),
+        ])
+        return library
+    
+    def test_pages_follow_order(self, backend):
+        """Test paging forwards and backwards through the title and year orders."""
+        library = self._library(backend)
+        titles = [book.title for book in library.browse("title", limit=10)]
+        assert titles == ["Anna Karenina", "Beloved", "Carrie", "dune", "Emma"]
+        assert [book.title for book in library.browse("title", offset=1, limit=2)] == ["Beloved", "Carrie"]
+        assert [book.year for book in library.browse("year", limit=2, reverse=True)] == [1987, 1974]
+        assert [book.year for book in library.browse("year", offset=4, limit=2, reverse=True)] == [1815]
+        assert library.browse("genre") == []
+    
+    def test_off_heap_backends_keep_no_books(self, backend):
+        """Test that the browse orders and bitmaps hold ISBNs, not Book objects, on disk-backed backends."""
+        library = Library(backend=backend)
+        library.add_books(CatalogGenerator(seed=51).iter_books(500))
+        library.enable_bitmap_index()
+        library.backend.flush()
+        gc.collect()
+        resident = sum(isinstance(obj, Book) for obj in gc.get_objects())
+        if backend == "memory":
+            assert resident >= 500
+        else:
+            assert not library.backend.resident_books
+            assert resident == 0
+        assert len(library.browse("title", limit=5)) == 5
+        library.close()
+    
+    def test_seek_to_start_key(self):
+        """Test starting a page at a given title or year."""
+        library = self._library()
+        assert [book.title for book in library.browse("title", start="c", limit=2)] == ["Carrie", "dune"]
+        assert [book.year for book in library.browse("year", start=1970, limit=3, reverse=True)] == [1965, 1877, 1815]
+    
+    def test_orders_follow_removals(self):
+        """Test that removed books leave the orders and year ranges use them."""
+        library = self._library()
+        library.remove_book(library.search_by_isbn("4"))
+        assert [book.isbn for book in library.browse("author", limit=10)] == ["3", "1", "2", "5"]
+        assert [book.year for book in library.get_books_by_year_range(1800, 1970)] == [1815, 1877, 1965]
+
+
+class TestDuplicateDetection:
+    """Test cases for near-duplicate detection."""
+    
+    def _books(self):
+        """Create books with exact, near and no duplicates."""
+        return [
+            Book("The Great Gatsby", "F. Scott Fitzgerald", 1925, "Fiction", "1"),
+            Book("War and Peace", "Leo Tolstoy", 1869, "Fiction", "2"),
+            Book("the great  gatsby", "F. Scott Fitzgerald", 1925, "Fiction", "3"),
+            Book("Great Expectations", "Charles Dickens", 1861, "Fiction", "4"),
+            Book("War and Peace!", "Leo Tolstoy", 1869, "Fiction", "5"),
+            Book("The Great Gatsby", "F. Scott Fitzgerald", 1953, "Fiction", "6"),
+        ]
+    
+    def test_finds_clusters_without_changing_catalog(self, backend):
+        """Test that duplicates are reported and the catalog is left alone."""
+        library = Library(backend=backend)
+        library.add_books(self._books())
+        clusters = library.find_duplicates(workers=1)
+        assert [[book.isbn for book in cluster] for cluster in clusters] == [["1", "3", "6"], ["2", "5"]]
+        assert len(library.books) == 6
+    
+    def test_normalization(self):
+        """Test that case, punctuation and spacing are ignored."""
+        first, second = self._books()[0], self._books()[2]
+        assert normalize_text(first) == normalize_text(second) == "the great gatsby f scott fitzgerald"
+    
+    def test_parallel_signatures_match_serial(self, monkeypatch):
+        """Test that worker processes produce the same clusters as a single process."""
+        books = list(CatalogGenerator(seed=8).iter_books(400))
+        serial = DuplicateFinder().find(books, workers=1)
+        monkeypatch.setattr(dedup, "PARALLEL_MIN_BOOKS", 0)
+        parallel = DuplicateFinder().find(books, workers=2)
+        assert [[b.isbn for b in cluster] for cluster in serial] == [[b.isbn for b in cluster] for cluster in parallel]
+        assert any(len(cluster) > 1 for cluster in serial)
+
+
+class TestBatch:
+    """Test cases for transactional batch mutations."""
+    
+    def test_batch_applies_net_changes(self, backend):
+        """Test that buffered mutations apply together and cancel out within a batch."""
+        library = Library(backend=backend)
+        kept = Book("Kept", "Author A", 2000, "Fiction", "1")
+        gone = Book("Gone", "Author A", 2001, "Fiction", "2")
+        library.add_books([kept, gone])
+        
+        with library.batch():
+            assert library.add_book(Book("New", "Author B", 2002, "Poetry", "3"))
+            assert not library.add_book(Book("Dup", "Author B", 2002, "Poetry", "3"))
+            assert library.add_book(Book("Temp", "Author B", 2003, "Poetry", "4"))
+            assert library.remove_book(Book("Temp", "Author B", 2003, "Poetry", "4"))
+            assert library.remove_book(gone)
+            assert not library.remove_book(gone)
+            # Reads see the catalog as it was before the batch
+            assert library.search_by_isbn("3") is None
+            assert library.search_by_isbn("2") is not None
+        
+        assert sorted(book.isbn for book in library.books) == ["1", "3"]
+        assert [book.isbn for book in library.search_by_author("Author A")] == ["1"]
+        assert library.get_genre_counts() == {"Fiction": 1, "Poetry": 1}
+        assert library.update_index(audit_only=True).consistent
+    
+    def test_exception_discards_batch(self):
+        """Test that an exception inside the block applies nothing."""
+        library = Library()
+        with pytest.raises(RuntimeError):
+            with library.batch():
+                library.add_book(Book("Title", "Author", 2000, "Fiction", "1"))
+                raise RuntimeError("abort")
+        assert len(library.books) == 0
+        assert library.add_book(Book("Title", "Author", 2000, "Fiction", "1"))
+    
+    def test_commit_logs_one_summary(self, backend, caplog):
+        """Test that committing a batch logs a single summary line rather than one per layer."""
+        library = Library(backend=backend)
+        with caplog.at_level(logging.INFO):
+            with library.batch():
+                library.add_book(Book("First", "Author", 2000, "Fiction", "1"))
+                library.add_book(Book("Second", "Author", 2001, "Fiction", "2"))
+        assert [record.getMessage() for record in caplog.records if "batch" in record.getMessage()] == [
+            "Committed batch: added 2 books, removed 0 books"]
+    
+    def test_failed_commit_rolls_back(self, backend):
+        """Test that a failure while applying undoes the collection, indices and hooks."""
+        class FailingHook(MutationHook):
+            def add_book(self, book):
+                raise IOError("hook failed")
+            
+            def remove_book(self, book):
+                pass
+        
+        library = Library(backend=backend)
+        library.enable_autocomplete()
+        first = Book("First", "Author", 2000, "Fiction", "1")
+        library.add_book(first)
+        library.add_hook(FailingHook(), backfill=False)
+        with pytest.raises(IOError):
+            with library.batch():
+                library.add_book(Book("Second", "Other", 2001, "Poetry", "2"))
+                library.remove_book(first)
+        
+        assert [book.isbn for book in library.books] == ["1"]
+        assert library.search_by_isbn("2") is None
+        assert library.search_by_author("Author") == [first]
+        assert library.get_genre_counts() == {"Fiction": 1}
+        assert library.autocomplete("sec") == []
+        assert library.update_index(audit_only=True).consistent
+    
+    def test_hook_failing_partway_rolls_back_everything(self, backend):
+        """Test that a hook raising midway through a batch is restored along with everything else."""
+        class FlakyHook(MutationHook):
+            def __init__(self):
+                self.isbns = set()
+                self.fail_after = None
+            
+            def add_book(self, book):
+                if self.fail_after is not None:
+                    if self.fail_after == 0:
+                        self.fail_after = None
+                        raise IOError("hook failed")
+                    self.fail_after -= 1
+                self.isbns.add(book.isbn)
+            
+            def remove_book(self, book):
+                self.isbns.discard(book.isbn)
+        
+        library = Library(backend=backend)
+        library.enable_bitmap_index()
+        library.enable_autocomplete()
+        library.enable_merkle_tree()
+        library.add_books([Book(f"Kept {i}", f"Author {i % 5}", 1990 + i, "Fiction", f"k{i}")
+                           for i in range(10)])
+        hook = FlakyHook()
+        library.add_hook(hook)
+        library.loans.set_copies("k0", 7)
+        
+        def state():
+            return (sorted(book.isbn for book in library.books),
+                    [book.isbn for book in library.browse("title", limit=100)],
+                    [book.isbn for book in library.browse("year", limit=100, reverse=True)],
+                    sorted(book.isbn for book in library.search_by_author("Author 0")),
+                    dict(library.get_genre_counts()),
+                    library.autocomplete("kept", k=100),
+                    library.merkle.root,
+                    library.facet_counts("genre"),
+                    library.loans.copies("k0"),
+                    sorted(hook.isbns))
+        
+        before = state()
+        hook.fail_after = 2
+        # Enough books for the sorted indices to take the merge path
+        with pytest.raises(IOError):
+            with library.batch():
+                for i in range(70):
+                    library.add_book(Book(f"New {i}", "Author 0", 1950 + i, "Poetry", f"n{i}"))
+                library.remove_book(library.search_by_isbn("k0"))
+                library.remove_book(library.search_by_isbn("k1"))
+        
+        assert state() == before
+        assert library.update_index(audit_only=True).consistent
+        # Removed books come back, but at the end of the collection
+        assert [book.isbn for book in library.books] == [f"k{i}" for i in (*range(2, 10), 0, 1)]
+
+
+def _shared_lookup(name, isbn, results):
+    """Attach to a shared catalog in a worker process and look up a book."""
+    with SharedCatalog.attach(name) as catalog:
+        results.put((len(catalog), catalog.search_by_isbn(isbn).title))
+
+
+class TestSharedCatalog:
+    """Test cases for the shared-memory catalog."""
+    
+    def test_queries_match_library(self, backend):
+        """Test that the shared catalog answers like the library it was published from."""
+        library = Library(backend=backend)
+        library.add_books(CatalogGenerator(seed=9).iter_books(300))
+        book = library.books[123]
+        with library.publish_shared() as catalog:
+            assert len(catalog) == 300
+            assert catalog.search_by_isbn(book.isbn) == book
+            assert catalog.search_by_isbn("missing") is None
+            assert [b.isbn for b in catalog.search_by_author(book.author)] == \
+                [b.isbn for b in library.search_by_author(book.author)]
+            assert sorted(b.isbn for b in catalog.search_by_year(book.year)) == \
+                sorted(b.isbn for b in library.search_by_year(book.year))
+            assert catalog[123].title == book.title
+    
+    def test_attach_is_read_only(self):
+        """Test that attached catalogs share the data but cannot write to it."""
+        books = [Book("Война и мир", "Лев Толстой", 1869, "Fiction", "1")]
+        with SharedCatalog.publish(books) as published:
+            with SharedCatalog.attach(published.name) as attached:
+                assert list(attached) == books
+                assert attached.search_by_author("Лев Толстой")[0].title == "Война и мир"
+                with pytest.raises(TypeError):
+                    attached._heap[0] = 0
+    
+    def test_worker_process_attaches(self):
+        """Test that another process can attach and query without a copy of the library."""
+        books = list(CatalogGenerator(seed=10).iter_books(100))
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        with SharedCatalog.publish(books) as catalog:
+            worker = context.Process(target=_shared_lookup, args=(catalog.name, books[42].isbn, results))
+            worker.start()
+            assert results.get(timeout=10) == (100, books[42].title)
+            worker.join()
+            assert worker.exitcode == 0
+        with pytest.raises(FileNotFoundError):
+            SharedCatalog.attach(catalog.name)
+
+
+class TestNormalizedKeys:
+    """Test cases for Unicode-aware normalized search keys."""
+    
+    def test_normalize_key(self):
+        """Test case folding, accent stripping, compatibility forms and whitespace."""
+        assert normalize_key("  The   Great\tGatsby ") == "the great gatsby"
+        assert normalize_key("Café Society") == normalize_key("CAFE SOCIETY")
+        assert normalize_key("Straße") == "strasse"
+        assert normalize_key("ﬁnal Ｆｏｕｒ") == "final four"
+        assert normalize_key("Ёлка") == normalize_key("елка")
+    
+    def test_keys_are_cached_and_invalidated(self):
+        """Test that a book computes its keys once and recomputes them after an edit."""
+        book = Book("Émile", "Jean-Jacques Rousseau", 1762, "Philosophie", "1")
+        assert book.title_key == "emile"
+        assert book.title_key is book.title_key
+        book.title = "Les Confessions"
+        assert book.title_key == "les confessions"
+    
+    def test_search_ignores_case_and_accents(self, backend):
+        """Test title and genre search with accented and Cyrillic text on every backend."""
+        library = Library(backend=backend)
+        library.add_book(Book("Les Misérables", "Victor Hugo", 1862, "Roman", "1"))
+        library.add_book(Book("Преступление и наказание", "Фёдор Достоевский", 1866, "Роман", "2"))
+        library.add_book(Book("Der Fänger", "J. D. Salinger", 1951, "Román", "3"))
+        
+        assert [b.isbn for b in library.search_by_title("MISERABLES")] == ["1"]
+        assert [b.isbn for b in library.search_by_title("наказание")] == ["2"]
+        assert [b.isbn for b in library.search_by_title("fang")] == ["3"]
+        assert [b.isbn for b in library.search_by_genre("roman")] == ["1", "3"]
+        assert [b.isbn for b in library.search_by_genre("РОМАН")] == ["2"]
+    
+    def test_autocomplete_and_browse_ignore_accents(self):
+        """Test that accented spellings share one completion and sort with plain ones."""
+        library = Library()
+        library.enable_autocomplete()
+        library.add_book(Book("Élan", "A", 2000, "Fiction", "1"))
+        library.add_book(Book("elan", "B", 2000, "Fiction", "2"))
+        library.add_book(Book("Eagle", "C", 2000, "Fiction", "3"))
+        
+        assert library.autocomplete("él") == [("Élan", 2)]
+        assert [b.isbn for b in library.browse("title")] == ["3", "1", "2"]
+    
+    def test_old_database_is_migrated(self, tmp_path):
+        """Test that a database without key columns gets them on open."""
+        path = str(tmp_path / "old.db")
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE books (id INTEGER PRIMARY KEY, isbn TEXT NOT NULL UNIQUE, "
+                           "title TEXT NOT NULL, author TEXT NOT NULL, year INTEGER NOT NULL, genre TEXT NOT NULL)")
+        connection.execute("INSERT INTO books (isbn, title, author, year, genre) "
+                           "VALUES ('1', 'Noël', 'Author', 2000, 'Fiction')")
+        connection.commit()
+        connection.close()
+        
+        library = Library(backend=SQLiteBackend(path))
+        assert [b.isbn for b in library.search_by_title("noel")] == ["1"]
+        assert [b.isbn for b in library.search_by_genre("FICTION")] == ["1"]
+        library.close()
+
+
+class TestLoans:
+    """Test cases for loans and the overdue heap."""
+    
+    def test_checkout_respects_copies(self):
+        """Test that availability counts copies and each borrower holds one copy per book."""
+        library = Library()
+        library.add_book(Book("Title1", "Author1", 2000, "Fiction", "1"))
+        assert library.loans.set_copies("1", 2)
+        assert not library.loans.set_copies("missing", 2)
+        
+        assert library.checkout_book("1", "ann") is not None
+        assert library.checkout_book("1", "ann") is None
+        assert library.checkout_book("1", "bob") is not None
+        assert library.checkout_book("1", "cid") is None
+        assert library.loans.available("1") == 0
+        assert library.return_book("1", "ann").returned == 0
+        assert library.return_book("1", "ann") is None
+        assert library.loans.available("1") == 1
+        assert library.checkout_book("missing", "ann") is None
+    
+    def test_sweep_finds_overdue_loans(self):
+        """Test that sweeps report each loan once, after its due day, and skip returned loans."""
+        library = Library()
+        for i in range(3):
+            library.add_book(Book(f"Title{i}", "Author", 2000, "Fiction", str(i)))
+        library.loans.loan_days = 2
+        library.checkout_book("0", "ann")
+        library.overdue_sweep(1)
+        library.checkout_book("1", "ann")
+        library.checkout_book("2", "ann")
+        library.return_book("2", "ann")
+        
+        assert library.overdue_sweep(1) == []
+        assert [loan.isbn for loan in library.overdue_sweep(1)] == ["0"]
+        assert [loan.isbn for loan in library.overdue_sweep(5)] == ["1"]
+        assert library.overdue_sweep(1) == []
+        library.return_book("0", "ann")
+        assert [loan.isbn for loan in library.loans.overdue()] == ["1"]
+    
+    def test_heap_matches_full_scan(self):
+        """Test the swept overdue set against a scan of all loans under random churn."""
+        rng = random.Random(7)
+        library = Library()
+        library.add_books(Book(f"T{i}", "A", 2000, "Fiction", str(i)) for i in range(50))
+        for _ in range(3000):
+            action = rng.random()
+            if action < 0.5:
+                library.checkout_book(str(rng.randrange(50)), f"r{rng.randrange(20)}")
+            elif action < 0.9:
+                loan = library.loans.random_loan(rng)
+                if loan is not None:
+                    library.return_book(loan.isbn, loan.borrower)
+            else:
+                library.overdue_sweep(rng.randrange(4))
+                expected = {(loan.isbn, loan.borrower) for loan in library.loans._active
+                            if loan.due < library.loans.today}
+                assert {(loan.isbn, loan.borrower) for loan in library.loans.overdue()} == expected
+        assert len(library.loans._due) <= 2 * len(library.loans) + 1
+    
+    def test_removed_book_keeps_open_loans(self):
+        """Test that removing a book withdraws its copies but its loans can still be returned."""
+        library = Library()
+        book = Book("Title1", "Author1", 2000, "Fiction", "1")
+        library.add_book(book)
+        library.checkout_book("1", "ann")
+        library.remove_book(book)
+        assert library.loans.copies("1") == 0
+        assert library.return_book("1", "ann") is not None
+    
+    def test_circulation_workload(self):
+        """Test that the circulation preset drives loan events through the simulation."""
+        profile = WorkloadProfile.load("circulation")
+        profile.initial_books = 50
+        random.seed(3)
+        generator = WorkloadGenerator(profile)
+        library = Library()
+        for event in generator.initial_events():
+            execute_event(library, event)
+        kinds = set()
+        for _ in range(500):
+            event = generator.next_event(library)
+            kinds.add(event[0])
+            execute_event(library, event)
+        assert {"checkout_book", "return_book", "overdue_sweep"} <= kinds
+        assert library.loans.today > 0
+
+
+class TestDiscreteEvent:
+    """Test cases for the discrete-event capacity simulation."""
+    
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+    
+    def test_light_load_does_not_queue(self):
+        """Test that requests far apart in simulated time are served without queueing."""
+        report = run_discrete_event(arrival_rate=5, duration=20, seed=1)
+        assert 50 <= report["requests"] <= 150
+        assert report["utilization"] < 0.05
+        assert report["max_queue"] <= 1
+        assert report["makespan"] == pytest.approx(20, abs=1)
+        assert sum(summary["count"] for summary in report["per_type"].values()) == report["requests"]
+    
+    def test_overload_builds_a_queue(self):
+        """Test that arrivals faster than the library can serve saturate it."""
+        profile = WorkloadProfile(event_weights={"add_book": 1, "search_isbn": 1})
+        report = run_discrete_event(arrival_rate=1e6, duration=0.002, seed=2, workload=profile)
+        assert report["utilization"] > 0.9
+        assert report["max_queue"] > 100
+        assert report["makespan"] > report["duration"]
+        assert report["response"]["p99"] >= report["response"]["p50"]
+        assert set(report["per_type"]) == {"add_book", "search_isbn"}
+        assert "utilization" in format_queueing_report(report)
+
+
+class TestSearchMany:
+    """Test cases for batched multi-query search."""
+    
+    def test_matches_single_searches(self, backend):
+        """Test that every answer equals the single search, in input order, on every backend."""
+        library = Library(backend=backend)
+        library.add_books(CatalogGenerator(seed=11).iter_books(300))
+        sample = list(library.books)[:20]
+        queries = []
+        for book in sample:
+            queries += [("author", book.author), ("year", book.year), ("genre", book.genre.upper()),
+                        ("title", book.title.split()[-1])]
+        queries += [("year", "1999"), ("author", sample[0].author)]
+        
+        answers = library.search_many(queries)
+        assert len(answers) == len(queries)
+        for (search_type, query), answer in zip(queries, answers):
+            assert [b.isbn for b in answer] == [b.isbn for b in library(str(query), search_type)]
+    
+    def test_invalid_queries_and_duplicates(self):
+        """Test empty answers for bad queries and independent lists for repeated ones."""
+        library = Library()
+        library.add_book(Book("Title1", "Author1", 2000, "Fiction", "1"))
+        first, second, bad_year, unknown = library.search_many(
+            [("genre", "fiction"), ("genre", "FICTION"), ("year", "abc"), ("publisher", "X")]
+        )
+        assert [b.isbn for b in first] == ["1"]
+        assert first == second and first is not second
+        assert bad_year == [] and unknown == []
+        assert library.search_many([]) == []
+    
+    def test_groups_are_resolved_once(self):
+        """Test that each search type is answered by a single batched call."""
+        library = Library()
+        library.add_books(CatalogGenerator(seed=12).iter_books(50))
+        calls = []
+        match_genres = library.books.match_genres
+        library.books.match_genres = lambda genres: calls.append(list(genres)) or match_genres(genres)
+        library.search_many([("genre", "Fiction"), ("genre", "Poetry"), ("genre", "fiction")] * 10)
+        assert calls == [["fiction", "poetry"]]
+
+
+class TestTieredBackend:
+    """Test cases for the tiered hot/cold backend."""
+    
+    def test_hot_tier_respects_budget(self):
+        """Test that lookups fault cold books in, evict under the budget and count hits."""
+        books = list(CatalogGenerator(seed=13).iter_books(200))
+        budget = 20 * book_size(books[0])
+        backend = TieredBackend(budget=budget)
+        library = Library(backend=backend)
+        library.add_books(books)
+        
+        for book in books[:50]:
+            assert library.search_by_isbn(book.isbn) == book
+        assert library.search_by_isbn(books[49].isbn) == books[49]
+        assert library.search_by_isbn("missing") is None
+        metrics = backend.metrics()
+        assert metrics["resident_bytes"] <= budget
+        assert metrics["evictions"] > 0
+        assert metrics["faults"] == 50 and metrics["hits"] == 1
+        assert 0 < metrics["hit_rate"] < 0.1
+        assert "hit rate" in format_cache_metrics(metrics)
+        library.close()
+    
+    def test_orders_do_not_hold_books(self):
+        """Test that browse orders keep ISBNs and still return books in order."""
+        library = Library(backend="tiered")
+        for i in (3, 1, 2):
+            library.add_book(Book(f"Title{i}", "Author", 2000 + i, "Fiction", str(i)))
+        assert all(entry[2] is None for entry in library.orders["title"]._entries)
+        assert [b.isbn for b in library.browse("title")] == ["1", "2", "3"]
+        assert [b.isbn for b in library.get_books_by_year_range(2001, 2002)] == ["1", "2"]
+        library.close()
+    
+    def test_removed_book_leaves_hot_tier(self):
+        """Test that a removed and re-added ISBN is not served from a stale cache entry."""
+        library = Library(backend="tiered")
+        book = Book("Old Title", "Author", 2000, "Fiction", "1")
+        library.add_book(book)
+        assert library.search_by_isbn("1").title == "Old Title"
+        library.remove_book(book)
+        library.add_book(Book("New Title", "Author", 2000, "Fiction", "1"))
+        assert library.search_by_isbn("1").title == "New Title"
+        assert library.update_index().consistent
+        library.close()
+    
+    def test_cold_tier_persists(self, tmp_path):
+        """Test that reopening a cold tier file rebuilds the in-memory indices; temporary files are removed."""
+        path = str(tmp_path / "cold.db")
+        library = Library(backend=TieredBackend(path))
+        library.add_book(Book("Title1", "Author1", 2023, "Fiction", "1"))
+        library.close()
+        
+        reopened = Library(backend=TieredBackend(path))
+        assert [b.isbn for b in reopened.search_by_author("Author1")] == ["1"]
+        reopened.close()
+        
+        temporary = TieredBackend()
+        assert os.path.exists(temporary.store.path)
+        temporary.close()
+        assert not os.path.exists(temporary.store.path)
+
+
+class TestStress:
+    """Test cases for the multi-threaded stress harness."""
+    
+    def test_locked_clients_keep_invariants(self, backend):
+        """Test that serialized clients finish every event and leave the library consistent."""
+        profile = WorkloadProfile(initial_books=100)
+        report = run_stress(clients=3, events_per_client=100, seed=4, backend=backend, workload=profile)
+        assert report["events"] == 300
+        assert [client["events"] for client in report["clients"]] == [100, 100, 100]
+        assert all(not client["errors"] for client in report["clients"])
+        assert report["invariants"] == []
+        assert "All invariants hold" in format_stress_report(report)
+    
+    def test_unlocked_clients_are_reported(self):
+        """Test that racing clients still produce a complete report."""
+        report = run_stress(clients=2, events_per_client=200, seed=5, lock=False, switch_interval=1e-6)
+        assert report["events"] == 400 and not report["lock"]
+        assert "no lock" in format_stress_report(report)
+    
+    def test_invariant_check_finds_drift(self):
+        """Test that the invariant check notices structures that disagree."""
+        library = Library()
+        library.add_books(CatalogGenerator(seed=14).iter_books(20))
+        assert check_invariants(library) == []
+        library.books.append(library.books[0])
+        library.indices.remove_book(library.books[1])
+        violations = check_invariants(library)
+        assert any("duplicate ISBNs" in violation for violation in violations)
+        assert any("indices disagree" in violation for violation in violations)
+
+
+class TestIsbnSearch:
+    """Test cases for ISBN prefix and range search over the sorted ISBN order."""
+    
+    def _library(self, backend="memory"):
+        """Create a library with ISBNs from two publisher prefixes."""
+        library = Library(backend=backend)
+        library.add_books([Book(f"Title {i}", "Author", 2000, "Fiction", f"978{i % 2}{i:04d}") for i in range(40)])
+        return library
+    
+    def test_prefix_and_range(self, backend):
+        """Test that prefix and range searches return exactly the matching books in ISBN order."""
+        library = self._library(backend)
+        isbns = [book.isbn for book in library.search_by_isbn_prefix("9781")]
+        assert isbns == sorted(f"9781{i:04d}" for i in range(1, 40, 2))
+        assert [book.isbn for book in library.search_by_isbn_range("97800010", "97800020")] == [
+            "97800010", "97800012", "97800014", "97800016", "97800018", "97800020"]
+        assert list(library.search_by_isbn_prefix("979")) == []
+        assert [book.isbn for book in library.browse("isbn", limit=2)] == ["97800000", "97800002"]
+    
+    def test_pagination(self, monkeypatch):
+        """Test that offset and limit page through the matches across scan chunks."""
+        monkeypatch.setattr(sorted_index, "SCAN_CHUNK", 3)
+        library = self._library()
+        pages = [[book.isbn for book in library.search_by_isbn_prefix("9780", offset, 7)] for offset in (0, 7, 14)]
+        assert [isbn for page in pages for isbn in page] == [f"9780{i:04d}" for i in range(0, 40, 2)]
+        assert len(pages[2]) == 6
+    
+    def test_lazy_and_incremental(self, monkeypatch):
+        """Test that results are produced lazily and follow adds and removes made during a scan."""
+        monkeypatch.setattr(sorted_index, "SCAN_CHUNK", 2)
+        library = self._library()
+        results = library.search_by_isbn_prefix("9780")
+        assert next(results).isbn == "97800000"
+        assert next(results).isbn == "97800002"
+        library.remove_book(library.search_by_isbn("97800004"))
+        library.add_book(Book("Late", "Author", 2001, "Fiction", "97800005"))
+        assert [book.isbn for book in islice(results, 3)] == ["97800005", "97800006", "97800008"]
+
+
+class TestMerkleSync:
+    """Test cases for Merkle tree diff and sync between libraries."""
+    
+    def _pair(self, backend="memory"):
+        """Create two libraries holding the same generated catalog."""
+        first, second = Library(name="First", backend=backend), Library(name="Second")
+        first.enable_merkle_tree()
+        first.add_books(CatalogGenerator(seed=21).iter_books(300))
+        second.add_books(CatalogGenerator(seed=21).iter_books(300))
+        # Enabled after the books are in, so the tree is backfilled
+        second.enable_merkle_tree()
+        return first, second
+    
+    def test_incremental_tree_matches_rebuild(self):
+        """Test that single adds and removes keep the tree equal to one built from scratch."""
+        books = list(CatalogGenerator(seed=22).iter_books(50))
+        tree = MerkleTree(depth=4)
+        for book in books:
+            tree.add_book(book)
+        tree.remove_book(books[0])
+        rebuilt = MerkleTree(depth=4)
+        rebuilt.add_books(books[1:])
+        assert tree.root == rebuilt.root != 0
+        assert tree.diff(rebuilt) == []
+        assert tree.bucket(tree.bucket_of(books[1].isbn))[books[1].isbn] == record_digest(books[1])
+        with pytest.raises(ValueError):
+            tree.diff(MerkleTree(depth=5))
+    
+    def test_diff_finds_changed_buckets(self):
+        """Test that the diff reports exactly the buckets of changed, added and removed books."""
+        first, second = self._pair()
+        assert first.diff(second) == [] and first.merkle.root == second.merkle.root
+        edited = list(second.books)[:2]
+        second.remove_book(edited[0])
+        second.remove_book(edited[1])
+        edited[1].genre = "Memoir"
+        second.add_book(edited[1])
+        expected = sorted({first.merkle.bucket_of(book.isbn) for book in edited})
+        assert first.diff(second) == expected
+    
+    def test_sync_copies_only_changes(self, backend):
+        """Test that syncing makes the libraries equal and reports what changed."""
+        first, second = self._pair(backend)
+        books = list(second.books)
+        second.remove_book(books[0])
+        second.remove_book(books[1])
+        books[1].title = "Revised"
+        second.add_book(books[1])
+        second.add_book(Book("New", "Author", 2020, "Fiction", "9780000000001"))
+        counts = first.sync_from(second)
+        assert counts == {"buckets": counts["buckets"], "added": 1, "updated": 1, "removed": 1}
+        assert first.diff(second) == []
+        assert first.search_by_isbn(books[1].isbn).title == "Revised"
+        assert first.search_by_isbn(books[0].isbn) is None
+        assert check_invariants(first) == []
+        assert first.sync_from(second)["buckets"] == 0
+    
+    def test_tree_is_opt_in(self):
+        """Test that libraries build no tree by default and diffing without one is refused."""
+        first, second = Library(), Library()
+        assert first.merkle is None and first._hooks == [first.stats, *first.orders.values(), first.loans]
+        with pytest.raises(RuntimeError):
+            first.diff(second)
+        first.enable_merkle_tree()
+        with pytest.raises(RuntimeError):
+            first.sync_from(second)
+        second.enable_merkle_tree()
+        assert first.diff(second) == []
+        first.disable_merkle_tree()
+        assert first.merkle is None and all(not isinstance(hook, MerkleTree) for hook in first._hooks)
+
+
+class TestSampling:
+    """Test cases for random sampling from collections and indices."""
+    
+    def test_samples_come_from_the_catalog(self, backend):
+        """Test that uniform and without-replacement samples are distinct books of the library."""
+        library = Library(backend=backend)
+        assert library.books.sample_book() is None and library.indices.sample_books(3) == []
+        library.add_books(CatalogGenerator(seed=31).iter_books(200))
+        for book in library.books.sample_books(150):
+            library.remove_book(book)
+        isbns = {book.isbn for book in library.books}
+        rng = random.Random(5)
+        for sampler in (library.books, library.indices):
+            assert sampler.sample_book(rng).isbn in isbns
+            picked = [book.isbn for book in sampler.sample_books(20, rng)]
+            assert len(set(picked)) == 20 and set(picked) <= isbns
+            assert {book.isbn for book in sampler.sample_books(100, rng)} == isbns
+    
+    def test_key_weighted_by_bucket_size(self):
+        """Test that authors are drawn in proportion to their number of books."""
+        indices = IndexDict()
+        indices.add_books([Book(f"T{i}", "Prolific", 2000, "Fiction", str(i)) for i in range(9)])
+        indices.add_book(Book("Once", "Rare", 1990, "Fiction", "x"))
+        rng = random.Random(7)
+        draws = [indices.sample_key("author", rng) for _ in range(2000)]
+        assert 0.85 < draws.count("Prolific") / len(draws) < 0.95
+        assert indices.sample_key("year", rng) in (2000, 1990)
+        with pytest.raises(KeyError):
+            indices.sample_key("genre")
+    
+    def test_pool_follows_mutations_and_snapshots(self):
+        """Test that the sampling pool tracks removes, batches and rebuilds without disturbing snapshots."""
+        library = Library()
+        library.add_books(CatalogGenerator(seed=32).iter_books(50))
+        snapshot = library.snapshot()
+        with library.batch():
+            for book in list(library.books)[:20]:
+                library.remove_book(book)
+        library.remove_book(library.books[0])
+        pool = {book.isbn for book in library.indices.sample_books(100)}
+        assert pool == {book.isbn for book in library.books} and len(pool) == 29
+        assert len(snapshot.indices.sample_books(100)) == 50
+        library.update_index()
+        assert {book.isbn for book in library.indices.sample_books(100)} == pool
+
+
+class TestBitmapIndex:
+    """Test cases for bitmap indexes and faceted filtering."""
+    
+    def test_bitmap_operations(self, monkeypatch):
+        """Test AND, OR, popcount and row iteration across chunks."""
+        monkeypatch.setattr("src.bitmap_index.BITMAP_CHUNK_ROWS", 4)
+        first = {0: 0b1011, 2: 0b0001}
+        second = {0: 0b0010, 1: 0b1000, 2: 0b0001}
+        assert bitmap_and(first, second) == {0: 0b0010, 2: 0b0001}
+        assert bitmap_count(bitmap_or(first, second)) == 5
+        assert list(bitmap_rows(bitmap_or(first, second))) == [0, 1, 3, 7, 8]
+    
+    def test_filters_match_a_scan(self, backend):
+        """Test that filters and facet counts agree with scanning the collection after mutations."""
+        library = Library(backend=backend)
+        library.add_books(CatalogGenerator(seed=41).iter_books(400))
+        with pytest.raises(RuntimeError):
+            library.filter_books(genre="Fiction")
+        library.enable_bitmap_index()
+        for book in library.books.sample_books(100, random.Random(1)):
+            library.remove_book(book)
+        library.add_books(CatalogGenerator(seed=42).iter_books(50))
+        books = list(library.books)
+        genres = {books[0].genre, books[1].genre}
+        decade = books[0].year // 10 * 10
+        expected = {book.isbn for book in books if book.genre in genres and book.year // 10 * 10 == decade}
+        assert {book.isbn for book in library.filter_books(genre=list(genres), decade=decade)} == expected
+        counts = library.facet_counts("genre", decade=decade)
+        assert sum(counts[genre] for genre in genres) == len(expected)
+        assert sum(library.facet_counts("author").values()) == len(books)
+        assert library.filter_books(genre="No Such Genre") == []
+    
+    def test_rows_are_reused(self):
+        """Test that removed books free their rows and custom facets are supported."""
+        index = BitmapIndex(facets={"initial": lambda book: book.title[0]})
+        books = [Book(f"{letter} Title", "Author", 2000, "Fiction", str(i)) for i, letter in enumerate("ABAB")]
+        for book in books:
+            index.add_book(book)
+        index.remove_book(books[0])
+        index.add_book(Book("C Title", "Author", 2001, "Poetry", "9"))
+        assert len(index) == 4 and len(index._rows) == 4
+        assert index.facet_counts("initial") == {"A": 1, "B": 2, "C": 1}
+        assert [book.isbn for book in index.books({"initial": ("A", "C")})] == ["9", "2"]
+        with pytest.raises(KeyError):
+            index.count({"genre": "Fiction"})
+
+
+class TestCommandLine:
+    """Test cases for the command-line entry point."""
+    
+    def test_reports_after_simulation(self, backend, monkeypatch, capsys):
+        """Test that --memory and --find-duplicates query the library before it is closed."""
+        monkeypatch.setattr(sys, "argv", ["main.py", "--backend", backend, "--steps", "40", "--seed", "3",
+                                          "--memory", "--find-duplicates"])
+        main.main()
+        output = capsys.readouterr().out
+        assert "bytes per book" in output
+        assert "clusters of possible duplicates" in output    
+    def test_reports_rejected_with_profiling(self, monkeypatch, capsys):
+        """Test that reports which would be dropped by a profiled run are refused instead."""
+        for mode in ("--profile", "--trace-malloc"):
+            monkeypatch.setattr(sys, "argv", ["main.py", "--steps", "5", mode, "--memory"])
+            with pytest.raises(SystemExit) as exit_info:
+                main.main()
+            assert exit_info.value.code == 2
+            assert "cannot be combined" in capsys.readouterr().err
\ No newline at end of file